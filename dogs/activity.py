@@ -0,0 +1,153 @@
+"""
+Fan-out-on-write activity feed (ActivityFeedEntry).
+
+Every match, favorite or message event writes one feed row per affected
+user inside the transaction that produced it, with the display text already
+rendered. The dashboard then reads a user's recent activity as a single
+``(user_id, created_at DESC)`` index range instead of re-querying Match with
+an owner join and a sort on every load. ``trim_activity_feeds`` keeps each
+feed bounded.
+"""
+
+from django.db.models import Count
+
+from .models import ActivityFeedEntry
+from .pagination import keyset_filter
+
+FEED_RETENTION = 100
+TRIM_BATCH_SIZE = 1000
+
+
+def _entry(user_id, kind, text, dog_id=None):
+    return ActivityFeedEntry(user_id=user_id, kind=kind, text=text[:255], dog_id=dog_id)
+
+
+def match_created_entries(
+    dog_from_id, dog_from_name, dog_to_id, dog_to_name, from_owner_id, to_owner_id
+):
+    """Entries for a new pending match: one for the sender, one for the receiver."""
+    entries = [
+        _entry(
+            from_owner_id,
+            "match_sent",
+            f"{dog_from_name} → {dog_to_name}: интерес отправлен",
+            dog_to_id,
+        )
+    ]
+    if to_owner_id != from_owner_id:
+        entries.append(
+            _entry(
+                to_owner_id,
+                "match_received",
+                f"{dog_from_name} → {dog_to_name}: новый интерес",
+                dog_from_id,
+            )
+        )
+    return entries
+
+
+def record_match_created(match):
+    record_matches_created(
+        [
+            (
+                match.dog_from_id,
+                match.dog_from.name,
+                match.dog_to_id,
+                match.dog_to.name,
+                match.from_owner_id,
+                match.to_owner_id,
+            )
+        ]
+    )
+
+
+def record_matches_created(rows):
+    """
+    Fan out a batch of new matches with one INSERT.
+
+    Each row holds the arguments of :func:`match_created_entries`, so callers
+    that inserted matches with ``bulk_create`` need no Match instances.
+    """
+    entries = []
+    for row in rows:
+        entries.extend(match_created_entries(*row))
+    ActivityFeedEntry.objects.bulk_create(entries)
+
+
+def record_match_status_change(match, reverse=False):
+    """
+    Fan out an accepted or declined match to both owners.
+
+    With ``reverse=True`` the entries describe the opposite-direction match
+    of the same pair, which moved to the same status.
+    """
+    dog_from, dog_to = match.dog_from, match.dog_to
+    owners = (match.from_owner_id, match.to_owner_id)
+    if reverse:
+        dog_from, dog_to = dog_to, dog_from
+        owners = owners[::-1]
+    if match.status == "accepted":
+        kind, text = "match_accepted", f"{dog_from.name} → {dog_to.name}: мэтч принят"
+    else:
+        kind, text = "match_declined", f"{dog_from.name} → {dog_to.name}: отклонено"
+    dogs = {owners[0]: dog_to.pk, owners[1]: dog_from.pk}
+    ActivityFeedEntry.objects.bulk_create(
+        _entry(user_id, kind, text, dog_id) for user_id, dog_id in dogs.items()
+    )
+
+
+def record_favorite_added(user_id, dog):
+    ActivityFeedEntry.objects.create(
+        user_id=user_id,
+        kind="favorite_added",
+        text=f"{dog.name} добавлена в избранное",
+        dog_id=dog.pk,
+    )
+
+
+def record_message(message):
+    """Fan out a new message to its sender and receiver."""
+    subject = message.subject
+    ActivityFeedEntry.objects.bulk_create(
+        [
+            _entry(message.sender_id, "message_sent", f"Отправлено: {subject}"),
+            _entry(message.receiver_id, "message_received", f"Новое: {subject}"),
+        ]
+    )
+
+
+def get_recent_activity(user, limit=5):
+    """Return the user's newest feed entries (one index range scan)."""
+    return list(ActivityFeedEntry.objects.filter(user=user)[:limit])
+
+
+def trim_activity_feeds(keep=FEED_RETENTION, batch_size=TRIM_BATCH_SIZE):
+    """
+    Delete everything but the newest ``keep`` entries of each user's feed.
+
+    Only users over the limit are visited. Each one's oldest kept entry is
+    found through the feed index and older rows are removed in batches of
+    ``batch_size``, so no single DELETE holds locks on a large range.
+
+    Returns:
+        Number of deleted entries.
+    """
+    over_limit = (
+        ActivityFeedEntry.objects.order_by()
+        .values("user")
+        .annotate(total=Count("id"))
+        .filter(total__gt=keep)
+        .values_list("user", flat=True)
+    )
+    deleted = 0
+    for user_id in list(over_limit):
+        stale = ActivityFeedEntry.objects.filter(user_id=user_id)
+        if keep:
+            boundary = stale.values_list("created_at", "id")[keep - 1]
+            stale = stale.filter(keyset_filter(*boundary))
+        while True:
+            batch = list(stale.values_list("id", flat=True)[:batch_size])
+            if not batch:
+                break
+            deleted += ActivityFeedEntry.objects.filter(pk__in=batch).delete()[0]
+    return deleted
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Dog, Favorite, Match, Message, UserProfile
+from .models import Breed, Dog, Favorite, Match, Message, UserProfile
 
 
 @admin.register(Dog)
@@ -34,6 +34,13 @@ class DogAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(Breed)
+class BreedAdmin(admin.ModelAdmin):
+    list_display = ("name", "normalized_name")
+    search_fields = ("name", "normalized_name")
+    readonly_fields = ("normalized_name",)
+
+
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "location", "phone", "created_at")
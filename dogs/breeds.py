@@ -0,0 +1,21 @@
+"""
+Normalization of free-text breed names for the Breed catalog.
+
+Dog.breed stays the text the owner typed; every spelling that normalizes to
+the same key ("Лабрадор", " лабрадор ", "ЛАБРАДОР") shares one Breed row.
+Keys are casefolded in Python rather than with SQL ``LOWER``, which SQLite
+applies to ASCII letters only, so lookups are plain equality, prefix and
+substring comparisons on one column on every backend.
+
+Pure functions only: migrations import this module.
+"""
+
+
+def normalize_breed_name(name):
+    """Casefolded key with collapsed whitespace; "ё" is folded into "е"."""
+    return " ".join((name or "").split()).casefold().replace("ё", "е")
+
+
+def display_breed_name(name):
+    """Name shown for a new catalog entry: the first spelling, trimmed."""
+    return " ".join((name or "").split())
@@ -0,0 +1,35 @@
+"""
+System checks for settings the dogs app relies on.
+"""
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Бэкенды, кэш которых виден только одному процессу
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Recommendation and list count versions only invalidate entries in the
+    process that bumped them unless the default cache is shared.
+    """
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            f"The default cache ({backend}) is local to one process.",
+            hint=(
+                "Other gunicorn workers keep serving stale recommendations and "
+                "dog list counts until their TTL expires, and "
+                "recommendation_cache_stats sees no hits. Set CACHE_URL to a "
+                "shared backend (dbcache://, redis://, pymemcache://)."
+            ),
+            id="dogs.W001",
+        )
+    ]
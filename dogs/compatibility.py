@@ -0,0 +1,188 @@
+"""
+Maintenance of the materialized DogCompatibility table.
+
+Scores depend only on a handful of Dog fields, so they are stored once per
+eligible pair and refreshed incrementally, after the saving transaction
+commits, when one of those fields changes. With
+``DOG_COMPATIBILITY_REFRESH_ON_SAVE`` off the table is kept up to date by
+running ``rebuild_compatibility`` on a schedule instead.
+Pairs follow the same rules as ``dogs.utils.get_candidate_queryset``: both
+dogs active, different owners, age difference of at most
+``MAX_AGE_DIFFERENCE`` years and a score of at least
+``MIN_COMPATIBILITY_SCORE``.
+"""
+
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Dog, DogCompatibility
+from .scoring import (
+    MAX_AGE_DIFFERENCE,
+    SCORING_FIELDS,
+    CandidateColumns,
+    dog_scoring_row,
+    eligible_pairs,
+    init_shard_worker,
+    score_shard,
+)
+
+# Поля Dog, от которых зависит содержимое таблицы совместимости
+COMPATIBILITY_FIELDS = (
+    "owner_id",
+    "age",
+    "size",
+    "gender",
+    "looking_for",
+    "breed",
+    "temperament_flags",
+    "is_active",
+)
+
+INSERT_BATCH_SIZE = 1000
+SHARD_SIZE = 500
+# Сколько шардов на процесс отправляется в пул заранее: результаты не успевших
+# записаться шардов не копятся в памяти
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+
+
+def load_candidate_columns(queryset, chunk_size=INSERT_BATCH_SIZE):
+    """Load ``queryset`` into CandidateColumns plus a parallel owner id array."""
+    columns = CandidateColumns()
+    owner_ids = array("q")
+    rows = queryset.values_list(*SCORING_FIELDS, "owner_id").iterator(
+        chunk_size=chunk_size
+    )
+    for *row, owner_id in rows:
+        columns.append(*row)
+        owner_ids.append(owner_id)
+    return columns, owner_ids
+
+
+def refresh_dog_compatibility(dog):
+    """Recompute the row and the column of one dog in the table.
+
+    Returns the number of stored pairs that involve the dog.
+    """
+    with transaction.atomic():
+        DogCompatibility.objects.filter(Q(dog=dog) | Q(candidate=dog)).delete()
+        if not dog.is_active:
+            return 0
+
+        candidates = Dog.objects.filter(
+            is_active=True,
+            age__gte=max(0, dog.age - MAX_AGE_DIFFERENCE),
+            age__lte=dog.age + MAX_AGE_DIFFERENCE,
+        ).exclude(owner_id=dog.owner_id)
+        columns, owner_ids = load_candidate_columns(candidates)
+
+        rows = []
+        for candidate_id, score in eligible_pairs(
+            dog_scoring_row(dog), dog.owner_id, columns, owner_ids
+        ):
+            rows.append(
+                DogCompatibility(dog_id=dog.id, candidate_id=candidate_id, score=score)
+            )
+            rows.append(
+                DogCompatibility(dog_id=candidate_id, candidate_id=dog.id, score=score)
+            )
+        _upsert_rows(rows, INSERT_BATCH_SIZE)
+        return len(rows) // 2
+
+
+def refresh_dog_compatibility_by_id(dog_id):
+    """Refresh the dog as it is in the database now; a deleted dog has no rows."""
+    dog = Dog.objects.filter(pk=dog_id).first()
+    if dog is not None:
+        refresh_dog_compatibility(dog)
+
+
+def rebuild_compatibility_table(
+    chunk_size=INSERT_BATCH_SIZE, workers=1, shard_size=SHARD_SIZE, progress=None
+):
+    """Rebuild the whole table from scratch.
+
+    All active dogs are loaded once as compact columns and split into shards
+    of ``shard_size`` dogs.  With ``workers > 1`` shards are scored in a
+    ``ProcessPoolExecutor``; every worker receives the columns once through
+    its initializer and treats them as read-only.  Only this process talks to
+    the database: results are written with ``bulk_create`` in batches of
+    ``chunk_size`` rows.  At most ``SHARDS_IN_FLIGHT_PER_WORKER`` shards per
+    worker are submitted at a time, so memory stays bounded by the columns
+    plus the shards in flight.
+
+    ``progress`` is called with the number of processed dogs after every
+    shard.  Returns the number of stored rows.
+    """
+    columns, owner_ids = load_candidate_columns(
+        Dog.objects.filter(is_active=True), chunk_size=chunk_size
+    )
+    shards = [
+        (start, min(start + shard_size, len(columns)))
+        for start in range(0, len(columns), shard_size)
+    ]
+
+    total = 0
+    processed = 0
+    with transaction.atomic():
+        DogCompatibility.objects.all().delete()
+
+        if workers > 1 and len(shards) > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_shard_worker,
+                initargs=(columns, owner_ids),
+            )
+            pending_shards = iter(shards)
+            in_flight = set()
+            with executor:
+                while True:
+                    # Окно пополняется по мере записи готовых шардов
+                    while len(in_flight) < workers * SHARDS_IN_FLIGHT_PER_WORKER:
+                        shard = next(pending_shards, None)
+                        if shard is None:
+                            break
+                        in_flight.add(executor.submit(score_shard, shard))
+                    if not in_flight:
+                        break
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        dog_count, pairs = future.result()
+                        total += _write_pairs(pairs, chunk_size)
+                        processed += dog_count
+                        if progress:
+                            progress(processed)
+        else:
+            init_shard_worker(columns, owner_ids)
+            for shard in shards:
+                dog_count, pairs = score_shard(shard)
+                total += _write_pairs(pairs, chunk_size)
+                processed += dog_count
+                if progress:
+                    progress(processed)
+    return total
+
+
+def _upsert_rows(rows, batch_size):
+    # Пересчет другой собаки мог закоммитить ту же пару после нашего delete():
+    # обновляем score вместо IntegrityError на уникальном ограничении
+    DogCompatibility.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["dog", "candidate"],
+        update_fields=["score"],
+    )
+
+
+def _write_pairs(pairs, chunk_size):
+    _upsert_rows(
+        [
+            DogCompatibility(dog_id=dog_id, candidate_id=candidate_id, score=score)
+            for dog_id, candidate_id, score in pairs
+        ],
+        chunk_size,
+    )
+    return len(pairs)
@@ -0,0 +1,164 @@
+"""
+Denormalized per-user match and favorite counters (UserMatchCounters).
+
+The counters hold what ``dogs.utils.get_match_statistics`` computes plus the
+number of favorites, so the dashboard reads them with one primary-key lookup.
+They are adjusted with ``F()`` updates inside the transaction that changes
+the underlying Match or Favorite row.  Rows removed together with a deleted
+dog are not seen by those updates, so the users involved are reconciled
+after the delete commits (see ``dogs/signals.py``).  A missing counter row is
+created from the real data, and ``reconcile_counters`` repairs any drift in
+bulk.
+"""
+
+from collections import Counter, defaultdict
+
+from django.contrib.auth.models import User
+from django.db.models import Count, F, Q
+
+from .models import Favorite, Match, UserMatchCounters
+
+RECONCILE_BATCH_SIZE = 1000
+
+
+def match_counter_fields(status, from_owner_id, to_owner_id):
+    """Return the (user_id, counter) pairs one match contributes to."""
+    if status == "pending":
+        return [(from_owner_id, "pending_sent"), (to_owner_id, "pending_received")]
+    if from_owner_id == to_owner_id:
+        return [(from_owner_id, status)]
+    return [(from_owner_id, status), (to_owner_id, status)]
+
+
+def adjust_counters(user_id, **deltas):
+    """Add ``deltas`` to the counters of one user with a single UPDATE."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = UserMatchCounters.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        # Строки еще нет: считаем ее по данным, уже включающим изменение
+        reconcile_counters([user_id])
+
+
+def record_match_created(match):
+    _apply_match_changes([(match.from_owner_id, match.to_owner_id)], None, match.status)
+
+
+def record_matches_created(owner_pairs):
+    """Record new pending matches given as (from_owner_id, to_owner_id) pairs."""
+    deltas = defaultdict(Counter)
+    for from_owner_id, to_owner_id in owner_pairs:
+        for user_id, field in match_counter_fields(
+            "pending", from_owner_id, to_owner_id
+        ):
+            deltas[user_id][field] += 1
+    for user_id, user_deltas in deltas.items():
+        adjust_counters(user_id, **user_deltas)
+
+
+def record_match_status_change(match, old_status, mutual=False):
+    """
+    Record that ``match`` moved from ``old_status`` to its current status.
+
+    With ``mutual=True`` the opposite-direction match of the same pair moved
+    to the same status too. Both changes are summed first and applied with
+    one update per user: a user without a counter row gets it reconciled
+    from data that already includes both, and a second delta would count
+    the reverse match twice.
+    """
+    owners = (match.from_owner_id, match.to_owner_id)
+    changes = [owners, owners[::-1]] if mutual else [owners]
+    _apply_match_changes(changes, old_status, match.status)
+
+
+def record_favorite_change(user_id, delta):
+    adjust_counters(user_id, favorites=delta)
+
+
+def _apply_match_changes(owner_pairs, old_status, new_status):
+    deltas = defaultdict(Counter)
+    for owners in owner_pairs:
+        if old_status is not None:
+            for user_id, field in match_counter_fields(old_status, *owners):
+                deltas[user_id][field] -= 1
+        for user_id, field in match_counter_fields(new_status, *owners):
+            deltas[user_id][field] += 1
+    for user_id, user_deltas in deltas.items():
+        adjust_counters(user_id, **user_deltas)
+
+
+def dog_counter_user_ids(dog):
+    """Return ids of the users whose counters include a match or favorite of dog."""
+    user_ids = {dog.owner_id}
+    pairs = Match.objects.filter(Q(dog_from=dog) | Q(dog_to=dog)).values_list(
+        "from_owner", "to_owner"
+    )
+    for from_owner_id, to_owner_id in pairs:
+        user_ids.update((from_owner_id, to_owner_id))
+    user_ids.update(Favorite.objects.filter(dog=dog).values_list("user", flat=True))
+    return user_ids
+
+
+def get_user_counters(user):
+    """Return the user's counters, creating the row on first access."""
+    try:
+        return UserMatchCounters.objects.get(pk=user.pk)
+    except UserMatchCounters.DoesNotExist:
+        reconcile_counters([user.pk])
+        return UserMatchCounters.objects.get(pk=user.pk)
+
+
+def reconcile_counters(user_ids=None, batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Recompute counters from Match and Favorite and rewrite the rows that drifted.
+
+    Args:
+        user_ids: Users to check; None checks every user.
+
+    Returns:
+        Number of counter rows created or corrected.
+    """
+    matches = Match.objects.all()
+    favorites = Favorite.objects.all()
+    existing = UserMatchCounters.objects.all()
+    if user_ids is None:
+        user_ids = User.objects.values_list("id", flat=True)
+    else:
+        matches = matches.filter(Q(from_owner__in=user_ids) | Q(to_owner__in=user_ids))
+        favorites = favorites.filter(user__in=user_ids)
+        existing = existing.filter(user__in=user_ids)
+
+    expected = defaultdict(Counter)
+    grouped = (
+        matches.values_list("from_owner", "to_owner", "status")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    for from_owner_id, to_owner_id, status, total in grouped:
+        for user_id, field in match_counter_fields(status, from_owner_id, to_owner_id):
+            expected[user_id][field] += total
+    grouped = favorites.values_list("user").annotate(total=Count("id")).order_by()
+    for user_id, total in grouped:
+        expected[user_id]["favorites"] = total
+
+    fields = UserMatchCounters.COUNTER_FIELDS
+    current = {row[0]: row[1:] for row in existing.values_list("user_id", *fields)}
+    drifted = []
+    for user_id in user_ids:
+        values = tuple(expected[user_id][field] for field in fields)
+        if current.get(user_id) != values:
+            drifted.append(
+                UserMatchCounters(user_id=user_id, **dict(zip(fields, values)))
+            )
+
+    UserMatchCounters.objects.bulk_create(
+        drifted,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=fields,
+    )
+    return len(drifted)
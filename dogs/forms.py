@@ -282,6 +282,17 @@ class AccountDeletionForm(forms.Form):
 class DogSearchForm(forms.Form):
     """Форма поиска собак"""
 
+    q = forms.CharField(
+        required=False,
+        max_length=200,
+        widget=forms.TextInput(
+            attrs={
+                "class": "form-control",
+                "placeholder": "Например: спокойный лабрадор",
+            }
+        ),
+        label="Поиск",
+    )
     breed = forms.CharField(
         required=False,
         widget=forms.TextInput(
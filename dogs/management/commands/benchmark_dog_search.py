@@ -0,0 +1,173 @@
+"""
+Django management command timing every DogSearchForm filter combination on a
+generated dataset, first without and then with the Dog indexes.
+
+For each combination it prints the query plan of the first dog_list page and
+p50/p95 of what the page runs: COUNT(*) plus the first 12 rows.
+
+All generated data, and the dropped and recreated indexes, live inside a
+transaction that is rolled back at the end. That transaction holds an
+exclusive lock on ``dogs_dog`` for the whole run, so the command refuses to
+start unless DEBUG is on or ``--force`` is given.
+"""
+
+import itertools
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from dogs.match_events import percentile
+from dogs.models import Dog
+from dogs.utils import get_dog_list_queryset
+
+# Значения фильтров формы поиска; измеряются все их сочетания
+FILTER_VALUES = {
+    "gender": {"gender": "F"},
+    "size": {"size": "L"},
+    "age": {"age_min": 2, "age_max": 5},
+    "breed": {"breed": "шпиц"},
+    "q": {"q": "спокойный"},
+}
+PAGE_SIZE = 12
+# Породы и характеры сгенерированных собак: фильтры по породе и тексту
+# находят часть строк, а не все или ни одной
+BENCHMARK_BREEDS = ("Лабрадор", "Немецкий шпиц", "Пудель", "Бигль", "Корги")
+BENCHMARK_TEMPERAMENTS = ("дружелюбный", "спокойный", "энергичный", "игривый")
+# Доля активных профилей в сгенерированных данных
+ACTIVE_SHARE = 0.9
+
+
+def filter_combinations():
+    """Yield (label, filters) for every subset of FILTER_VALUES."""
+    for length in range(len(FILTER_VALUES) + 1):
+        for names in itertools.combinations(FILTER_VALUES, length):
+            filters = {}
+            for name in names:
+                filters.update(FILTER_VALUES[name])
+            yield " + ".join(names) or "no filters", filters
+
+
+class Command(BaseCommand):
+    help = "Измеряет запросы списка собак по сочетаниям фильтров до и после индексов"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dogs",
+            type=int,
+            default=1_000_000,
+            help="Number of generated dogs",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of dogs inserted per bulk_create",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of timed runs per combination",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Run with DEBUG off; dogs_dog stays locked until the run ends",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError(
+                "benchmark_dog_search locks dogs_dog for the whole run and is "
+                "meant for a development database. Pass --force to run it "
+                "with DEBUG off."
+            )
+        with transaction.atomic():
+            # Индексы удаляются до вставки данных: замер «до» идет без них,
+            # а «после» они строятся по уже заполненной таблице
+            self.set_indexes(enabled=False)
+            self.create_dataset(options["dogs"], options["batch_size"])
+            before = self.measure_all(options["repeat"])
+            self.set_indexes(enabled=True)
+            after = self.measure_all(options["repeat"])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"Dataset: {options['dogs']} dogs, page size {PAGE_SIZE}")
+        for label, _ in filter_combinations():
+            self.stdout.write(self.style.SUCCESS(f"{label}:"))
+            for phase, results in (("before", before), ("after", after)):
+                p50, p95, count, plan = results[label]
+                self.stdout.write(
+                    f"  {phase:<6} p50 {p50:8.2f} ms, p95 {p95:8.2f} ms "
+                    f"({count} results)"
+                )
+                for line in plan.splitlines():
+                    self.stdout.write(f"           {line}")
+
+    def set_indexes(self, enabled):
+        # DDL идет через курсор во внешней транзакции и откатывается вместе с
+        # данными: редактор схемы SQLite нельзя открыть внутри atomic(), он
+        # здесь только собирает текст CREATE INDEX
+        schema_editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in Dog._meta.indexes:
+                create_sql = str(index.create_sql(Dog, schema_editor))
+                # Индекс полнотекстового поиска есть только в PostgreSQL
+                if not create_sql:
+                    continue
+                if enabled:
+                    cursor.execute(create_sql)
+                else:
+                    name = connection.ops.quote_name(index.name)
+                    cursor.execute(f"DROP INDEX {name}")
+
+    def create_dataset(self, dog_count, batch_size):
+        owner = User.objects.create_user(username="benchmark_dog_search")
+        rng = random.Random(0)
+        looking_for = [value for value, _ in Dog.LOOKING_FOR_CHOICES]
+        for start in range(0, dog_count, batch_size):
+            Dog.objects.bulk_create(
+                [
+                    Dog(
+                        owner=owner,
+                        name=f"benchmark-{index}",
+                        breed=rng.choice(BENCHMARK_BREEDS),
+                        age=rng.randint(0, 20),
+                        gender=rng.choice("MF"),
+                        size=rng.choice("SML"),
+                        temperament=rng.choice(BENCHMARK_TEMPERAMENTS),
+                        looking_for=rng.choice(looking_for),
+                        description="",
+                        is_active=rng.random() < ACTIVE_SHARE,
+                    )
+                    for index in range(start, min(start + batch_size, dog_count))
+                ]
+            )
+
+    def measure_all(self, repeat):
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Dog._meta.db_table}")
+        results = {}
+        for label, filters in filter_combinations():
+            dogs = get_dog_list_queryset(filters)
+            # Первый прогон прогревает кэш и не учитывается
+            count = dogs.count()
+            list(dogs[:PAGE_SIZE])
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                dogs.count()
+                list(dogs[:PAGE_SIZE])
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[label] = (
+                percentile(timings, 50),
+                percentile(timings, 95),
+                count,
+                dogs[:PAGE_SIZE].explain(),
+            )
+        return results
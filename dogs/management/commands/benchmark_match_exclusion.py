@@ -0,0 +1,120 @@
+"""
+Django management command comparing two ways of excluding already matched
+dogs from recommendations: a Python-side ``id__in`` list versus correlated
+``NOT EXISTS`` subqueries.
+
+All generated data lives inside a transaction that is rolled back at the end.
+"""
+
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+
+from dogs.models import Dog, Match
+from dogs.utils import exclude_matched_dogs
+
+
+def exclude_with_id_list(queryset, user_dog):
+    """The previous approach: load matched ids and send them back as IN (...)."""
+    matched_dog_ids = set()
+    for dog_from_id, dog_to_id in Match.objects.filter(
+        Q(dog_from=user_dog) | Q(dog_to=user_dog)
+    ).values_list("dog_from_id", "dog_to_id"):
+        matched_dog_ids.add(dog_to_id if dog_from_id == user_dog.id else dog_from_id)
+    return queryset.exclude(id__in=matched_dog_ids)
+
+
+class Command(BaseCommand):
+    help = "Сравнивает скорость исключения мэтчей: IN-список против NOT EXISTS"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--matches",
+            type=int,
+            nargs="+",
+            default=[100, 1000, 10000],
+            help="Numbers of existing matches for the benchmarked dog",
+        )
+        parser.add_argument(
+            "--extra-dogs",
+            type=int,
+            default=2000,
+            help="Number of unmatched candidate dogs",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of timed runs per approach",
+        )
+
+    def handle(self, *args, **options):
+        for match_count in options["matches"]:
+            with transaction.atomic():
+                user_dog = self.create_dataset(match_count, options["extra_dogs"])
+                candidates = Dog.objects.filter(is_active=True).exclude(pk=user_dog.pk)
+                results = {
+                    "id__in list": self.measure(
+                        exclude_with_id_list, candidates, user_dog, options["repeat"]
+                    ),
+                    "NOT EXISTS": self.measure(
+                        exclude_matched_dogs, candidates, user_dog, options["repeat"]
+                    ),
+                }
+                transaction.set_rollback(True)
+
+            self.stdout.write(self.style.SUCCESS(f"{match_count} matches:"))
+            for name, result in results.items():
+                self.stdout.write(f"  {name:<12} {result}")
+
+    def create_dataset(self, match_count, extra_dogs):
+        owner = User.objects.create_user(username="benchmark_owner")
+        others = User.objects.create_user(username="benchmark_others")
+        dog_defaults = {
+            "breed": "Benchmark",
+            "age": 4,
+            "gender": "F",
+            "size": "M",
+            "temperament": "дружелюбный",
+            "looking_for": "playmate",
+            "description": "",
+        }
+        user_dog = Dog.objects.create(owner=owner, name="benchmark", **dog_defaults)
+        dogs = Dog.objects.bulk_create(
+            [
+                Dog(owner=others, name=f"benchmark-{index}", **dog_defaults)
+                for index in range(match_count + extra_dogs)
+            ],
+            batch_size=1000,
+        )
+        Match.objects.bulk_create(
+            [
+                (
+                    Match(dog_from=user_dog, dog_to=dog)
+                    if index % 2
+                    else Match(dog_from=dog, dog_to=user_dog)
+                )
+                for index, dog in enumerate(dogs[:match_count])
+            ],
+            batch_size=1000,
+        )
+        return user_dog
+
+    def measure(self, exclude, candidates, user_dog, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    count = exclude(candidates, user_dog).count()
+            except DatabaseError as exc:
+                return f"failed: {exc}"
+            timings.append((time.perf_counter() - started) * 1000)
+        return (
+            f"{statistics.median(timings):8.2f} ms median, "
+            f"{max(timings):8.2f} ms max ({count} candidates)"
+        )
@@ -0,0 +1,30 @@
+"""
+Django management command to report the match funnel from the event log.
+"""
+
+from django.core.management.base import BaseCommand
+
+from dogs.match_events import FUNNEL_CHUNK_SIZE, compute_match_funnel
+
+
+class Command(BaseCommand):
+    help = "Считает воронку мэтчей и время ожидания ответа по журналу событий"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=FUNNEL_CHUNK_SIZE,
+            help="Number of events fetched from the database per chunk",
+        )
+
+    def handle(self, *args, **options):
+        funnel = compute_match_funnel(chunk_size=options["chunk_size"])
+        sent = funnel["sent"]
+        self.stdout.write(f"Sent: {sent}")
+        for key in ("accepted", "declined", "pending"):
+            share = funnel[key] / sent * 100 if sent else 0
+            self.stdout.write(f"{key.capitalize()}: {funnel[key]} ({share:.1f}%)")
+        for percent, seconds in funnel["accept_latency"].items():
+            value = "n/a" if seconds is None else f"{seconds:.0f}s"
+            self.stdout.write(f"Accept latency p{percent}: {value}")
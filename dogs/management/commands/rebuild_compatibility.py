@@ -0,0 +1,56 @@
+"""
+Django management command to rebuild the DogCompatibility table from scratch.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from dogs.compatibility import (
+    INSERT_BATCH_SIZE,
+    SHARD_SIZE,
+    rebuild_compatibility_table,
+)
+
+
+class Command(BaseCommand):
+    help = "Полностью пересчитывает таблицу совместимости собак"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes scoring shards in parallel",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=SHARD_SIZE,
+            help="Number of dogs scored per worker task",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=INSERT_BATCH_SIZE,
+            help="Number of rows inserted per batch",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(processed):
+            elapsed = time.monotonic() - started
+            rate = processed / elapsed if elapsed else 0
+            self.stdout.write(f"Processed {processed} dogs ({rate:.1f} dogs/s)")
+
+        total = rebuild_compatibility_table(
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            shard_size=options["shard_size"],
+            progress=progress,
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Stored {total} compatibility pairs in {elapsed:.1f}s.")
+        )
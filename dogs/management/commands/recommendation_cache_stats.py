@@ -0,0 +1,33 @@
+"""
+Django management command to report recommendation cache hit/miss counters.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from dogs.recommendation_cache import (
+    get_recommendation_cache_stats,
+    reset_recommendation_cache_stats,
+)
+
+
+class Command(BaseCommand):
+    help = "Показывает статистику попаданий в кэш рекомендаций"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after printing them",
+        )
+
+    def handle(self, *args, **options):
+        stats = get_recommendation_cache_stats()
+        self.stdout.write(
+            f"Hits: {stats['hits']}, misses: {stats['misses']}, "
+            f"hit ratio: {stats['hit_ratio']:.1%} "
+            f"(TTL {settings.DOG_RECOMMENDATION_CACHE_TTL}s)"
+        )
+        if options["reset"]:
+            reset_recommendation_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,23 @@
+"""
+Django management command to repair drift in the per-user counters.
+"""
+
+from django.core.management.base import BaseCommand
+
+from dogs.counters import RECONCILE_BATCH_SIZE, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает счетчики мэтчей и избранного пользователей"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RECONCILE_BATCH_SIZE,
+            help="Number of counter rows written per batch",
+        )
+
+    def handle(self, *args, **options):
+        repaired = reconcile_counters(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} counter rows."))
@@ -0,0 +1,31 @@
+"""
+Django management command to cap every user's activity feed.
+"""
+
+from django.core.management.base import BaseCommand
+
+from dogs.activity import FEED_RETENTION, TRIM_BATCH_SIZE, trim_activity_feeds
+
+
+class Command(BaseCommand):
+    help = "Удаляет старые записи ленты активности, оставляя последние N"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=FEED_RETENTION,
+            help="Number of newest entries kept per user",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=TRIM_BATCH_SIZE,
+            help="Number of entries removed per DELETE",
+        )
+
+    def handle(self, *args, **options):
+        deleted = trim_activity_feeds(
+            keep=options["keep"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} feed entries."))
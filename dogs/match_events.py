@@ -0,0 +1,97 @@
+"""
+Append-only match status history (MatchEvent) and the funnel built from it.
+
+The match functions call :func:`record_match_events` inside their
+transaction with every event of one operation, and a ``transaction.on_commit``
+callback writes that batch with one ``bulk_create``. The bulk match service
+therefore costs one INSERT however many matches it creates, and events of a
+rolled-back transaction or savepoint are never written.
+
+:func:`compute_match_funnel` streams the log in chunks, ordered by pair, to
+measure how many sent matches were accepted or declined and how long they
+stayed pending.
+"""
+
+from django.db import transaction
+
+from .models import MatchEvent
+
+FUNNEL_CHUNK_SIZE = 5000
+FUNNEL_PERCENTILES = (50, 90, 99)
+
+
+def record_match_events(events, using=None):
+    """
+    Write ``(dog_from_id, dog_to_id, event)`` triples once the current
+    transaction commits.
+
+    The batch gets its own ``on_commit`` callback registered at the current
+    savepoint, so rolling that savepoint back drops it. Outside a transaction
+    the events are written immediately.
+    """
+    events = [
+        MatchEvent(dog_from_id=dog_from_id, dog_to_id=dog_to_id, event=event)
+        for dog_from_id, dog_to_id, event in events
+    ]
+    if events:
+        transaction.on_commit(
+            lambda: MatchEvent.objects.bulk_create(events), using=using
+        )
+
+
+def record_match_event(dog_from_id, dog_to_id, event):
+    """Record one event for the match ``dog_from_id → dog_to_id``."""
+    record_match_events([(dog_from_id, dog_to_id, event)])
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def compute_match_funnel(chunk_size=FUNNEL_CHUNK_SIZE):
+    """
+    Walk the event log pair by pair and summarize the match funnel.
+
+    Rows are streamed with ``iterator(chunk_size)`` in index order, so memory
+    holds one pair's events plus the list of accept latencies.
+
+    Returns:
+        dict with ``sent``, ``accepted``, ``declined``, ``pending`` counts and
+        ``accept_latency`` – {percent: seconds} from creation to acceptance.
+    """
+    rows = (
+        MatchEvent.objects.order_by("dog_from_id", "dog_to_id", "created_at")
+        .values_list("dog_from_id", "dog_to_id", "event", "created_at")
+        .iterator(chunk_size=chunk_size)
+    )
+    counts = {"sent": 0, "accepted": 0, "declined": 0}
+    latencies = []
+
+    current_pair = None
+    created_at = outcome = None
+    for dog_from_id, dog_to_id, event, timestamp in rows:
+        if (dog_from_id, dog_to_id) != current_pair:
+            current_pair = (dog_from_id, dog_to_id)
+            created_at = outcome = None
+        if event == "created":
+            counts["sent"] += 1
+            created_at = timestamp
+        elif outcome is None and created_at is not None:
+            # Учитываем только первый ответ на мэтч, созданный в журнале
+            outcome = event
+            counts[event] += 1
+            if event == "accepted":
+                latencies.append((timestamp - created_at).total_seconds())
+
+    latencies.sort()
+    return {
+        **counts,
+        "pending": counts["sent"] - counts["accepted"] - counts["declined"],
+        "accept_latency": {
+            percent: percentile(latencies, percent) for percent in FUNNEL_PERCENTILES
+        },
+    }
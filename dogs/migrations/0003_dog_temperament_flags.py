@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+from dogs.scoring import extract_temperament_flags
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_temperament_flags(apps, schema_editor):
+    Dog = apps.get_model("dogs", "Dog")
+    batch = []
+    for dog in Dog.objects.only("id", "temperament").iterator(
+        chunk_size=BACKFILL_BATCH_SIZE
+    ):
+        dog.temperament_flags = extract_temperament_flags(dog.temperament)
+        batch.append(dog)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Dog.objects.bulk_update(batch, ["temperament_flags"])
+            batch = []
+    if batch:
+        Dog.objects.bulk_update(batch, ["temperament_flags"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0002_alter_favorite_unique_together_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dog",
+            name="temperament_flags",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text="Битовая маска категорий характера для расчета совместимости",
+                verbose_name="Категории характера",
+            ),
+        ),
+        migrations.RunPython(
+            backfill_temperament_flags, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,59 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0003_dog_temperament_flags"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DogCompatibility",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="Совместимость")),
+                (
+                    "candidate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="candidate_compatibilities",
+                        to="dogs.dog",
+                        verbose_name="Кандидат",
+                    ),
+                ),
+                (
+                    "dog",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="compatibilities",
+                        to="dogs.dog",
+                        verbose_name="Собака",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Совместимость",
+                "verbose_name_plural": "Совместимость",
+                "indexes": [
+                    models.Index(fields=["dog", "-score"], name="idx_compat_dog_score"),
+                    models.Index(fields=["candidate"], name="idx_compat_candidate"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dog", "candidate"),
+                        name="unique_compatibility_dog_candidate",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("dogs", "0004_dogcompatibility"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserMatchCounters",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="match_counters",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+                (
+                    "pending_sent",
+                    models.IntegerField(default=0, verbose_name="Ожидают (отправлено)"),
+                ),
+                (
+                    "pending_received",
+                    models.IntegerField(default=0, verbose_name="Ожидают (получено)"),
+                ),
+                ("accepted", models.IntegerField(default=0, verbose_name="Принято")),
+                ("declined", models.IntegerField(default=0, verbose_name="Отклонено")),
+                (
+                    "favorites",
+                    models.IntegerField(default=0, verbose_name="В избранном"),
+                ),
+            ],
+            options={
+                "verbose_name": "Счетчики пользователя",
+                "verbose_name_plural": "Счетчики пользователей",
+            },
+        ),
+    ]
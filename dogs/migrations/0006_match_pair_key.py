@@ -0,0 +1,55 @@
+from django.db import migrations, models
+from django.db.models.functions import Greatest, Least
+
+
+def backfill_pair_key(apps, schema_editor):
+    Match = apps.get_model("dogs", "Match")
+    Match.objects.update(
+        min_dog_id=Least("dog_from_id", "dog_to_id"),
+        max_dog_id=Greatest("dog_from_id", "dog_to_id"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0005_usermatchcounters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="match",
+            name="min_dog_id",
+            field=models.BigIntegerField(
+                editable=False, null=True, verbose_name="Меньший id собаки в паре"
+            ),
+        ),
+        migrations.AddField(
+            model_name="match",
+            name="max_dog_id",
+            field=models.BigIntegerField(
+                editable=False, null=True, verbose_name="Больший id собаки в паре"
+            ),
+        ),
+        migrations.RunPython(backfill_pair_key, reverse_code=migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="match",
+            name="min_dog_id",
+            field=models.BigIntegerField(
+                editable=False, verbose_name="Меньший id собаки в паре"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="match",
+            name="max_dog_id",
+            field=models.BigIntegerField(
+                editable=False, verbose_name="Больший id собаки в паре"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                fields=["min_dog_id", "max_dog_id"], name="idx_match_pair"
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_owner_ids(apps, schema_editor):
+    Dog = apps.get_model("dogs", "Dog")
+    Match = apps.get_model("dogs", "Match")
+
+    def owner_of(field):
+        return Subquery(Dog.objects.filter(pk=OuterRef(field)).values("owner_id")[:1])
+
+    Match.objects.update(
+        from_owner_id=owner_of("dog_from_id"), to_owner_id=owner_of("dog_to_id")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("dogs", "0006_match_pair_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="match",
+            name="from_owner",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Владелец собаки-инициатора",
+            ),
+        ),
+        migrations.AddField(
+            model_name="match",
+            name="to_owner",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Владелец собаки-цели",
+            ),
+        ),
+        migrations.RunPython(
+            backfill_owner_ids, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,52 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Отдельная миграция: в PostgreSQL ALTER TABLE нельзя выполнить в одной
+    # транзакции с обновлением FK-колонок (отложенные проверки внешних ключей)
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("dogs", "0007_match_owner_ids"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="match",
+            name="from_owner",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Владелец собаки-инициатора",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="match",
+            name="to_owner",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Владелец собаки-цели",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                fields=["from_owner", "status", "created_at"],
+                name="idx_match_from_owner",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                fields=["to_owner", "status", "created_at"],
+                name="idx_match_to_owner",
+            ),
+        ),
+    ]
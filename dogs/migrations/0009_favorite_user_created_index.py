@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0008_match_owner_ids_not_null"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="favorite",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="idx_favorite_user_created",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("dogs", "0009_favorite_user_created_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityFeedEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("match_sent", "Отправлен мэтч"),
+                            ("match_received", "Получен мэтч"),
+                            ("match_accepted", "Мэтч принят"),
+                            ("match_declined", "Мэтч отклонен"),
+                            ("favorite_added", "Добавлено в избранное"),
+                            ("message_sent", "Отправлено сообщение"),
+                            ("message_received", "Получено сообщение"),
+                        ],
+                        max_length=32,
+                        verbose_name="Тип",
+                    ),
+                ),
+                ("text", models.CharField(max_length=255, verbose_name="Текст")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Дата"),
+                ),
+                (
+                    "dog",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="dogs.dog",
+                        verbose_name="Собака",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity_feed",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Запись ленты активности",
+                "verbose_name_plural": "Лента активности",
+                "ordering": ["-created_at", "-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-created_at", "-id"],
+                        name="idx_feed_user_created",
+                    )
+                ],
+            },
+        ),
+    ]
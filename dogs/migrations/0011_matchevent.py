@@ -0,0 +1,59 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0010_activityfeedentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dog_from_id",
+                    models.BigIntegerField(verbose_name="id собаки-инициатора"),
+                ),
+                ("dog_to_id", models.BigIntegerField(verbose_name="id собаки-цели")),
+                (
+                    "event",
+                    models.CharField(
+                        choices=[
+                            ("created", "Создан"),
+                            ("accepted", "Принят"),
+                            ("declined", "Отклонен"),
+                        ],
+                        max_length=16,
+                        verbose_name="Событие",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Дата"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Событие мэтча",
+                "verbose_name_plural": "События мэтчей",
+                "indexes": [
+                    models.Index(
+                        fields=["dog_from_id", "dog_to_id", "created_at"],
+                        name="idx_matchevent_pair",
+                    )
+                ],
+            },
+        ),
+    ]
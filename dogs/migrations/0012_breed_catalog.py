@@ -0,0 +1,119 @@
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models import Count
+
+from dogs.breeds import display_breed_name, normalize_breed_name
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_breed_catalog(apps, schema_editor):
+    Breed = apps.get_model("dogs", "Breed")
+    Dog = apps.get_model("dogs", "Dog")
+
+    # Самое частое написание породы становится названием в каталоге
+    spellings = (
+        Dog.objects.order_by()
+        .values_list("breed")
+        .annotate(total=Count("id"))
+        .order_by("-total", "breed")
+    )
+    names = {}
+    by_spelling = {}
+    for spelling, _ in spellings.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        normalized = normalize_breed_name(spelling)
+        if normalized:
+            names.setdefault(normalized, display_breed_name(spelling))
+            by_spelling[spelling] = normalized
+
+    Breed.objects.bulk_create(
+        [Breed(name=name, normalized_name=key) for key, name in names.items()],
+        batch_size=BACKFILL_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    breed_ids = dict(Breed.objects.values_list("normalized_name", "id"))
+    for spelling, normalized in by_spelling.items():
+        Dog.objects.filter(breed=spelling).update(
+            canonical_breed_id=breed_ids[normalized]
+        )
+
+
+def create_trigram_index(apps, schema_editor):
+    # GIN-индекс с gin_trgm_ops есть только в PostgreSQL; в SQLite каталог
+    # пород небольшой, и нечеткий поиск обходится без него
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_breed_name_trgm "
+            "ON dogs_breed USING gin (normalized_name gin_trgm_ops)"
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS idx_breed_name_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0011_matchevent"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name="Breed",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="Название")),
+                (
+                    "normalized_name",
+                    models.CharField(
+                        editable=False,
+                        help_text="Название в нижнем регистре без лишних пробелов",
+                        max_length=100,
+                        unique=True,
+                        verbose_name="Ключ поиска",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Порода",
+                "verbose_name_plural": "Породы",
+                "ordering": ["name"],
+                "indexes": [
+                    models.Index(
+                        fields=["normalized_name"],
+                        name="idx_breed_name_prefix",
+                        opclasses=["varchar_pattern_ops"],
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_trigram_index, reverse_code=drop_trigram_index),
+        migrations.AddField(
+            model_name="dog",
+            name="canonical_breed",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="dogs",
+                to="dogs.breed",
+                verbose_name="Порода из каталога",
+            ),
+        ),
+        migrations.RunPython(
+            backfill_breed_catalog, reverse_code=migrations.RunPython.noop
+        ),
+    ]
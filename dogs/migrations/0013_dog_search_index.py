@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from dogs.search import drop_sqlite_search_index, install_sqlite_search_index
+
+# GIN-индекс PostgreSQL объявлен в Dog.Meta.indexes и создается миграцией 0017
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        install_sqlite_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        drop_sqlite_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0012_breed_catalog"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, reverse_code=drop_search_index),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0013_dog_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dog",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-created_at"],
+                name="idx_dog_active_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dog",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["size", "gender", "age"],
+                name="idx_dog_active_size_gender_age",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dog",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["gender", "age"],
+                name="idx_dog_active_gender_age",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0014_dog_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="dog",
+            name="idx_dog_active_created",
+        ),
+        migrations.AddIndex(
+            model_name="dog",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-created_at", "-id"],
+                name="idx_dog_active_created",
+            ),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0015_dog_active_created_id_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="breed",
+            name="idx_breed_name_prefix",
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-16 09:58
+
+import django.contrib.postgres.search
+import dogs.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dogs", "0016_remove_breed_idx_breed_name_prefix"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DogSearchEntry",
+            fields=[
+                ("rowid", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("document", models.TextField(db_column="dogs_dog_fts")),
+            ],
+            options={
+                "db_table": "dogs_dog_fts",
+                "managed": False,
+            },
+        ),
+        # Индекс с тем же именем создавала вручную миграция 0013 (PostgreSQL);
+        # теперь он объявлен в Dog.Meta.indexes
+        migrations.RunSQL(
+            "DROP INDEX IF EXISTS idx_dog_search_document",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="dog",
+            index=dogs.search.SearchDocumentIndex(
+                django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.CombinedSearchVector(
+                            django.contrib.postgres.search.SearchVector(
+                                "name", config="russian", weight="A"
+                            ),
+                            "||",
+                            django.contrib.postgres.search.SearchVector(
+                                "breed", config="russian", weight="A"
+                            ),
+                            django.contrib.postgres.search.SearchConfig("russian"),
+                        ),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            "temperament", config="russian", weight="B"
+                        ),
+                        django.contrib.postgres.search.SearchConfig("russian"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "description", config="russian", weight="C"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("russian"),
+                ),
+                name="idx_dog_search_document",
+            ),
+        ),
+    ]
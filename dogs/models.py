@@ -1,9 +1,34 @@
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connection, models
+from django.db.models import Case, FloatField, Q, Subquery, Value, When
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .breeds import display_breed_name, normalize_breed_name
+from .scoring import (
+    AGE_SCORE_FALLBACK,
+    AGE_SCORES,
+    BREED_SCORE,
+    GENDER_SCORE_DIFFERENT,
+    GENDER_SCORE_SAME,
+    GOAL_CODES,
+    GOAL_SCORE_FALLBACK,
+    GOAL_SCORES,
+    SIZE_CODES,
+    SIZE_SCORE_FALLBACK,
+    SIZE_SCORES,
+    TEMPERAMENT_SCORES,
+    extract_temperament_flags,
+)
+from .search import (
+    FTS_TABLE,
+    POSTGRES_INDEX_NAME,
+    SearchDocumentIndex,
+    search_document,
+)
+
 ALLOWED_DOG_IMAGE_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
 MAX_DOG_IMAGE_SIZE_MB = 5
 
@@ -27,6 +52,227 @@ def validate_dog_image(image):
         )
 
 
+def _score(value):
+    return Value(value, output_field=FloatField())
+
+
+def _resolve_canonical_breeds(dogs):
+    # Один запрос к каталогу на каждое различное написание, а не на собаку
+    breeds = {}
+    for dog in dogs:
+        normalized = normalize_breed_name(dog.breed)
+        if normalized not in breeds:
+            breeds[normalized] = Breed.objects.get_for_name(dog.breed)
+        dog.canonical_breed = breeds[normalized]
+        dog._saved_breed = dog.breed
+
+
+class DogQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create не вызывает save(), поэтому категории характера и
+        # породу из каталога вычисляем здесь
+        objs = list(objs)
+        for dog in objs:
+            dog.temperament_flags = extract_temperament_flags(dog.temperament)
+        _resolve_canonical_breeds(
+            [
+                dog
+                for dog in objs
+                if dog.canonical_breed_id is None
+                or dog.breed != getattr(dog, "_saved_breed", None)
+            ]
+        )
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if "temperament" in fields and "temperament_flags" not in fields:
+            for dog in objs:
+                dog.temperament_flags = extract_temperament_flags(dog.temperament)
+            fields = [*fields, "temperament_flags"]
+        if "breed" in fields and "canonical_breed" not in fields:
+            _resolve_canonical_breeds(objs)
+            fields = [*fields, "canonical_breed"]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if "temperament" in kwargs and "temperament_flags" not in kwargs:
+            temperament = kwargs["temperament"]
+            if hasattr(temperament, "resolve_expression"):
+                raise ValueError(
+                    "temperament_flags нельзя вычислить из выражения, "
+                    "передайте его в update() явно"
+                )
+            kwargs["temperament_flags"] = extract_temperament_flags(temperament)
+        # bulk_update передает сюда поля по attname (canonical_breed_id)
+        canonical_given = "canonical_breed" in kwargs or "canonical_breed_id" in kwargs
+        if "breed" in kwargs and not canonical_given:
+            breed = kwargs["breed"]
+            if hasattr(breed, "resolve_expression"):
+                raise ValueError(
+                    "canonical_breed нельзя вычислить из выражения, "
+                    "передайте его в update() явно"
+                )
+            kwargs["canonical_breed"] = Breed.objects.get_for_name(breed)
+        return super().update(**kwargs)
+
+    def annotate_compatibility(self, user_dog, name="compatibility_score"):
+        """Annotate each dog with its compatibility score against ``user_dog``.
+
+        Every component of ``calculate_dog_compatibility_score`` is expressed
+        as a ``Case``/``When`` expression, so the database can filter, order
+        and paginate by the score without loading rows into Python.
+
+        Breeds are compared through ``canonical_breed``: spellings that
+        normalize to the same key in Python ("Лабрадор" / " лабрадор ") share
+        one catalog row on every backend, unlike SQL ``LOWER``, which SQLite
+        applies to ASCII letters only.
+        """
+        user_age = user_dog.age
+        age_score = Case(
+            *[
+                When(
+                    age__gte=user_age - diff,
+                    age__lte=user_age + diff,
+                    then=_score(AGE_SCORES[diff]),
+                )
+                for diff in range(len(AGE_SCORES))
+            ],
+            default=_score(AGE_SCORE_FALLBACK),
+        )
+        size_score = Case(
+            *[
+                When(size=size, then=_score(SIZE_SCORES[(user_dog.size, size)]))
+                for size in SIZE_CODES
+                if (user_dog.size, size) in SIZE_SCORES
+            ],
+            default=_score(SIZE_SCORE_FALLBACK),
+        )
+        gender_score = Case(
+            When(gender=user_dog.gender, then=_score(GENDER_SCORE_SAME)),
+            default=_score(GENDER_SCORE_DIFFERENT),
+        )
+        goal_score = Case(
+            *[
+                When(
+                    looking_for=goal,
+                    then=_score(GOAL_SCORES[(user_dog.looking_for, goal)]),
+                )
+                for goal in GOAL_CODES
+                if (user_dog.looking_for, goal) in GOAL_SCORES
+            ],
+            default=_score(GOAL_SCORE_FALLBACK),
+        )
+        breed_id = user_dog.canonical_breed_id
+        if breed_id is None:
+            breed_id = Subquery(
+                Breed.objects.filter(
+                    normalized_name=normalize_breed_name(user_dog.breed)
+                ).values("pk")
+            )
+        breed_score = Case(
+            When(canonical_breed=breed_id, then=_score(BREED_SCORE)),
+            default=_score(0),
+        )
+        temperament_row = TEMPERAMENT_SCORES[user_dog.temperament_flags]
+        temperament_score = Case(
+            *[
+                When(temperament_flags=flags, then=_score(score))
+                for flags, score in enumerate(temperament_row)
+                if score
+            ],
+            default=_score(0),
+        )
+
+        total = (
+            age_score
+            + size_score
+            + gender_score
+            + goal_score
+            + breed_score
+            + temperament_score
+        )
+        return self.annotate(
+            **{
+                name: Case(
+                    # Собака не может быть совместима с собой
+                    When(pk=user_dog.pk, then=_score(0)),
+                    default=total,
+                    output_field=FloatField(),
+                )
+            }
+        )
+
+
+class BreedQuerySet(models.QuerySet):
+    def get_for_name(self, name):
+        """Порода каталога для свободного текста; создается при первом упоминании"""
+        normalized = normalize_breed_name(name)
+        if not normalized:
+            return None
+        breed, _ = self.get_or_create(
+            normalized_name=normalized, defaults={"name": display_breed_name(name)}
+        )
+        return breed
+
+    def search(self, query):
+        """
+        Породы каталога, подходящие под текст, сначала совпавшие по префиксу.
+
+        Подходят все породы, содержащие текст как подстроку (префикс и точное
+        совпадение тоже подстрока), а в PostgreSQL еще и похожие по триграммам.
+        Оба условия в PostgreSQL обслуживает один GIN-индекс с gin_trgm_ops;
+        префикс влияет только на порядок. Результат можно передать в фильтр
+        собак подзапросом.
+        """
+        normalized = normalize_breed_name(query)
+        if not normalized:
+            return self.none()
+        matches = Q(normalized_name__contains=normalized)
+        if connection.vendor == "postgresql":
+            matches |= Q(normalized_name__trigram_similar=normalized)
+        return self.filter(matches).order_by(
+            Case(
+                When(normalized_name__startswith=normalized, then=Value(0)),
+                default=Value(1),
+            ),
+            "normalized_name",
+        )
+
+    def search_ids(self, query):
+        """id всех пород из search(), сначала совпавшие по префиксу"""
+        return list(self.search(query).values_list("pk", flat=True))
+
+
+class Breed(models.Model):
+    """Каталог пород: одна строка на все написания одной породы"""
+
+    name = models.CharField(max_length=100, verbose_name="Название")
+    normalized_name = models.CharField(
+        max_length=100,
+        unique=True,
+        editable=False,
+        verbose_name="Ключ поиска",
+        help_text="Название в нижнем регистре без лишних пробелов",
+    )
+
+    objects = BreedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Порода"
+        verbose_name_plural = "Породы"
+        ordering = ["name"]
+        # Поиск по подстроке и триграммам обслуживает GIN-индекс с
+        # gin_trgm_ops из миграции 0012
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_breed_name(self.name)
+        super().save(*args, **kwargs)
+
+
 class Dog(models.Model):
     """Модель собаки"""
 
@@ -53,6 +299,15 @@ class Dog(models.Model):
     )
     name = models.CharField(max_length=100, verbose_name="Кличка")
     breed = models.CharField(max_length=100, verbose_name="Порода")
+    canonical_breed = models.ForeignKey(
+        Breed,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="dogs",
+        verbose_name="Порода из каталога",
+    )
     age = models.PositiveIntegerField(
         verbose_name="Возраст (в годах)",
         validators=[MinValueValidator(0), MaxValueValidator(20)],
@@ -64,6 +319,14 @@ class Dog(models.Model):
         verbose_name="Характер",
         help_text="Например: дружелюбный, энергичный, спокойный",
     )
+    # Вычисляется из temperament в save(), а также в DogQuerySet.bulk_create,
+    # bulk_update и update; запись в обход этих путей оставляет маску устаревшей
+    temperament_flags = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Категории характера",
+        help_text="Битовая маска категорий характера для расчета совместимости",
+    )
     looking_for = models.CharField(
         max_length=20,
         choices=LOOKING_FOR_CHOICES,
@@ -87,6 +350,8 @@ class Dog(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
     is_active = models.BooleanField(default=True, verbose_name="Активный профиль")
 
+    objects = DogQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Собака"
         verbose_name_plural = "Собаки"
@@ -97,10 +362,58 @@ class Dog(models.Model):
                 name="unique_dog_name_per_owner",
             ),
         ]
+        # Частичные индексы под фильтры формы поиска: список показывает только
+        # активные профили, поэтому неактивные строки в индексы не попадают.
+        # Без фильтров и с одним возрастом работает индекс по (created_at, id)
+        # (страница читается уже отсортированной, в том числе по курсору),
+        # размер и пол - ведущие столбцы составных индексов, возраст идет
+        # диапазоном после них
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="idx_dog_active_created",
+                condition=Q(is_active=True),
+            ),
+            models.Index(
+                fields=["size", "gender", "age"],
+                name="idx_dog_active_size_gender_age",
+                condition=Q(is_active=True),
+            ),
+            models.Index(
+                fields=["gender", "age"],
+                name="idx_dog_active_gender_age",
+                condition=Q(is_active=True),
+            ),
+            # Полнотекстовый поиск в PostgreSQL (см. dogs/search.py)
+            SearchDocumentIndex(search_document(), name=POSTGRES_INDEX_NAME),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.owner.username})"
 
+    def save(self, *args, **kwargs):
+        # Категории характера извлекаются один раз при сохранении, а не при
+        # каждом расчете совместимости
+        self.temperament_flags = extract_temperament_flags(self.temperament)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "temperament" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "temperament_flags"}
+        # Порода из каталога ищется только при изменении текста породы
+        breed_saved = update_fields is None or "breed" in update_fields
+        if (
+            breed_saved
+            and "breed" not in self.get_deferred_fields()
+            and (
+                self.canonical_breed_id is None
+                or self.breed != getattr(self, "_saved_breed", None)
+            )
+        ):
+            self.canonical_breed = Breed.objects.get_for_name(self.breed)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "canonical_breed"}
+        super().save(*args, **kwargs)
+        self._saved_breed = self.__dict__.get("breed")
+
     @property
     def has_photo(self) -> bool:
         """Return True only if a photo is set and the underlying file exists.
@@ -122,6 +435,62 @@ class Dog(models.Model):
             return False
 
 
+class DogSearchEntry(models.Model):
+    """
+    Строка FTS5-таблицы dogs_dog_fts (только SQLite).
+
+    Таблицу и триггеры создает dogs.search; модель нужна только для запросов
+    к ней через ORM. Столбец с именем таблицы - скрытый столбец FTS5, к нему
+    применяются MATCH и bm25
+    """
+
+    rowid = models.BigIntegerField(primary_key=True)
+    document = models.TextField(db_column=FTS_TABLE)
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+
+
+class DogCompatibility(models.Model):
+    """Предрассчитанная совместимость пары собак.
+
+    Хранится в обе стороны: строка (dog, candidate) и строка (candidate, dog),
+    поэтому рекомендации для собаки читаются одним запросом по индексу.
+    """
+
+    dog = models.ForeignKey(
+        Dog,
+        on_delete=models.CASCADE,
+        related_name="compatibilities",
+        verbose_name="Собака",
+    )
+    candidate = models.ForeignKey(
+        Dog,
+        on_delete=models.CASCADE,
+        related_name="candidate_compatibilities",
+        verbose_name="Кандидат",
+    )
+    score = models.FloatField(verbose_name="Совместимость")
+
+    class Meta:
+        verbose_name = "Совместимость"
+        verbose_name_plural = "Совместимость"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dog", "candidate"],
+                name="unique_compatibility_dog_candidate",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["dog", "-score"], name="idx_compat_dog_score"),
+            models.Index(fields=["candidate"], name="idx_compat_candidate"),
+        ]
+
+    def __str__(self):
+        return f"{self.dog_id} → {self.candidate_id}: {self.score}"
+
+
 class UserProfile(models.Model):
     """Расширенная модель пользователя"""
 
@@ -150,6 +519,36 @@ class UserProfile(models.Model):
         return f"Профиль {self.user.username}"
 
 
+class MatchQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create не вызывает save(), поэтому ключ пары и владельцев
+        # заполняем здесь
+        objs = list(objs)
+        for match in objs:
+            match.set_pair_key()
+            if match.from_owner_id is None or match.to_owner_id is None:
+                match.set_owner_ids()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def for_owner(self, user):
+        """Мэтчи, в которых одна из собак принадлежит user.
+
+        Вместо Q(dog_from__owner=user) | Q(dog_to__owner=user), которое
+        соединяет обе связи с Dog и не дает использовать индексы, строится
+        UNION двух подзапросов к одной таблице Match по индексам
+        (from_owner, status, created_at) и (to_owner, status, created_at).
+        Фильтры и select_related задаются до for_owner: к объединению
+        применимы только order_by, срезы и count(), и все они выполняются в SQL.
+        """
+        base = self.order_by()
+        return base.filter(from_owner=user).union(base.filter(to_owner=user))
+
+    def for_pair(self, dog_a, dog_b):
+        """Мэтчи между двумя собаками в обоих направлениях (один поиск по индексу)"""
+        min_dog_id, max_dog_id = Match.pair_key(dog_a, dog_b)
+        return self.filter(min_dog_id=min_dog_id, max_dog_id=max_dog_id)
+
+
 class Match(models.Model):
     """Модель для хранения мэтчей собак"""
 
@@ -174,9 +573,36 @@ class Match(models.Model):
     status = models.CharField(
         max_length=10, choices=STATUS_CHOICES, default="pending", verbose_name="Статус"
     )
+    # Владельцы собак дублируются в мэтче, чтобы выборки по пользователю
+    # не соединяли Match -> Dog -> User; при смене владельца собаки
+    # синхронизируются сигналом (dogs/signals.py)
+    from_owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        editable=False,
+        verbose_name="Владелец собаки-инициатора",
+    )
+    to_owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        editable=False,
+        verbose_name="Владелец собаки-цели",
+    )
+    # Канонический ключ неупорядоченной пары: оба направления мэтча
+    # находятся одним поиском по индексу (min_dog_id, max_dog_id)
+    min_dog_id = models.BigIntegerField(
+        editable=False, verbose_name="Меньший id собаки в паре"
+    )
+    max_dog_id = models.BigIntegerField(
+        editable=False, verbose_name="Больший id собаки в паре"
+    )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
 
+    objects = MatchQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Мэтч"
         verbose_name_plural = "Мэтчи"
@@ -193,8 +619,58 @@ class Match(models.Model):
                 fields=["dog_from", "dog_to"],
                 name="idx_match_dog_from_dog_to",
             ),
+            models.Index(
+                fields=["min_dog_id", "max_dog_id"],
+                name="idx_match_pair",
+            ),
+            models.Index(
+                fields=["from_owner", "status", "created_at"],
+                name="idx_match_from_owner",
+            ),
+            models.Index(
+                fields=["to_owner", "status", "created_at"],
+                name="idx_match_to_owner",
+            ),
         ]
 
+    @staticmethod
+    def pair_key(dog_a, dog_b):
+        """Возвращает (min_id, max_id) для двух собак или их id"""
+        a = getattr(dog_a, "pk", dog_a)
+        b = getattr(dog_b, "pk", dog_b)
+        return (a, b) if a <= b else (b, a)
+
+    def set_pair_key(self):
+        self.min_dog_id, self.max_dog_id = self.pair_key(
+            self.dog_from_id, self.dog_to_id
+        )
+
+    def set_owner_ids(self):
+        self.from_owner_id = self.dog_from.owner_id
+        self.to_owner_id = self.dog_to.owner_id
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"dog_from", "dog_to"} & set(update_fields):
+            self.set_pair_key()
+            # Владельцы загружаются только для нового мэтча или при смене собак:
+            # обновление статуса не читает обе собаки из базы
+            if self._state.adding or getattr(self, "_saved_dog_ids", None) != (
+                self.dog_from_id,
+                self.dog_to_id,
+            ):
+                self.set_owner_ids()
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "min_dog_id",
+                    "max_dog_id",
+                    "from_owner",
+                    "to_owner",
+                }
+        super().save(*args, **kwargs)
+        self._saved_dog_ids = (self.dog_from_id, self.dog_to_id)
+
     def __str__(self):
         return (
             f"{self.dog_from.name} ({self.dog_from.owner.username}) "
@@ -262,7 +738,141 @@ class Favorite(models.Model):
             models.Index(fields=["user"], name="idx_favorite_user"),
             models.Index(fields=["dog"], name="idx_favorite_dog"),
             models.Index(fields=["user", "dog"], name="idx_favorite_user_dog"),
+            # Курсорная пагинация избранного: WHERE user_id = ? AND created_at < ?
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="idx_favorite_user_created",
+            ),
         ]
 
     def __str__(self):
         return f"{self.user.username} добавил в избранное {self.dog.name}"
+
+
+class UserMatchCounters(models.Model):
+    """Денормализованные счетчики мэтчей и избранного пользователя"""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="match_counters",
+        verbose_name="Пользователь",
+    )
+    # IntegerField, а не PositiveIntegerField: при рассинхронизации уменьшение
+    # через F() не должно падать на CHECK, расхождение чинит reconcile_counters
+    pending_sent = models.IntegerField(default=0, verbose_name="Ожидают (отправлено)")
+    pending_received = models.IntegerField(default=0, verbose_name="Ожидают (получено)")
+    accepted = models.IntegerField(default=0, verbose_name="Принято")
+    declined = models.IntegerField(default=0, verbose_name="Отклонено")
+    favorites = models.IntegerField(default=0, verbose_name="В избранном")
+
+    COUNTER_FIELDS = (
+        "pending_sent",
+        "pending_received",
+        "accepted",
+        "declined",
+        "favorites",
+    )
+
+    class Meta:
+        verbose_name = "Счетчики пользователя"
+        verbose_name_plural = "Счетчики пользователей"
+
+    def __str__(self):
+        return f"Счетчики {self.user.username}"
+
+    @property
+    def total_matches(self):
+        """Всего мэтчей, как total в get_match_statistics"""
+        return self.pending_sent + self.pending_received + self.accepted + self.declined
+
+
+class ActivityFeedEntry(models.Model):
+    """
+    Запись ленты активности пользователя.
+
+    Строки пишутся в момент события, по одной на каждого затронутого
+    пользователя, с готовым текстом: лента в личном кабинете читается одним
+    диапазоном индекса (user, created_at DESC) без JOIN и сортировки.
+    """
+
+    KIND_CHOICES = [
+        ("match_sent", "Отправлен мэтч"),
+        ("match_received", "Получен мэтч"),
+        ("match_accepted", "Мэтч принят"),
+        ("match_declined", "Мэтч отклонен"),
+        ("favorite_added", "Добавлено в избранное"),
+        ("message_sent", "Отправлено сообщение"),
+        ("message_received", "Получено сообщение"),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="activity_feed",
+        verbose_name="Пользователь",
+    )
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES, verbose_name="Тип")
+    text = models.CharField(max_length=255, verbose_name="Текст")
+    dog = models.ForeignKey(
+        Dog,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Собака",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата")
+
+    class Meta:
+        verbose_name = "Запись ленты активности"
+        verbose_name_plural = "Лента активности"
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="idx_feed_user_created",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.text}"
+
+
+class MatchEvent(models.Model):
+    """
+    Журнал переходов мэтчей, только добавление.
+
+    Мэтч определяется парой (dog_from_id, dog_to_id), уникальной для Match:
+    события пишутся и для мэтчей из bulk_create, у которых нет id, а журнал
+    без внешних ключей переживает удаление мэтча и собак.
+    """
+
+    EVENT_CHOICES = [
+        ("created", "Создан"),
+        ("accepted", "Принят"),
+        ("declined", "Отклонен"),
+    ]
+
+    dog_from_id = models.BigIntegerField(verbose_name="id собаки-инициатора")
+    dog_to_id = models.BigIntegerField(verbose_name="id собаки-цели")
+    event = models.CharField(
+        max_length=16, choices=EVENT_CHOICES, verbose_name="Событие"
+    )
+    # Время события, а не записи: события пишутся пачкой после коммита
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Дата")
+
+    class Meta:
+        verbose_name = "Событие мэтча"
+        verbose_name_plural = "События мэтчей"
+        indexes = [
+            # Воронка читает журнал по парам в хронологическом порядке
+            models.Index(
+                fields=["dog_from_id", "dog_to_id", "created_at"],
+                name="idx_matchevent_pair",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dog_from_id} → {self.dog_to_id}: {self.get_event_display()}"
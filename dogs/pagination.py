@@ -0,0 +1,189 @@
+"""
+Keyset (cursor) pagination on ``(created_at, id)``.
+
+Page-number pagination runs a COUNT(*) on every request and makes the
+database walk and discard every row before the requested OFFSET, so deep
+pages get slower the further the user scrolls. A cursor remembers the
+``(created_at, id)`` of the last row on the page instead, and the next page
+is fetched with a range predicate that an index on ``created_at`` answers
+directly. The cursor is opaque to clients: urlsafe base64 of a small JSON
+array.
+
+Lists keep answering ``?page=N`` with the old page-number mode so existing
+links and bookmarks still work; see :func:`paginate`.
+
+:class:`CountedPaginator` is a page-number paginator for lists whose total
+is counted (and cached) elsewhere, see ``dogs/result_counts.py``.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+NEXT = "next"
+PREVIOUS = "previous"
+
+DESCENDING = ("-created_at", "-id")
+ASCENDING = ("created_at", "id")
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator with a precomputed total instead of its own COUNT(*).
+
+    ``is_estimate`` marks a planner estimate, which templates show as
+    approximate.
+    """
+
+    def __init__(self, object_list, per_page, count, is_estimate=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+        self.is_estimate = is_estimate
+
+    @property
+    def count(self):
+        return self._count
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor from the querystring cannot be decoded."""
+
+
+def encode_cursor(created_at, pk, direction=NEXT):
+    """Pack a page boundary into an opaque querystring-safe token."""
+    payload = json.dumps([created_at.isoformat(), pk, direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return ``(created_at, pk, direction)`` or raise :class:`InvalidCursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk, direction = json.loads(base64.urlsafe_b64decode(padded))
+        created_at = datetime.fromisoformat(created_at)
+        pk = int(pk)
+    except (TypeError, ValueError) as exc:
+        raise InvalidCursor(cursor) from exc
+    if direction not in (NEXT, PREVIOUS):
+        raise InvalidCursor(cursor)
+    return created_at, pk, direction
+
+
+def keyset_filter(created_at, pk, direction=NEXT):
+    """Rows strictly after the boundary in the newest-first ordering."""
+    # Избыточное условие created_at <= X (>= X) задает границу диапазона в
+    # индексе: одно OR ее не дает, и страница N просматривала бы все
+    # предыдущие строки
+    if direction == NEXT:
+        return Q(created_at__lte=created_at) & (
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    return Q(created_at__gte=created_at) & (
+        Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+    )
+
+
+class CursorPage:
+    """
+    One page of keyset results.
+
+    Exposes the subset of ``django.core.paginator.Page`` the templates use
+    (``object_list``, ``has_next``, ``has_previous``, iteration and len) plus
+    the cursors for the neighbouring pages. There is no ``paginator``, so the
+    page-number navigation in templates stays hidden in cursor mode.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} objects>"
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate_by_cursor(queryset, cursor, per_page, combine=None):
+    """
+    Return the :class:`CursorPage` following ``cursor`` (the first page if
+    ``cursor`` is empty), newest first.
+
+    ``combine`` is applied after the keyset predicate. It exists for
+    querysets such as ``Match.objects.for_owner`` that end in a UNION: a
+    combined query no longer accepts ``filter()``, so the range predicate has
+    to be pushed into the parts before they are combined.
+
+    Raises :class:`InvalidCursor` for a malformed cursor.
+    """
+    direction = NEXT
+    if cursor:
+        created_at, pk, direction = decode_cursor(cursor)
+        queryset = queryset.filter(keyset_filter(created_at, pk, direction))
+    if combine is not None:
+        queryset = combine(queryset)
+
+    ordering = DESCENDING if direction == NEXT else ASCENDING
+    rows = list(queryset.order_by(*ordering)[: per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == NEXT:
+        has_next, has_previous = has_more, bool(cursor)
+    else:
+        # Previous pages are read oldest-first from the boundary, then flipped
+        rows.reverse()
+        has_next, has_previous = True, has_more
+
+    if not rows:
+        return CursorPage(rows)
+    return CursorPage(
+        rows,
+        next_cursor=(
+            encode_cursor(rows[-1].created_at, rows[-1].pk) if has_next else None
+        ),
+        previous_cursor=(
+            encode_cursor(rows[0].created_at, rows[0].pk, PREVIOUS)
+            if has_previous
+            else None
+        ),
+    )
+
+
+def paginate(request, queryset, per_page, combine=None):
+    """
+    Paginate a newest-first list for ``request``.
+
+    ``?page=N`` keeps the classic :class:`~django.core.paginator.Paginator`
+    behaviour for old links; anything else uses keyset pagination driven by
+    ``?cursor=``. A malformed cursor falls back to the first page, the same
+    way ``Paginator.get_page`` forgives a bad page number.
+    """
+    if "page" in request.GET:
+        if combine is not None:
+            queryset = combine(queryset)
+        paginator = Paginator(queryset.order_by(*DESCENDING), per_page)
+        return paginator.get_page(request.GET.get("page"))
+
+    try:
+        return paginate_by_cursor(
+            queryset, request.GET.get("cursor"), per_page, combine=combine
+        )
+    except InvalidCursor:
+        return paginate_by_cursor(queryset, None, per_page, combine=combine)
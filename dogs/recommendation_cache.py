@@ -0,0 +1,130 @@
+"""
+Caching of ranked recommendations produced by ``get_compatible_dogs``.
+
+Each entry stores the ranked candidate id list of one dog.  Its key embeds
+two versions instead of relying on explicit deletes:
+
+* the global dog catalog version, bumped whenever a dog appears, disappears
+  or changes a field the scorer reads;
+* the dog's own match-set version, bumped whenever a match involving the dog
+  is created or deleted.
+
+A bumped version makes every older key unreachable, so stale lists are never
+served; they simply expire after ``DOG_RECOMMENDATION_CACHE_TTL`` seconds.
+Versions are bumped with ``transaction.on_commit``: a list computed by a
+concurrent request before the change commits is cached under the old
+version and dropped by the bump, and a rolled-back change bumps nothing.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Dog
+from .scoring import MIN_COMPATIBILITY_SCORE
+from .utils import (
+    get_candidate_queryset,
+    get_scoring_rows,
+    rank_compatible_dog_ids,
+)
+
+CATALOG_VERSION_KEY = "dogs:recommendations:catalog_version"
+MATCH_VERSION_KEY = "dogs:recommendations:match_version:{dog_id}"
+RECOMMENDATIONS_KEY = (
+    "dogs:recommendations:{dog_id}:{exclude_matches}:{min_score}:{catalog}:{matches}"
+)
+HITS_KEY = "dogs:recommendations:hits"
+MISSES_KEY = "dogs:recommendations:misses"
+
+
+def _get_version(key):
+    # Версия стартует со времени, а не с 1: если ключ вытеснен из кэша,
+    # новая версия не совпадет ни с одной из уже использованных
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_catalog_version():
+    """Invalidate recommendations of every dog once the transaction commits."""
+    transaction.on_commit(lambda: _bump_version(CATALOG_VERSION_KEY))
+
+
+def bump_match_version(*dog_ids):
+    """Invalidate recommendations of the given dogs once the transaction commits."""
+
+    def bump():
+        for dog_id in dog_ids:
+            _bump_version(MATCH_VERSION_KEY.format(dog_id=dog_id))
+
+    transaction.on_commit(bump)
+
+
+def _count(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_cached_compatible_dog_ids(
+    user_dog, exclude_matches=True, min_score=MIN_COMPATIBILITY_SCORE
+):
+    """Return the full ranked id list for ``user_dog``, computing it on a miss."""
+    key = RECOMMENDATIONS_KEY.format(
+        dog_id=user_dog.pk,
+        exclude_matches=int(exclude_matches),
+        min_score=min_score,
+        catalog=_get_version(CATALOG_VERSION_KEY),
+        matches=_get_version(MATCH_VERSION_KEY.format(dog_id=user_dog.pk)),
+    )
+    dog_ids = cache.get(key)
+    if dog_ids is not None:
+        _count(HITS_KEY)
+        return dog_ids
+
+    _count(MISSES_KEY)
+    candidates = get_candidate_queryset(user_dog, exclude_matches, min_score)
+    ranked = rank_compatible_dog_ids(user_dog, get_scoring_rows(candidates), min_score)
+    dog_ids = [dog_id for dog_id, score in ranked]
+    cache.set(key, dog_ids, timeout=settings.DOG_RECOMMENDATION_CACHE_TTL)
+    return dog_ids
+
+
+def get_cached_compatible_dogs(
+    user_dog,
+    exclude_matches=True,
+    limit=None,
+    offset=0,
+    min_score=MIN_COMPATIBILITY_SCORE,
+):
+    """Cached counterpart of ``get_compatible_dogs`` with the same result."""
+    dog_ids = get_cached_compatible_dog_ids(user_dog, exclude_matches, min_score)
+    page_ids = dog_ids[offset:] if limit is None else dog_ids[offset : offset + limit]
+    dogs_by_id = Dog.objects.in_bulk(page_ids)
+    return [dogs_by_id[dog_id] for dog_id in page_ids if dog_id in dogs_by_id]
+
+
+def get_recommendation_cache_stats():
+    """Return hit/miss counters collected since the last reset."""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / lookups if lookups else 0.0,
+    }
+
+
+def reset_recommendation_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
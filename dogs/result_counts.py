@@ -0,0 +1,112 @@
+"""
+Result counts for the dog list, computed once and cached per filter set.
+
+``dog_list`` used to count the same queryset twice per request (once for
+``total_results`` and once inside ``Paginator``). :func:`get_dog_list_count`
+is now the only place that counts: the view hands its result to
+:class:`~dogs.pagination.CountedPaginator`, and the template reads it back.
+
+Counts are cached for ``DOG_LIST_COUNT_CACHE_TTL`` seconds under a key built
+from a normalized filter signature, so "Лабрадор" and " лабрадор " share an
+entry. The key also embeds a version bumped once a transaction that saved or
+deleted a Dog commits (see ``dogs/signals.py``); bulk ``update()`` calls do
+not bump it and are picked up when the entry expires.
+
+Both the counts and the version live in the default cache, so every worker
+must share it (a ``DatabaseCache`` by default, see ``CACHES`` in settings);
+with a per-process ``LocMemCache`` a bump would only reach the worker that
+saved the dog.
+
+On PostgreSQL the planner's row estimate is read first (a plain ``EXPLAIN``,
+no rows touched). Unfiltered lists and other large result sets, whose exact
+COUNT(*) means walking hundreds of thousands of index entries, report that
+estimate instead once it reaches ``DOG_LIST_ESTIMATED_COUNT_THRESHOLD``.
+Small results are always counted exactly.
+"""
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from .breeds import normalize_breed_name
+
+COUNT_VERSION_KEY = "dogs:list_counts:version"
+COUNT_KEY = "dogs:list_counts:{version}:{signature}"
+
+
+def _get_version():
+    # Как и в кэше рекомендаций, версия стартует со времени, чтобы после
+    # вытеснения ключа не вернуться к уже использованной версии
+    cache.add(COUNT_VERSION_KEY, time.time_ns(), timeout=None)
+    return cache.get(COUNT_VERSION_KEY)
+
+
+def _bump_version():
+    try:
+        cache.incr(COUNT_VERSION_KEY)
+    except ValueError:
+        cache.set(COUNT_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_count_version():
+    """Invalidate every cached dog list count once the transaction commits."""
+    transaction.on_commit(_bump_version)
+
+
+def filter_signature(filters):
+    """
+    Stable hash of DogSearchForm data; empty fields are ignored.
+
+    Free-text fields are compared the way the searches compare them:
+    whitespace-collapsed and casefolded.
+    """
+    normalized = {}
+    for name, value in filters.items():
+        if value is None or value == "":
+            continue
+        if name == "breed":
+            value = normalize_breed_name(value)
+        elif isinstance(value, str):
+            value = " ".join(value.split()).casefold()
+        normalized[name] = value
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def estimate_count(queryset):
+    """Planner row estimate on PostgreSQL, None on other databases."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_dog_list_count(queryset, filters):
+    """
+    Return ``(count, is_estimate)`` for a dog list queryset.
+
+    ``filters`` must fully determine ``queryset`` (the view's base queryset
+    plus DogSearchForm data), since it is the only part of the cache key.
+    """
+    key = COUNT_KEY.format(version=_get_version(), signature=filter_signature(filters))
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    estimate = estimate_count(queryset)
+    if estimate is not None and estimate >= settings.DOG_LIST_ESTIMATED_COUNT_THRESHOLD:
+        result = (estimate, True)
+    else:
+        result = (queryset.count(), False)
+    cache.set(key, result, settings.DOG_LIST_COUNT_CACHE_TTL)
+    return result
@@ -0,0 +1,362 @@
+"""
+Batch compatibility scoring.
+
+Candidates are loaded as compact columns (one array per scored field) and
+scored in a single pass using precomputed lookup tables.  The rules mirror
+``dogs.utils.calculate_dog_compatibility_score`` exactly; this module only
+changes how the work is laid out, not what the score is.
+
+The module deliberately does not import Django models so it can be used from
+models, utils and worker processes alike.
+"""
+
+from array import array
+
+from .breeds import normalize_breed_name
+
+# Минимальный порог совместимости для рекомендаций
+MIN_COMPATIBILITY_SCORE = 30
+# Максимальная разница в возрасте между кандидатами
+MAX_AGE_DIFFERENCE = 10
+
+# Поля, которые читает скоринг, в порядке колонок
+SCORING_FIELDS = (
+    "id",
+    "age",
+    "size",
+    "gender",
+    "looking_for",
+    "breed",
+    "temperament_flags",
+)
+
+SIZE_CODES = ("S", "M", "L")
+GOAL_CODES = ("playmate", "companion", "mate", "friendship")
+
+# Возраст: индекс - разница в годах, всё, что дальше таблицы, даёт 5 очков
+AGE_SCORES = (25, 25, 20, 20, 15, 15, 10, 10, 10)
+AGE_SCORE_FALLBACK = 5
+
+SIZE_SCORES = {
+    ("S", "S"): 20,
+    ("S", "M"): 15,
+    ("S", "L"): 5,
+    ("M", "S"): 15,
+    ("M", "M"): 20,
+    ("M", "L"): 15,
+    ("L", "S"): 5,
+    ("L", "M"): 15,
+    ("L", "L"): 20,
+}
+SIZE_SCORE_FALLBACK = 10
+
+GOAL_SCORES = {
+    ("playmate", "playmate"): 20,
+    ("companion", "companion"): 20,
+    ("mate", "mate"): 20,
+    ("friendship", "friendship"): 20,
+    ("playmate", "companion"): 15,
+    ("companion", "playmate"): 15,
+    ("playmate", "friendship"): 15,
+    ("friendship", "playmate"): 15,
+    ("companion", "friendship"): 15,
+    ("friendship", "companion"): 15,
+}
+GOAL_SCORE_FALLBACK = 10
+
+GENDER_SCORE_DIFFERENT = 15
+GENDER_SCORE_SAME = 10
+BREED_SCORE = 5
+
+# Категории характера; порядок задаёт номер бита во флагах
+TEMPERAMENT_CATEGORIES = (
+    "дружелюбный",
+    "энергичный",
+    "спокойный",
+    "защитный",
+    "послушный",
+)
+# Пары разных категорий, которые всё равно хорошо сочетаются
+TEMPERAMENT_FRIENDLY_PAIR = ("дружелюбный", "энергичный")
+TEMPERAMENT_SCORE_MAX = 15
+
+
+def extract_temperament_flags(temperament) -> int:
+    """Return a bitmask of temperament categories mentioned in the text.
+
+    Bit ``n`` is set when ``TEMPERAMENT_CATEGORIES[n]`` occurs in the
+    lowercased text.  Stored on ``Dog.temperament_flags`` at save time.
+    """
+    text = (temperament or "").lower()
+    flags = 0
+    for bit, word in enumerate(TEMPERAMENT_CATEGORIES):
+        if word in text:
+            flags |= 1 << bit
+    return flags
+
+
+def _temperament_pair_score(flags1, flags2):
+    temperament_score = 0
+    for word1_bit, word1 in enumerate(TEMPERAMENT_CATEGORIES):
+        if not flags1 & (1 << word1_bit):
+            continue
+        for word2_bit, word2 in enumerate(TEMPERAMENT_CATEGORIES):
+            if not flags2 & (1 << word2_bit):
+                continue
+            if word1 == word2:
+                temperament_score += 7.5
+            elif (
+                word1 in TEMPERAMENT_FRIENDLY_PAIR
+                and word2 in TEMPERAMENT_FRIENDLY_PAIR
+            ):
+                temperament_score += 5
+    return min(temperament_score, TEMPERAMENT_SCORE_MAX)
+
+
+_FLAG_COUNT = 1 << len(TEMPERAMENT_CATEGORIES)
+
+# TEMPERAMENT_SCORES[flags1][flags2] - готовый вклад характера для пары
+TEMPERAMENT_SCORES = tuple(
+    tuple(_temperament_pair_score(flags1, flags2) for flags2 in range(_FLAG_COUNT))
+    for flags1 in range(_FLAG_COUNT)
+)
+
+
+def age_score(age_diff) -> int:
+    """Return the age component for an absolute age difference."""
+    if age_diff < len(AGE_SCORES):
+        return AGE_SCORES[age_diff]
+    return AGE_SCORE_FALLBACK
+
+
+def _encode(value, codes):
+    """Map a choice value to its index; unknown values get ``len(codes)``."""
+    try:
+        return codes.index(value)
+    except ValueError:
+        return len(codes)
+
+
+def _decode(code, codes):
+    return codes[code] if code < len(codes) else None
+
+
+def _table_row(user_value, codes, scores, fallback):
+    """Build the lookup row for one user value over all encoded candidates."""
+    return tuple(scores.get((user_value, code), fallback) for code in codes) + (
+        fallback,
+    )
+
+
+class CandidateColumns:
+    """Column-oriented storage for the fields the scorer needs.
+
+    Integer columns are kept in ``array`` objects, choice columns are encoded
+    to small integers, so tens of thousands of candidates cost a few hundred
+    kilobytes instead of full model instances.
+    """
+
+    __slots__ = ("ids", "ages", "sizes", "genders", "goals", "breeds", "flags")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.ages = array("l")
+        self.sizes = bytearray()
+        self.genders = []
+        self.goals = bytearray()
+        self.breeds = []
+        self.flags = bytearray()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, dog_id, age, size, gender, looking_for, breed, flags):
+        self.ids.append(dog_id)
+        self.ages.append(age)
+        self.sizes.append(_encode(size, SIZE_CODES))
+        self.genders.append(gender)
+        self.goals.append(_encode(looking_for, GOAL_CODES))
+        self.breeds.append(normalize_breed_name(breed))
+        self.flags.append(flags)
+
+    def row(self, index):
+        """Return the candidate at ``index`` as a ``SCORING_FIELDS`` tuple."""
+        return (
+            self.ids[index],
+            self.ages[index],
+            _decode(self.sizes[index], SIZE_CODES),
+            self.genders[index],
+            _decode(self.goals[index], GOAL_CODES),
+            self.breeds[index],
+            self.flags[index],
+        )
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build columns from ``values_list(*SCORING_FIELDS)`` tuples."""
+        columns = cls()
+        for row in rows:
+            columns.append(*row)
+        return columns
+
+
+def dog_scoring_row(dog):
+    """Return the ``SCORING_FIELDS`` tuple for a Dog instance."""
+    return tuple(getattr(dog, field) for field in SCORING_FIELDS)
+
+
+def non_age_score_ceiling(user_row) -> float:
+    """Return the best score any candidate can get on top of the age component.
+
+    Used as an upper bound when candidates are visited in order of growing
+    age difference: once ``age_score(diff) + ceiling`` cannot beat the current
+    cut-off, no later candidate can either.
+    """
+    user_size, user_goal, user_flags = user_row[2], user_row[4], user_row[6]
+    size_row = _table_row(user_size, SIZE_CODES, SIZE_SCORES, SIZE_SCORE_FALLBACK)
+    goal_row = _table_row(user_goal, GOAL_CODES, GOAL_SCORES, GOAL_SCORE_FALLBACK)
+    return (
+        max(size_row)
+        + GENDER_SCORE_DIFFERENT
+        + max(goal_row)
+        + BREED_SCORE
+        + max(TEMPERAMENT_SCORES[user_flags])
+    )
+
+
+def max_age_difference_for(required_score):
+    """Return the largest age difference whose age score reaches the target.
+
+    ``None`` means any difference is good enough; ``-1`` means none is.
+    """
+    if required_score <= AGE_SCORE_FALLBACK:
+        return None
+    allowed = -1
+    for age_diff, score in enumerate(AGE_SCORES):
+        if score >= required_score:
+            allowed = age_diff
+    return allowed
+
+
+def candidate_buckets(user_row, min_score):
+    """Return the candidate buckets that can still reach ``min_score``.
+
+    Candidates are bucketed by (size, looking_for, age band).  For every
+    (size, looking_for) pair the best possible non-age score is known, which
+    leaves a minimum age score and therefore a maximum age difference.  The
+    result maps ``(size, looking_for)`` to that difference (``None`` when
+    unbounded); buckets that cannot reach ``min_score`` are left out.  A
+    ``None`` size or goal stands for values outside the model choices.
+    """
+    user_size, user_goal, user_flags = user_row[2], user_row[4], user_row[6]
+    size_row = _table_row(user_size, SIZE_CODES, SIZE_SCORES, SIZE_SCORE_FALLBACK)
+    goal_row = _table_row(user_goal, GOAL_CODES, GOAL_SCORES, GOAL_SCORE_FALLBACK)
+    best_rest = (
+        GENDER_SCORE_DIFFERENT + BREED_SCORE + max(TEMPERAMENT_SCORES[user_flags])
+    )
+
+    buckets = {}
+    for size_code, size_score in enumerate(size_row):
+        for goal_code, goal_score in enumerate(goal_row):
+            required = min_score - (size_score + goal_score + best_rest)
+            max_age_diff = max_age_difference_for(required)
+            if max_age_diff != -1:
+                size = _decode(size_code, SIZE_CODES)
+                goal = _decode(goal_code, GOAL_CODES)
+                buckets[(size, goal)] = max_age_diff
+    return buckets
+
+
+def score_candidates(user_row, columns):
+    """Score every candidate in ``columns`` against ``user_row``.
+
+    Returns a list of scores aligned with ``columns.ids``.  Each value equals
+    what ``calculate_dog_compatibility_score`` returns for the same pair.
+    """
+    user_id, user_age, user_size, user_gender, user_goal, user_breed, user_flags = (
+        user_row
+    )
+    size_row = _table_row(user_size, SIZE_CODES, SIZE_SCORES, SIZE_SCORE_FALLBACK)
+    goal_row = _table_row(user_goal, GOAL_CODES, GOAL_SCORES, GOAL_SCORE_FALLBACK)
+    temperament_row = TEMPERAMENT_SCORES[user_flags]
+    user_breed = normalize_breed_name(user_breed)
+    age_table = AGE_SCORES
+    age_limit = len(AGE_SCORES)
+    age_fallback = AGE_SCORE_FALLBACK
+    gender_different = GENDER_SCORE_DIFFERENT
+    gender_same = GENDER_SCORE_SAME
+    breed_bonus = BREED_SCORE
+
+    scores = [
+        (
+            (age_table[d] if (d := abs(age - user_age)) < age_limit else age_fallback)
+            + size_row[size]
+            + (gender_different if gender != user_gender else gender_same)
+            + goal_row[goal]
+            + (breed_bonus if breed == user_breed else 0)
+            + temperament_row[flags]
+        )
+        for age, size, gender, goal, breed, flags in zip(
+            columns.ages,
+            columns.sizes,
+            columns.genders,
+            columns.goals,
+            columns.breeds,
+            columns.flags,
+        )
+    ]
+
+    # Собака не может быть совместима с собой
+    if user_id in columns.ids:
+        scores[columns.ids.index(user_id)] = 0
+    return scores
+
+
+def eligible_pairs(user_row, owner_id, columns, owner_ids):
+    """Yield ``(candidate_id, score)`` for candidates worth recommending.
+
+    A candidate qualifies when it is another owner's dog within
+    ``MAX_AGE_DIFFERENCE`` years and scores at least
+    ``MIN_COMPATIBILITY_SCORE``; ``owner_ids`` is aligned with ``columns``.
+    """
+    user_id, user_age = user_row[0], user_row[1]
+    scores = score_candidates(user_row, columns)
+    for candidate_id, age, candidate_owner_id, score in zip(
+        columns.ids, columns.ages, owner_ids, scores
+    ):
+        if (
+            score >= MIN_COMPATIBILITY_SCORE
+            and candidate_id != user_id
+            and candidate_owner_id != owner_id
+            and abs(age - user_age) <= MAX_AGE_DIFFERENCE
+        ):
+            yield candidate_id, score
+
+
+# Общие для процесса-воркера колонки кандидатов (только для чтения)
+_shard_columns = None
+_shard_owner_ids = None
+
+
+def init_shard_worker(columns, owner_ids):
+    """ProcessPoolExecutor initializer: keep the shared candidate arrays."""
+    global _shard_columns, _shard_owner_ids
+    _shard_columns = columns
+    _shard_owner_ids = owner_ids
+
+
+def score_shard(bounds):
+    """Score dogs ``columns[start:stop]`` against all candidates.
+
+    Runs inside a worker process set up by ``init_shard_worker``.  Returns
+    ``(stop - start, [(dog_id, candidate_id, score), ...])``.
+    """
+    start, stop = bounds
+    pairs = []
+    for index in range(start, stop):
+        user_row = _shard_columns.row(index)
+        for candidate_id, score in eligible_pairs(
+            user_row, _shard_owner_ids[index], _shard_columns, _shard_owner_ids
+        ):
+            pairs.append((user_row[0], candidate_id, score))
+    return stop - start, pairs
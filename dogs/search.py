@@ -0,0 +1,207 @@
+"""
+Full-text search over dog name, breed, temperament and description.
+
+PostgreSQL (production) searches the weighted ``tsvector`` returned by
+:func:`search_document`, built with the ``russian`` configuration, so
+"спокойный лабрадор" also finds "спокойная". ``Dog.Meta.indexes`` declares a
+GIN index on that exact expression, which answers the ``@@`` match. There is
+no stored column to keep in sync: PostgreSQL maintains the expression index
+on every INSERT and UPDATE of ``dogs_dog``.
+
+SQLite (development) keeps an FTS5 shadow table ``dogs_dog_fts`` that
+indexes the same columns and is queried through the unmanaged
+``DogSearchEntry`` model. Triggers on ``dogs_dog`` update it on every save,
+and results are ranked with ``bm25``. SQLite drops a table's triggers when
+Django rebuilds the table during a migration, so
+:func:`install_sqlite_search_index` runs again after every ``migrate``.
+
+Either way :func:`search_dogs` filters, ranks and orders inside the
+database, so the view paginates the ranked queryset with LIMIT/OFFSET.
+"""
+
+import operator
+import re
+from functools import reduce
+
+from django.apps import apps
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.backends.ddl_references import Statement
+from django.db.models import F, FloatField, Func, Lookup, OuterRef, Q, Subquery, Value
+
+DOG_TABLE = "dogs_dog"
+FTS_TABLE = "dogs_dog_fts"
+SEARCH_FIELDS = ("name", "breed", "temperament", "description")
+SEARCH_CONFIG = "russian"
+
+# Веса полей: кличка и порода важнее характера, описание - меньше всего
+SEARCH_WEIGHTS = {"name": "A", "breed": "A", "temperament": "B", "description": "C"}
+BM25_WEIGHTS = {"A": 10.0, "B": 5.0, "C": 1.0}
+
+POSTGRES_INDEX_NAME = "idx_dog_search_document"
+
+_fts_columns = ", ".join(SEARCH_FIELDS)
+_new_values = ", ".join(f"new.{field}" for field in SEARCH_FIELDS)
+_old_values = ", ".join(f"old.{field}" for field in SEARCH_FIELDS)
+_fts_delete = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_fts_columns}) "
+    f"VALUES ('delete', old.id, {_old_values});"
+)
+_fts_insert = (
+    f"INSERT INTO {FTS_TABLE}(rowid, {_fts_columns}) VALUES (new.id, {_new_values});"
+)
+SQLITE_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"AFTER INSERT ON {DOG_TABLE} BEGIN {_fts_insert} END",
+    f"{FTS_TABLE}_ad": f"AFTER DELETE ON {DOG_TABLE} BEGIN {_fts_delete} END",
+    f"{FTS_TABLE}_au": (
+        f"AFTER UPDATE OF {_fts_columns} ON {DOG_TABLE} "
+        f"BEGIN {_fts_delete} {_fts_insert} END"
+    ),
+}
+
+
+def search_document():
+    """
+    Weighted ``tsvector`` over SEARCH_FIELDS.
+
+    The GIN index and the query use this one expression: PostgreSQL answers
+    a WHERE clause from an expression index only if the expressions match.
+    """
+    return reduce(
+        operator.add,
+        (
+            SearchVector(field, config=SEARCH_CONFIG, weight=weight)
+            for field, weight in SEARCH_WEIGHTS.items()
+        ),
+    )
+
+
+class SearchDocumentIndex(GinIndex):
+    """
+    GIN index on :func:`search_document`, created on PostgreSQL only.
+
+    SQLite searches the FTS5 table instead and cannot parse the expression,
+    so there the index is skipped, including when Django remakes
+    ``dogs_dog`` during a migration.
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return Statement("")
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return Statement("")
+        return super().remove_sql(model, schema_editor, **kwargs)
+
+
+class Fts5Match(Lookup):
+    """``<fts5 table column> MATCH <query>``; usable directly in filter()."""
+
+    lookup_name = "fts5_match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", (*lhs_params, *rhs_params)
+
+
+class Bm25(Func):
+    function = "bm25"
+    output_field = FloatField()
+
+
+def install_sqlite_search_index(connection):
+    """
+    Create the FTS5 table and its triggers if missing (idempotent).
+
+    The index is rebuilt from ``dogs_dog`` whenever a trigger had to be
+    recreated, since changes made without it were not indexed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"{_fts_columns}, content='{DOG_TABLE}', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+            [DOG_TABLE],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(f"CREATE TRIGGER {name} {SQLITE_TRIGGERS[name]}")
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return bool(missing)
+
+
+def drop_sqlite_search_index(connection):
+    with connection.cursor() as cursor:
+        for name in SQLITE_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def fts5_query(text):
+    """
+    Turn user input into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, and the terms are ANDed, so
+    FTS5 operators and quotes in the input are never interpreted.
+    Returns "" if the text has no words.
+    """
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_dogs(queryset, text):
+    """
+    Filter a Dog queryset by full-text ``text``, best matches first.
+
+    The queryset is annotated with ``search_rank`` (higher is better) and
+    ordered by it, newest profiles first among equal ranks.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+        queryset = (
+            queryset.alias(search_document=search_document())
+            .filter(search_document=query)
+            .annotate(search_rank=SearchRank(F("search_document"), query))
+        )
+    elif connection.vendor == "sqlite":
+        match = fts5_query(text)
+        if not match:
+            return queryset.none()
+        entries = apps.get_model("dogs", "DogSearchEntry").objects.filter(
+            Fts5Match(F("document"), Value(match))
+        )
+        weights = [
+            Value(BM25_WEIGHTS[SEARCH_WEIGHTS[field]]) for field in SEARCH_FIELDS
+        ]
+        queryset = queryset.filter(pk__in=entries.values("rowid")).annotate(
+            # bm25 меньше для лучших совпадений, поэтому знак меняется
+            search_rank=Subquery(
+                entries.filter(rowid=OuterRef("pk")).values(
+                    rank=-Bm25(F("document"), *weights)
+                )
+            )
+        )
+    else:
+        words = text.split()
+        if not words:
+            return queryset.none()
+        condition = Q()
+        for word in words:
+            condition &= Q(
+                *[Q(**{f"{field}__icontains": word}) for field in SEARCH_FIELDS],
+                _connector=Q.OR,
+            )
+        queryset = queryset.filter(condition).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+    return queryset.order_by("-search_rank", "-created_at")
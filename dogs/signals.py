@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_migrate,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from .activity import record_message
+from .compatibility import COMPATIBILITY_FIELDS, refresh_dog_compatibility_by_id
+from .counters import dog_counter_user_ids, reconcile_counters
+from .models import Dog, Match, Message
+from .recommendation_cache import bump_catalog_version, bump_match_version
+from .result_counts import bump_count_version
+from .search import FTS_TABLE, install_sqlite_search_index
+
+
+def _compatibility_snapshot(dog):
+    # Читаем из __dict__, чтобы не подгружать отложенные (only/defer) поля
+    return tuple(dog.__dict__.get(field) for field in COMPATIBILITY_FIELDS)
+
+
+@receiver(post_init, sender=Dog)
+def remember_compatibility_fields(sender, instance, **kwargs):
+    instance._compatibility_snapshot = _compatibility_snapshot(instance)
+    instance._saved_owner_id = instance.__dict__.get("owner_id")
+    instance._saved_breed = instance.__dict__.get("breed")
+
+
+@receiver(post_init, sender=Match)
+def remember_match_dogs(sender, instance, **kwargs):
+    instance._saved_dog_ids = (
+        instance.__dict__.get("dog_from_id"),
+        instance.__dict__.get("dog_to_id"),
+    )
+
+
+@receiver(post_save, sender=Dog)
+def refresh_compatibility_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Recompute the dog's compatibility pairs when a scored field changes.
+
+    The candidate scan runs after the transaction commits, outside the locks
+    the save holds, and is skipped if the save is rolled back.
+    """
+    if raw:
+        return
+    snapshot = _compatibility_snapshot(instance)
+    if created or snapshot != instance._compatibility_snapshot:
+        if settings.DOG_COMPATIBILITY_REFRESH_ON_SAVE:
+            dog_id = instance.pk
+            # robust: сбой пересчета только логируется и не мешает остальным
+            # on_commit-колбэкам; таблицу догонит rebuild_compatibility
+            transaction.on_commit(
+                lambda: refresh_dog_compatibility_by_id(dog_id), robust=True
+            )
+        bump_catalog_version()
+    instance._compatibility_snapshot = snapshot
+
+
+@receiver(post_save, sender=Dog)
+def sync_match_owners_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep Match.from_owner/to_owner in line when a dog changes hands."""
+    owner_id = instance.__dict__.get("owner_id")
+    previous_owner_id, instance._saved_owner_id = instance._saved_owner_id, owner_id
+    if raw or created or previous_owner_id in (None, owner_id):
+        return
+    Match.objects.filter(dog_from=instance).update(from_owner_id=owner_id)
+    Match.objects.filter(dog_to=instance).update(to_owner_id=owner_id)
+    reconcile_counters([previous_owner_id, owner_id])
+
+
+@receiver(post_delete, sender=Dog)
+def invalidate_recommendations_on_dog_delete(sender, instance, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(pre_delete, sender=Dog)
+def remember_counter_users_on_dog_delete(sender, instance, **kwargs):
+    instance._counter_user_ids = dog_counter_user_ids(instance)
+
+
+@receiver(post_delete, sender=Dog)
+def reconcile_counters_on_dog_delete(sender, instance, **kwargs):
+    """Matches and favorites deleted by cascade bypass the counter updates."""
+    user_ids = instance._counter_user_ids
+
+    def reconcile():
+        # Владельцы, удаленные вместе с собакой, счетчиков уже не имеют
+        reconcile_counters(
+            list(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+        )
+
+    transaction.on_commit(reconcile)
+
+
+@receiver(post_save, sender=Dog)
+def invalidate_list_counts_on_save(sender, instance, raw=False, **kwargs):
+    """Any saved field can move the dog in or out of some filtered list."""
+    if not raw:
+        bump_count_version()
+
+
+@receiver(post_delete, sender=Dog)
+def invalidate_list_counts_on_delete(sender, instance, **kwargs):
+    bump_count_version()
+
+
+@receiver(post_save, sender=Match)
+def invalidate_recommendations_on_match_save(sender, instance, created, **kwargs):
+    """A new match removes both dogs from each other's recommendations."""
+    if created:
+        bump_match_version(instance.dog_from_id, instance.dog_to_id)
+
+
+@receiver(post_delete, sender=Match)
+def invalidate_recommendations_on_match_delete(sender, instance, **kwargs):
+    bump_match_version(instance.dog_from_id, instance.dog_to_id)
+
+
+@receiver(post_save, sender=Message)
+def add_message_to_activity_feed(sender, instance, created, raw=False, **kwargs):
+    """Messages are created from several places, so the feed is fed here."""
+    if created and not raw:
+        record_message(instance)
+
+
+@receiver(post_migrate)
+def restore_sqlite_search_triggers(sender, using, **kwargs):
+    """SQLite loses the full-text triggers whenever a migration rebuilds dogs_dog."""
+    connection = connections[using]
+    if (
+        sender.label == "dogs"
+        and connection.vendor == "sqlite"
+        and FTS_TABLE in connection.introspection.table_names()
+    ):
+        install_sqlite_search_index(connection)
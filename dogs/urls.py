@@ -22,6 +22,7 @@ urlpatterns = [
     path("delete-account/", views.delete_account, name="delete_account"),
     # CRUD операции с собаками
     path("dogs/", views.dog_list, name="dog_list"),
+    path("dogs/more/", views.dog_list_batch, name="dog_list_batch"),
     path("dogs/create/", views.dog_create, name="dog_create"),
     path("dogs/<int:pk>/", views.dog_detail, name="dog_detail"),
     path("dogs/<int:pk>/edit/", views.dog_update, name="dog_update"),
@@ -29,6 +30,7 @@ urlpatterns = [
     # Взаимодействия с собаками
     path("dogs/<int:pk>/favorite/", views.toggle_favorite, name="toggle_favorite"),
     path("matches/", views.matches_list, name="matches_list"),
+    path("matches/bulk/", views.bulk_create_matches, name="bulk_create_matches"),
     path("favorites/", views.favorites_list, name="favorites_list"),
     # Старые URL (для совместимости - удалить после тестирования)
     # path("register/", views.register_dog, name="register_old"),
@@ -1,13 +1,39 @@
+import heapq
 import os
 import uuid
 from io import BytesIO
 
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from django.db.models import Count, Q
+from django.db import connection, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.db.models.functions import Abs
+from django.utils import timezone
 from PIL import Image
 
-from .models import Dog, Favorite, Match
+from . import activity
+from .breeds import normalize_breed_name
+from .counters import record_match_created, record_match_status_change
+from .match_events import record_match_event, record_match_events
+from .models import Breed, Dog, Favorite, Match
+from .scoring import (
+    GOAL_CODES,
+    MAX_AGE_DIFFERENCE,
+    MIN_COMPATIBILITY_SCORE,
+    SCORING_FIELDS,
+    SIZE_CODES,
+    TEMPERAMENT_SCORES,
+    CandidateColumns,
+    age_score,
+    candidate_buckets,
+    dog_scoring_row,
+    non_age_score_ceiling,
+    score_candidates,
+)
+from .search import search_dogs
+
+# Размер пачки кандидатов, читаемых из базы при пакетной оценке и поиске топ-K
+SCORING_CHUNK_SIZE = 2000
 
 
 def calculate_dog_compatibility_score(dog1, dog2):
@@ -15,6 +41,7 @@ def calculate_dog_compatibility_score(dog1, dog2):
     Рассчитывает совместимость между двумя собаками на основе различных факторов.
 
     Returns score from 0 to 100 where 100 is perfect match.
+    Характер берется из Dog.temperament_flags, который заполняется при save().
     """
     if dog1.id == dog2.id:
         return 0  # Собака не может быть совместима с собой
@@ -71,60 +98,77 @@ def calculate_dog_compatibility_score(dog1, dog2):
     score += compatible_goals.get((dog1.looking_for, dog2.looking_for), 10)
 
     # Порода (5 points max) - небольшой бонус за одинаковые породы
-    if dog1.breed.lower() == dog2.breed.lower():
+    if normalize_breed_name(dog1.breed) == normalize_breed_name(dog2.breed):
         score += 5
 
-    # Характер (15 points max) - анализ ключевых слов в описании характера
-    temperament_keywords = {
-        "дружелюбный": ["дружелюбный", "дружелюбная", "общительный", "общительная"],
-        "энергичный": [
-            "энергичный",
-            "энергичная",
-            "активный",
-            "активная",
-            "игривый",
-            "игривая",
-        ],
-        "спокойный": [
-            "спокойный",
-            "спокойная",
-            "мирный",
-            "мирная",
-            "уравновешенный",
-            "уравновешенная",
-        ],
-        "защитный": ["защитный", "защитная", "сторожевой", "сторожевая"],
-        "послушный": ["послушный", "послушная", "управляемый", "управляемая"],
-    }
-
-    temperament_score = 0
-    for dog1_word in temperament_keywords.keys():
-        if dog1_word in dog1.temperament.lower():
-            for dog2_word in temperament_keywords.keys():
-                if dog2_word in dog2.temperament.lower():
-                    if dog1_word == dog2_word:
-                        temperament_score += 7.5
-                    elif dog1_word in ["дружелюбный", "энергичный"] and dog2_word in [
-                        "дружелюбный",
-                        "энергичный",
-                    ]:
-                        temperament_score += 5
-
-    score += min(temperament_score, 15)
+    # Характер (15 points max) - по заранее извлеченным категориям характера
+    score += TEMPERAMENT_SCORES[dog1.temperament_flags][dog2.temperament_flags]
 
     return min(score, max_score)
 
 
-def get_compatible_dogs(user_dog, exclude_matches=True):
+def get_compatible_dogs(
+    user_dog,
+    exclude_matches=True,
+    use_batch=True,
+    limit=None,
+    offset=0,
+    min_score=MIN_COMPATIBILITY_SCORE,
+):
     """
     Возвращает список совместимых собак для данной собаки пользователя.
 
     Args:
         user_dog: Dog объект собаки пользователя
         exclude_matches: Исключать ли уже существующие мэтчи
+        use_batch: Считать совместимость пакетно по колонкам (по умолчанию)
+            вместо поштучного вызова calculate_dog_compatibility_score
+        limit: Сколько собак вернуть; None - все совместимые
+        offset: Сколько лучших собак пропустить (для постраничного вывода)
+        min_score: Минимальный балл совместимости для попадания в список
 
     Returns:
-        QuerySet отсортированных по совместимости Dog объектов
+        Список Dog объектов, отсортированных по убыванию совместимости
+    """
+    compatible_dogs = get_candidate_queryset(user_dog, exclude_matches, min_score)
+
+    if limit is not None:
+        ranked_ids = top_compatible_dog_ids(
+            user_dog, compatible_dogs, limit=limit, offset=offset, min_score=min_score
+        )
+    elif not use_batch:
+        # Вычисляем совместимость для каждой собаки
+        compatible_dogs_with_scores = []
+        for dog in compatible_dogs:
+            score = calculate_dog_compatibility_score(user_dog, dog)
+            if score >= min_score:
+                compatible_dogs_with_scores.append((dog, score))
+
+        # Сортируем по убыванию совместимости
+        compatible_dogs_with_scores.sort(key=lambda x: x[1], reverse=True)
+
+        # Возвращаем только Dog объекты, отсортированные по совместимости
+        return [dog for dog, score in compatible_dogs_with_scores][offset:]
+    else:
+        ranked_ids = rank_compatible_dog_ids(
+            user_dog, get_scoring_rows(compatible_dogs), min_score
+        )[offset:]
+
+    dogs_by_id = Dog.objects.in_bulk([dog_id for dog_id, score in ranked_ids])
+    return [dogs_by_id[dog_id] for dog_id, score in ranked_ids if dog_id in dogs_by_id]
+
+
+def get_candidate_queryset(
+    user_dog, exclude_matches=True, min_score=MIN_COMPATIBILITY_SCORE
+):
+    """
+    Возвращает QuerySet кандидатов для подбора пары (без оценки совместимости).
+
+    Args:
+        user_dog: Dog объект собаки пользователя
+        exclude_matches: Исключать ли уже существующие мэтчи
+        min_score: Порог совместимости; кандидаты из корзин (размер, цель,
+            возрастной диапазон), которые не могут его достичь, не читаются
     """
     # Начинаем со всех активных собак, кроме текущей
     compatible_dogs = Dog.objects.filter(is_active=True).exclude(id=user_dog.id)
@@ -134,36 +178,283 @@ def get_compatible_dogs(user_dog, exclude_matches=True):
 
     # Фильтруем по возрасту (не слишком большая разница)
     compatible_dogs = compatible_dogs.filter(
-        age__gte=max(0, user_dog.age - 10), age__lte=user_dog.age + 10
+        age__gte=max(0, user_dog.age - MAX_AGE_DIFFERENCE),
+        age__lte=user_dog.age + MAX_AGE_DIFFERENCE,
     )
 
+    # Оставляем только корзины, способные набрать min_score
+    bucket_filter = get_bucket_filter(user_dog, min_score)
+    if bucket_filter is not None:
+        compatible_dogs = compatible_dogs.filter(bucket_filter)
+
     # Исключаем уже существующие мэтчи если нужно
     if exclude_matches:
-        existing_matches = Match.objects.filter(
-            Q(dog_from=user_dog) | Q(dog_to=user_dog)
-        ).values_list("dog_from_id", "dog_to_id")
+        compatible_dogs = exclude_matched_dogs(compatible_dogs, user_dog)
 
-        matched_dog_ids = set()
-        for match in existing_matches:
-            if match[0] == user_dog.id:
-                matched_dog_ids.add(match[1])
-            else:
-                matched_dog_ids.add(match[0])
+    # Явный порядок: при равной совместимости выше новые профили
+    return compatible_dogs.order_by("-created_at", "-id")
 
-        compatible_dogs = compatible_dogs.exclude(id__in=matched_dog_ids)
 
-    # Вычисляем совместимость для каждой собаки
-    compatible_dogs_with_scores = []
-    for dog in compatible_dogs:
-        score = calculate_dog_compatibility_score(user_dog, dog)
-        if score >= 30:  # Минимальный порог совместимости
-            compatible_dogs_with_scores.append((dog, score))
+def get_bucket_filter(user_dog, min_score):
+    """
+    Строит Q-фильтр по корзинам кандидатов (размер, цель, возрастной диапазон).
 
-    # Сортируем по убыванию совместимости
-    compatible_dogs_with_scores.sort(key=lambda x: x[1], reverse=True)
+    Returns:
+        Q объект или None, если отсечь по корзинам нечего
+    """
+    buckets = candidate_buckets(dog_scoring_row(user_dog), min_score)
+    all_buckets = (len(SIZE_CODES) + 1) * (len(GOAL_CODES) + 1)
+    if len(buckets) == all_buckets and all(
+        max_age_diff is None for max_age_diff in buckets.values()
+    ):
+        return None
 
-    # Возвращаем только Dog объекты, отсортированные по совместимости
-    return [dog for dog, score in compatible_dogs_with_scores]
+    bucket_filter = Q(pk__in=[])
+    for (size, goal), max_age_diff in buckets.items():
+        condition = Q(size=size) if size is not None else ~Q(size__in=SIZE_CODES)
+        if goal is not None:
+            condition &= Q(looking_for=goal)
+        else:
+            condition &= ~Q(looking_for__in=GOAL_CODES)
+        if max_age_diff is not None:
+            condition &= Q(
+                age__gte=user_dog.age - max_age_diff,
+                age__lte=user_dog.age + max_age_diff,
+            )
+        bucket_filter |= condition
+    return bucket_filter
+
+
+def get_compatible_dogs_queryset(user_dog, exclude_matches=True):
+    """
+    Возвращает QuerySet совместимых собак, отсортированный базой данных.
+
+    Совместимость считается в SQL (Dog.objects.annotate_compatibility), поэтому
+    результат можно нарезать на страницы без загрузки всех кандидатов:
+    get_compatible_dogs_queryset(dog)[20:40].
+
+    Returns:
+        QuerySet Dog объектов с аннотацией compatibility_score
+    """
+    return (
+        get_candidate_queryset(user_dog, exclude_matches)
+        .annotate_compatibility(user_dog)
+        .filter(compatibility_score__gte=MIN_COMPATIBILITY_SCORE)
+        .order_by("-compatibility_score", "-created_at", "-id")
+    )
+
+
+def exclude_matched_dogs(queryset, user_dog):
+    """
+    Исключает из queryset собак, с которыми у user_dog уже есть мэтч.
+
+    Проверка выполняется в базе двумя коррелированными NOT EXISTS по индексу
+    (dog_from, dog_to), без выгрузки списка id в Python: у собак с тысячами
+    мэтчей длинный IN (...) упирается в лимит параметров SQLite.
+    """
+    sent = Match.objects.filter(dog_from=user_dog, dog_to=OuterRef("pk"))
+    received = Match.objects.filter(dog_from=OuterRef("pk"), dog_to=user_dog)
+    return queryset.filter(~Exists(sent), ~Exists(received))
+
+
+def filter_dogs(queryset, filters):
+    """
+    Применяет к queryset фильтры формы поиска собак.
+
+    Общая функция для списка собак и бенчмарка индексов, чтобы измерялись
+    ровно те запросы, которые выполняет страница.
+
+    Args:
+        queryset: QuerySet Dog объектов
+        filters: cleaned_data формы DogSearchForm (или словарь тех же полей)
+    """
+    breed = filters.get("breed")
+    age_min = filters.get("age_min")
+    age_max = filters.get("age_max")
+    gender = filters.get("gender")
+    size = filters.get("size")
+    query = (filters.get("q") or "").strip()
+
+    if breed:
+        # Текст ищется в небольшом каталоге пород, собаки - по внешнему
+        # ключу через подзапрос, без LIKE '%...%' по всей таблице собак
+        breeds = Breed.objects.search(breed).order_by().values("pk")
+        queryset = queryset.filter(canonical_breed__in=breeds)
+
+    if age_min is not None:
+        queryset = queryset.filter(age__gte=age_min)
+
+    if age_max is not None:
+        queryset = queryset.filter(age__lte=age_max)
+
+    if gender:
+        queryset = queryset.filter(gender=gender)
+
+    if size:
+        queryset = queryset.filter(size=size)
+
+    if query:
+        # Полнотекстовый поиск: фильтр, ранжирование и сортировка в БД
+        queryset = search_dogs(queryset, query)
+
+    return queryset
+
+
+def get_dog_list_queryset(filters):
+    """
+    Возвращает QuerySet списка собак с фильтрами формы поиска.
+
+    Активные профили, новые первыми по (created_at, id), как требует
+    постраничная выдача по курсору; при полнотекстовом поиске - по
+    релевантности.
+    """
+    dogs = (
+        Dog.objects.filter(is_active=True)
+        .select_related("owner")
+        .order_by("-created_at", "-id")
+    )
+    return filter_dogs(dogs, filters)
+
+
+def get_precomputed_compatible_dogs(
+    user_dog, exclude_matches=True, limit=None, offset=0
+):
+    """
+    Возвращает совместимых собак из предрассчитанной таблицы DogCompatibility.
+
+    Результат совпадает с get_compatible_dogs, но вместо расчета выполняется
+    один запрос по индексу (dog, -score). Таблица поддерживается сигналами
+    при изменении собак и пересчитывается командой rebuild_compatibility.
+
+    Returns:
+        Список Dog объектов с атрибутом compatibility_score
+    """
+    dogs = Dog.objects.filter(
+        candidate_compatibilities__dog=user_dog, is_active=True
+    ).annotate(compatibility_score=F("candidate_compatibilities__score"))
+
+    if exclude_matches:
+        dogs = exclude_matched_dogs(dogs, user_dog)
+
+    dogs = dogs.order_by("-compatibility_score", "-created_at", "-id")
+    if limit is not None:
+        return list(dogs[offset : offset + limit])
+    return list(dogs[offset:])
+
+
+def top_compatible_dog_ids(
+    user_dog,
+    candidates,
+    limit,
+    offset=0,
+    chunk_size=SCORING_CHUNK_SIZE,
+    min_score=MIN_COMPATIBILITY_SCORE,
+):
+    """
+    Находит offset + limit лучших кандидатов, не сортируя весь список.
+
+    Кандидаты читаются из базы по возрастанию разницы в возрасте, пачками по
+    chunk_size, и проходят через кучу фиксированного размера. Как только
+    максимально возможный балл следующего кандидата меньше худшего балла в
+    куче, чтение прекращается: дальше кандидаты могут быть только хуже.
+
+    Returns:
+        Список (dog_id, score) по убыванию score; при равном score выше
+        стоит собака, зарегистрированная позже (как в обычной сортировке)
+    """
+    if limit <= 0:
+        return []
+    keep = offset + limit
+
+    user_row = dog_scoring_row(user_dog)
+    ceiling = non_age_score_ceiling(user_row)
+    field_count = len(SCORING_FIELDS)
+    rows = (
+        candidates.annotate(age_distance=Abs(F("age") - user_dog.age))
+        .order_by("age_distance", "-created_at", "-id")
+        .values_list(*SCORING_FIELDS, "created_at", "age_distance")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    # Куча хранит keep лучших кандидатов; в heap[0] - худший из них
+    heap = []
+    for chunk in _chunked(rows, chunk_size):
+        columns = CandidateColumns.from_rows(row[:field_count] for row in chunk)
+        scores = score_candidates(user_row, columns)
+        for row, score in zip(chunk, scores):
+            created_at, age_distance = row[-2], row[-1]
+            if len(heap) == keep and age_score(age_distance) + ceiling < heap[0][0]:
+                # Ни один из оставшихся кандидатов не пройдет в топ
+                return _heap_to_ranking(heap, offset)
+            if score < min_score:
+                continue
+            item = (score, created_at, row[0])
+            if len(heap) < keep:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    return _heap_to_ranking(heap, offset)
+
+
+def _heap_to_ranking(heap, offset):
+    ranked = sorted(heap, reverse=True)[offset:]
+    return [(dog_id, score) for score, created_at, dog_id in ranked]
+
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def get_scoring_rows(candidates, chunk_size=SCORING_CHUNK_SIZE):
+    """
+    Возвращает кандидатов кортежами SCORING_FIELDS, читая базу пачками.
+
+    Объекты Dog не создаются, а description, фото и прочие поля, не нужные
+    для оценки, из базы не выбираются.
+    """
+    return candidates.values_list(*SCORING_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def rank_compatible_dog_ids(
+    user_dog,
+    rows,
+    min_score=MIN_COMPATIBILITY_SCORE,
+    chunk_size=SCORING_CHUNK_SIZE,
+):
+    """
+    Пакетно оценивает кандидатов и возвращает [(dog_id, score), ...].
+
+    Args:
+        user_dog: Dog объект собаки пользователя
+        rows: Итерируемые кортежи в порядке SCORING_FIELDS
+        min_score: Минимальный балл совместимости
+        chunk_size: Сколько кортежей оценивать за раз; в памяти одновременно
+            держится одна пачка и пары (id, score) прошедших порог
+
+    Returns:
+        Пары (id, score) с score >= min_score по убыванию score;
+        при равенстве сохраняется исходный порядок rows
+    """
+    user_row = dog_scoring_row(user_dog)
+    ranked = []
+    for chunk in _chunked(rows, chunk_size):
+        columns = CandidateColumns.from_rows(chunk)
+        scores = score_candidates(user_row, columns)
+        ranked.extend(
+            (dog_id, score)
+            for dog_id, score in zip(columns.ids, scores)
+            if score >= min_score
+        )
+    ranked.sort(key=lambda item: item[1], reverse=True)
+    return ranked
 
 
 def create_match(dog_from, dog_to):
@@ -173,16 +464,18 @@ def create_match(dog_from, dog_to):
     Returns:
         Match объект или None если мэтч уже существует
     """
-    # Проверяем, не существует ли уже мэтч
-    existing_match = Match.objects.filter(
-        Q(dog_from=dog_from, dog_to=dog_to) | Q(dog_from=dog_to, dog_to=dog_from)
-    ).first()
+    # Проверяем, не существует ли уже мэтч (в любом направлении)
+    existing_match = Match.objects.for_pair(dog_from, dog_to).first()
 
     if existing_match:
         return existing_match
 
-    # Создаем новый мэтч
-    match = Match.objects.create(dog_from=dog_from, dog_to=dog_to, status="pending")
+    # Создаем новый мэтч и сразу обновляем счетчики владельцев
+    with transaction.atomic():
+        match = Match.objects.create(dog_from=dog_from, dog_to=dog_to, status="pending")
+        record_match_created(match)
+        activity.record_match_created(match)
+        record_match_event(match.dog_from_id, match.dog_to_id, "created")
 
     return match
 
@@ -191,43 +484,70 @@ def accept_match(match):
     """
     Принимает мэтч. Если мэтч был взаимным, создает статус 'accepted'.
 
+    Переход выполняется условным UPDATE ... WHERE status='pending', поэтому
+    из параллельных вызовов успешен ровно один. Если обратный мэтч тоже
+    ожидает ответа, обе строки пары принимаются тем же UPDATE.
+
     Returns:
         True если мэтч принят успешно, False иначе
     """
-    if match.status != "pending":
-        return False
-
-    # Проверяем обратный мэтч
-    reverse_match = Match.objects.filter(
-        dog_from=match.dog_to, dog_to=match.dog_from
-    ).first()
+    pair = Match.objects.for_pair(match.dog_from_id, match.dog_to_id)
+    # Обратный мэтч принимается, только если сам мэтч еще ожидает ответа.
+    # Строки выбираются подзапросом: в SQLite условие в WHERE самого UPDATE
+    # видело бы уже обновленную строку мэтча
+    still_pending = Match.objects.filter(pk=match.pk, status="pending")
+    targets = pair.filter(status="pending").filter(
+        Q(pk=match.pk)
+        | (
+            Exists(still_pending)
+            & Q(dog_from_id=match.dog_to_id, dog_to_id=match.dog_from_id)
+        )
+    )
+    with transaction.atomic():
+        if connection.features.has_select_for_update:
+            # PostgreSQL: блокируем пару, чтобы подзапрос видел результат
+            # параллельного перехода, а не снимок до него. В SQLite UPDATE и
+            # так выполняется под блокировкой записи всей базы
+            list(pair.select_for_update().values_list("pk", flat=True))
+        # Повторная проверка status в самом UPDATE отсекает параллельный переход
+        updated = Match.objects.filter(
+            pk__in=targets.values("pk"), status="pending"
+        ).update(status="accepted", updated_at=timezone.now())
+        if not updated:
+            return False
 
-    if reverse_match and reverse_match.status == "pending":
-        # Взаимная симпатия!
         match.status = "accepted"
-        reverse_match.status = "accepted"
-        match.save()
-        reverse_match.save()
-    else:
-        # Простое принятие
-        match.status = "accepted"
-        match.save()
+        # Взаимная симпатия: обратный мэтч принят тем же UPDATE
+        mutual = updated > 1
+        record_match_status_change(match, "pending", mutual=mutual)
+        activity.record_match_status_change(match)
+        events = [(match.dog_from_id, match.dog_to_id, "accepted")]
+        if mutual:
+            activity.record_match_status_change(match, reverse=True)
+            events.append((match.dog_to_id, match.dog_from_id, "accepted"))
+        record_match_events(events)
 
     return True
 
 
 def decline_match(match):
     """
-    Отклоняет мэтч.
+    Отклоняет мэтч условным UPDATE ... WHERE status='pending'.
 
     Returns:
         True если мэтч отклонен успешно, False иначе
     """
-    if match.status != "pending":
-        return False
+    with transaction.atomic():
+        updated = Match.objects.filter(pk=match.pk, status="pending").update(
+            status="declined", updated_at=timezone.now()
+        )
+        if not updated:
+            return False
 
-    match.status = "declined"
-    match.save()
+        match.status = "declined"
+        record_match_status_change(match, "pending")
+        activity.record_match_status_change(match)
+        record_match_event(match.dog_from_id, match.dog_to_id, "declined")
 
     return True
 
@@ -239,9 +559,11 @@ def get_mutual_matches(user):
     Returns:
         QuerySet Match объектов со статусом 'accepted'
     """
-    return Match.objects.filter(
-        Q(dog_from__owner=user) | Q(dog_to__owner=user), status="accepted"
-    ).select_related("dog_from", "dog_to", "dog_from__owner", "dog_to__owner")
+    return (
+        Match.objects.filter(status="accepted")
+        .select_related("dog_from", "dog_to", "dog_from__owner", "dog_to__owner")
+        .for_owner(user)
+    )
 
 
 def get_pending_matches(user):
@@ -251,9 +573,11 @@ def get_pending_matches(user):
     Returns:
         QuerySet Match объектов со статусом 'pending'
     """
-    return Match.objects.filter(
-        Q(dog_from__owner=user) | Q(dog_to__owner=user), status="pending"
-    ).select_related("dog_from", "dog_to", "dog_from__owner", "dog_to__owner")
+    return (
+        Match.objects.filter(status="pending")
+        .select_related("dog_from", "dog_to", "dog_from__owner", "dog_to__owner")
+        .for_owner(user)
+    )
 
 
 def get_match_statistics(user):
@@ -263,33 +587,19 @@ def get_match_statistics(user):
     Returns:
         dict с количеством различных типов мэтчей
     """
-    user_dogs = Dog.objects.filter(owner=user)
-    if not user_dogs.exists():
-        return {
-            "pending_sent": 0,
-            "pending_received": 0,
-            "accepted": 0,
-            "declined": 0,
-            "total": 0,
-        }
-
-    user_dog_ids = user_dogs.values_list("id", flat=True)
-
-    # Статистика по статусам
-    pending_sent = Match.objects.filter(
-        dog_from_id__in=user_dog_ids, status="pending"
-    ).count()
-    pending_received = Match.objects.filter(
-        dog_to_id__in=user_dog_ids, status="pending"
-    ).count()
-    accepted = Match.objects.filter(
-        Q(dog_from_id__in=user_dog_ids) | Q(dog_to_id__in=user_dog_ids),
-        status="accepted",
-    ).count()
-    declined = Match.objects.filter(
-        Q(dog_from_id__in=user_dog_ids) | Q(dog_to_id__in=user_dog_ids),
-        status="declined",
-    ).count()
+    # Все счетчики считаются одним запросом с условной агрегацией
+    sent = Q(from_owner=user)
+    received = Q(to_owner=user)
+    counts = Match.objects.filter(sent | received).aggregate(
+        pending_sent=Count("id", filter=sent & Q(status="pending")),
+        pending_received=Count("id", filter=received & Q(status="pending")),
+        accepted=Count("id", filter=Q(status="accepted")),
+        declined=Count("id", filter=Q(status="declined")),
+    )
+    pending_sent = counts["pending_sent"]
+    pending_received = counts["pending_received"]
+    accepted = counts["accepted"]
+    declined = counts["declined"]
 
     return {
         "pending_sent": pending_sent,
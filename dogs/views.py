@@ -1,15 +1,20 @@
+import json
+
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.core.exceptions import PermissionDenied
-from django.core.paginator import Paginator
-from django.db.models import Count, Q
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db.models import Count, prefetch_related_objects
 from django.http import HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 
 from services.favorites_service import toggle_favorite_for_user
+from services.match_service import create_matches_for_user
 
+from .activity import get_recent_activity
+from .counters import get_user_counters
 from .forms import (
     AccountDeletionForm,
     DogForm,
@@ -20,6 +25,21 @@ from .forms import (
     UserRegistrationForm,
 )
 from .models import Dog, Favorite, Match, UserProfile
+from .pagination import (
+    CountedPaginator,
+    InvalidCursor,
+    encode_cursor,
+    paginate,
+    paginate_by_cursor,
+)
+from .recommendation_cache import get_cached_compatible_dogs
+from .result_counts import get_dog_list_count
+from .utils import get_dog_list_queryset
+
+# Собак на странице списка и в одной порции подгрузки
+DOG_LIST_PAGE_SIZE = 12
+# Подходящих собак на странице своей собаки
+DOG_RECOMMENDATIONS_LIMIT = 6
 
 
 def landing_page(request):
@@ -108,24 +128,19 @@ def dashboard(request):
     user_dogs = Dog.objects.filter(owner=request.user)
     user_profile = UserProfile.objects.get_or_create(user=request.user)[0]
 
-    # Статистика
-    total_matches = Match.objects.filter(
-        Q(dog_from__owner=request.user) | Q(dog_to__owner=request.user)
-    ).count()
+    # Статистика: денормализованные счетчики, один запрос по первичному ключу
+    counters = get_user_counters(request.user)
 
-    total_favorites = Favorite.objects.filter(user=request.user).count()
-
-    # Недавние активности
-    recent_matches = Match.objects.filter(
-        Q(dog_from__owner=request.user) | Q(dog_to__owner=request.user)
-    ).order_by("-created_at")[:5]
+    # Недавние активности: лента пишется в момент события и читается
+    # одним диапазоном индекса (user, created_at)
+    recent_activity = get_recent_activity(request.user)
 
     context = {
         "user_dogs": user_dogs,
         "user_profile": user_profile,
-        "total_matches": total_matches,
-        "total_favorites": total_favorites,
-        "recent_matches": recent_matches,
+        "total_matches": counters.total_matches,
+        "total_favorites": counters.favorites,
+        "recent_activity": recent_activity,
         "page_title": "Личный кабинет",
     }
 
@@ -142,48 +157,64 @@ def home(request):
 
 def dog_list(request):
     """Список всех собак с фильтрами"""
-    dogs = Dog.objects.filter(is_active=True).select_related("owner")
     search_form = DogSearchForm(request.GET)
+    filters = search_form.cleaned_data if search_form.is_valid() else {}
+    dogs = get_dog_list_queryset(filters)
 
-    if search_form.is_valid():
-        # Применяем фильтры
-        breed = search_form.cleaned_data.get("breed")
-        age_min = search_form.cleaned_data.get("age_min")
-        age_max = search_form.cleaned_data.get("age_max")
-        gender = search_form.cleaned_data.get("gender")
-        size = search_form.cleaned_data.get("size")
-
-        if breed:
-            dogs = dogs.filter(breed__icontains=breed)
-
-        if age_min is not None:
-            dogs = dogs.filter(age__gte=age_min)
+    # Параметры фильтров для ссылок пагинации
+    filter_params = request.GET.copy()
+    filter_params.pop("page", None)
 
-        if age_max is not None:
-            dogs = dogs.filter(age__lte=age_max)
-
-        if gender:
-            dogs = dogs.filter(gender=gender)
-
-        if size:
-            dogs = dogs.filter(size=size)
-
-    # Пагинация
-    paginator = Paginator(dogs, 12)  # 12 собак на страницу
+    # Пагинация: число собак считается один раз за запрос и кэшируется
+    count, is_estimate = get_dog_list_count(dogs, filters)
+    paginator = CountedPaginator(dogs, DOG_LIST_PAGE_SIZE, count, is_estimate)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
+    # Курсор для подгрузки следующих карточек через dog_list_batch. Выдача
+    # по релевантности (поиск по тексту) по курсору не листается
+    next_cursor = None
+    if page_obj.has_next() and not filters.get("q"):
+        last_dog = page_obj[len(page_obj) - 1]
+        next_cursor = encode_cursor(last_dog.created_at, last_dog.pk)
+
     return render(
         request,
         "dogs/dog_list.html",
         {
             "page_obj": page_obj,
             "search_form": search_form,
-            "total_results": dogs.count(),
+            "filter_querystring": filter_params.urlencode(),
+            "total_results": paginator.count,
+            "next_cursor": next_cursor,
         },
     )
 
 
+def dog_list_batch(request):
+    """Следующая порция карточек для списка собак (AJAX)
+
+    Принимает те же параметры, что и dog_list, плюс cursor. Порции листаются
+    по ключу (created_at, id), поэтому пятисотая стоит столько же, сколько
+    первая. При поиске по тексту совпадения идут от новых к старым.
+    Ответ: {"html": "<карточки>", "next_cursor": "..." | null}.
+    """
+    search_form = DogSearchForm(request.GET)
+    if not search_form.is_valid():
+        return JsonResponse({"error": "Некорректный запрос."}, status=400)
+
+    dogs = get_dog_list_queryset(search_form.cleaned_data)
+    try:
+        page = paginate_by_cursor(dogs, request.GET.get("cursor"), DOG_LIST_PAGE_SIZE)
+    except InvalidCursor:
+        return JsonResponse({"error": "Некорректный запрос."}, status=400)
+
+    html = render_to_string(
+        "dogs/components/dog_cards.html", {"dogs": page.object_list}, request=request
+    )
+    return JsonResponse({"html": html, "next_cursor": page.next_cursor})
+
+
 def dog_detail(request, pk):
     """Подробная информация о собаке"""
     dog = get_object_or_404(Dog.objects.select_related("owner"), pk=pk, is_active=True)
@@ -193,13 +224,23 @@ def dog_detail(request, pk):
     if request.user.is_authenticated:
         is_favorite = Favorite.objects.filter(user=request.user, dog=dog).exists()
 
+    # Владельцу показываем подходящих собак: ранжированный список берется из
+    # кэша рекомендаций и пересчитывается только после изменений собак и мэтчей
+    can_edit = dog.owner == request.user
+    recommendations = []
+    if can_edit:
+        recommendations = get_cached_compatible_dogs(
+            dog, limit=DOG_RECOMMENDATIONS_LIMIT
+        )
+
     return render(
         request,
         "dogs/dog_detail.html",
         {
             "dog": dog,
             "is_favorite": is_favorite,
-            "can_edit": dog.owner == request.user,
+            "can_edit": can_edit,
+            "recommendations": recommendations,
         },
     )
 
@@ -377,20 +418,50 @@ def toggle_favorite(request, pk):
     return JsonResponse({"is_favorite": is_favorite, "message": message})
 
 
+def bulk_create_matches(request):
+    """Отправка интереса сразу нескольким собакам (AJAX)
+
+    Тело запроса: {"dog_from": <id>, "dog_to": [<id>, ...]}.
+    Ответ: {"results": {"<id>": "created" | "exists" | "not_found" | "own_dog"}}.
+    """
+    if request.method != "POST":
+        return HttpResponseForbidden()
+
+    if not request.user.is_authenticated:
+        return HttpResponseForbidden()
+
+    try:
+        payload = json.loads(request.body)
+        dog_to_ids = payload["dog_to"]
+        if not isinstance(dog_to_ids, list):
+            raise TypeError
+        results = create_matches_for_user(request.user, payload["dog_from"], dog_to_ids)
+    except (ValueError, TypeError, KeyError):
+        return JsonResponse({"error": "Некорректный запрос."}, status=400)
+    except ValidationError as error:
+        return JsonResponse({"error": error.messages[0]}, status=400)
+    except PermissionDenied:
+        return HttpResponseForbidden()
+
+    return JsonResponse(
+        {"results": {str(dog_id): outcome for dog_id, outcome in results.items()}}
+    )
+
+
 @login_required
 def matches_list(request):
     """Список мэтчей пользователя"""
-    matches_qs = (
-        Match.objects.filter(
-            Q(dog_from__owner=request.user) | Q(dog_to__owner=request.user)
-        )
-        .select_related("dog_from", "dog_to", "dog_from__owner", "dog_to__owner")
-        .order_by("-created_at")
+    # Страница читается из таблицы Match по индексам владельцев: по курсору
+    # (created_at, id) без COUNT и OFFSET, по ?page=N - постранично, как раньше.
+    # Собаки подгружаются только для мэтчей текущей страницы
+    page_obj = paginate(
+        request,
+        Match.objects.all(),
+        10,
+        combine=lambda matches: matches.for_owner(request.user),
     )
-
-    paginator = Paginator(matches_qs, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj.object_list = list(page_obj.object_list)
+    prefetch_related_objects(page_obj.object_list, "dog_from", "dog_to")
 
     return render(
         request,
@@ -407,10 +478,7 @@ def matches_list(request):
 def favorites_list(request):
     """Список избранных собак"""
     favorites_qs = Favorite.objects.filter(user=request.user).select_related("dog")
-
-    paginator = Paginator(favorites_qs, 12)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, favorites_qs, 12)
 
     return render(
         request,
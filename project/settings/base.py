@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "corsheaders",
     "menu_app",
     "dogs",
@@ -163,6 +164,40 @@ EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", default=True)
 EMAIL_USE_SSL = env.bool("EMAIL_USE_SSL", default=False)
 
 
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+# Версии кэша рекомендаций и числа найденных собак должны быть общими для всех
+# процессов gunicorn, поэтому по умолчанию используется таблица в базе
+# (python manage.py createcachetable). Redis или Memcached задаются через
+# CACHE_URL, например redis://redis:6379/1. LocMemCache у каждого процесса свой,
+# и для него проверка dogs.W001 выдает предупреждение
+CACHES = {"default": env.cache("CACHE_URL", default="dbcache://dogs_cache")}
+
+
+# ---------------------------------------------------------------------------
+# Recommendations
+# ---------------------------------------------------------------------------
+# Время жизни кэша ранжированных рекомендаций (сек), см. dogs/recommendation_cache.py
+DOG_RECOMMENDATION_CACHE_TTL = env.int("DOG_RECOMMENDATION_CACHE_TTL", default=300)
+# Пересчитывать строки собаки в DogCompatibility после коммита ее сохранения.
+# Если выключено, таблицу по расписанию обновляет команда rebuild_compatibility
+DOG_COMPATIBILITY_REFRESH_ON_SAVE = env.bool(
+    "DOG_COMPATIBILITY_REFRESH_ON_SAVE", default=True
+)
+
+
+# ---------------------------------------------------------------------------
+# Dog list
+# ---------------------------------------------------------------------------
+# Время жизни кэша числа найденных собак (сек), см. dogs/result_counts.py
+DOG_LIST_COUNT_CACHE_TTL = env.int("DOG_LIST_COUNT_CACHE_TTL", default=60)
+# С какого числа строк PostgreSQL показывает оценку планировщика вместо COUNT(*)
+DOG_LIST_ESTIMATED_COUNT_THRESHOLD = env.int(
+    "DOG_LIST_ESTIMATED_COUNT_THRESHOLD", default=100_000
+)
+
+
 # ---------------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------------
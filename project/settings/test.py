@@ -18,9 +18,26 @@ DATABASES = {
     }
 }
 
+# Postgres-only tests (EXPLAIN plans, row locking) run when TEST_DATABASE_URL
+# points to a local Postgres server; otherwise they are skipped
+TEST_DATABASE_URL = env("TEST_DATABASE_URL", default="")
+if TEST_DATABASE_URL:
+    DATABASES = {"default": env.db("TEST_DATABASE_URL")}
+
+# Thread-based concurrency tests (marker "concurrency") need a database that
+# several connections can share; set TEST_SQLITE_FILE to run from a file:
+#   TEST_SQLITE_FILE=/tmp/dogs_test.sqlite3 pytest -m concurrency
+TEST_SQLITE_FILE = env("TEST_SQLITE_FILE", default="")
+if TEST_SQLITE_FILE:
+    DATABASES["default"]["TEST"] = {"NAME": TEST_SQLITE_FILE}
+
 # Disable debug mode in tests for performance
 DEBUG = False
 
+# Tests run in one process, so a local-memory cache is enough
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+SILENCED_SYSTEM_CHECKS = ["dogs.W001"]
+
 # Simplify password hashing for faster tests
 PASSWORD_HASHERS = [
     "django.contrib.auth.hashers.MD5PasswordHasher",
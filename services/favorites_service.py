@@ -1,6 +1,8 @@
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 
+from dogs import activity
+from dogs.counters import record_favorite_change
 from dogs.models import Dog, Favorite
 
 
@@ -25,7 +27,10 @@ def toggle_favorite_for_user(user, dog_id: int) -> tuple[bool, str]:
     with transaction.atomic():
         favorite, created = Favorite.objects.get_or_create(user=user, dog=dog)
         if created:
+            record_favorite_change(user.pk, 1)
+            activity.record_favorite_added(user.pk, dog)
             return True, f"{dog.name} добавлена в избранное"
 
         favorite.delete()
+        record_favorite_change(user.pk, -1)
         return False, f"{dog.name} удалена из избранного"
@@ -1,9 +1,23 @@
-from django.core.exceptions import PermissionDenied
-from django.db import transaction
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 
+from dogs import activity
+from dogs.counters import record_matches_created
+from dogs.match_events import record_match_events
 from dogs.models import Dog, Match
+from dogs.recommendation_cache import bump_match_version
 from dogs.utils import accept_match, create_match, decline_match
 
+# Максимум целей в одном запросе create_matches_for_user
+MAX_BULK_MATCH_TARGETS = 100
+
+# Результаты create_matches_for_user для каждой цели
+MATCH_CREATED = "created"
+MATCH_EXISTS = "exists"
+MATCH_NOT_FOUND = "not_found"
+MATCH_OWN_DOG = "own_dog"
+
 
 def create_match_for_user(user, dog_from_id: int, dog_to_id: int) -> Match:
     """Create a match initiated by the given user.
@@ -29,6 +43,118 @@ def create_match_for_user(user, dog_from_id: int, dog_to_id: int) -> Match:
         return create_match(dog_from, dog_to)
 
 
+def create_matches_for_user(user, dog_from_id: int, dog_to_ids) -> dict[int, str]:
+    """Send interest from one of the user's dogs to many dogs at once.
+
+    The source dog and all targets are validated with one query, existing
+    pairs (in either direction) are found through the pair index and the rest
+    are inserted with a single bulk_create. Returns {dog_to_id: outcome},
+    where outcome is one of MATCH_CREATED, MATCH_EXISTS, MATCH_NOT_FOUND
+    (missing or inactive) and MATCH_OWN_DOG.
+    """
+    dog_from_id = int(dog_from_id)
+    dog_to_ids = list(dict.fromkeys(int(dog_id) for dog_id in dog_to_ids))
+    if len(dog_to_ids) > MAX_BULK_MATCH_TARGETS:
+        raise ValidationError(
+            f"Можно выбрать не более {MAX_BULK_MATCH_TARGETS} собак за раз."
+        )
+
+    dogs = Dog.objects.filter(
+        Q(pk=dog_from_id, owner=user) | Q(pk__in=dog_to_ids), is_active=True
+    ).values_list("pk", "owner_id", "name")
+    owners, names = {}, {}
+    for dog_id, owner_id, name in dogs:
+        owners[dog_id], names[dog_id] = owner_id, name
+    if owners.get(dog_from_id) != user.pk:
+        raise PermissionDenied("Нет доступа к исходной собаке.")
+
+    outcomes = {}
+    candidates = []
+    for dog_to_id in dog_to_ids:
+        if dog_to_id not in owners:
+            outcomes[dog_to_id] = MATCH_NOT_FOUND
+        elif owners[dog_to_id] == user.pk:
+            outcomes[dog_to_id] = MATCH_OWN_DOG
+        else:
+            candidates.append(dog_to_id)
+
+    # Пары (min_dog_id, max_dog_id) с исходной собакой ищутся по индексу пары
+    existing = set()
+    if candidates:
+        pairs = Match.objects.filter(
+            Q(min_dog_id=dog_from_id, max_dog_id__in=candidates)
+            | Q(max_dog_id=dog_from_id, min_dog_id__in=candidates)
+        ).values_list("min_dog_id", "max_dog_id")
+        existing = {low if high == dog_from_id else high for low, high in pairs}
+
+    new_ids = [dog_id for dog_id in candidates if dog_id not in existing]
+    with transaction.atomic():
+        new_ids = _insert_matches(
+            [
+                Match(
+                    dog_from_id=dog_from_id,
+                    dog_to_id=dog_id,
+                    from_owner_id=user.pk,
+                    to_owner_id=owners[dog_id],
+                    status="pending",
+                )
+                for dog_id in new_ids
+            ]
+        )
+        # bulk_create не отправляет post_save, поэтому счетчики, лента
+        # активности и кэш рекомендаций обновляются здесь и только для
+        # действительно вставленных мэтчей
+        record_matches_created((user.pk, owners[dog_id]) for dog_id in new_ids)
+        activity.record_matches_created(
+            (
+                dog_from_id,
+                names[dog_from_id],
+                dog_id,
+                names[dog_id],
+                user.pk,
+                owners[dog_id],
+            )
+            for dog_id in new_ids
+        )
+        # События всей пачки пишутся одним INSERT после коммита
+        record_match_events((dog_from_id, dog_id, "created") for dog_id in new_ids)
+        if new_ids:
+            bump_match_version(dog_from_id, *new_ids)
+
+    created = set(new_ids)
+    for dog_id in candidates:
+        outcomes[dog_id] = MATCH_CREATED if dog_id in created else MATCH_EXISTS
+    return {dog_id: outcomes[dog_id] for dog_id in dog_to_ids}
+
+
+def _insert_matches(matches) -> list[int]:
+    """Insert matches and return dog_to ids of the rows actually inserted.
+
+    The batch goes in with one bulk_create. If a concurrent request inserted
+    one of the pairs after the existence check, the unique constraint fails
+    the batch and each match is retried in its own savepoint, so the pairs
+    already taken are skipped and reported as existing.
+    """
+    if not matches:
+        return []
+    try:
+        with transaction.atomic():
+            Match.objects.bulk_create(matches)
+        return [match.dog_to_id for match in matches]
+    except IntegrityError:
+        pass
+
+    inserted = []
+    for match in matches:
+        try:
+            with transaction.atomic():
+                Match.objects.bulk_create([match])
+        except IntegrityError:
+            continue
+        inserted.append(match.dog_to_id)
+    return inserted
+
+
 def accept_match_for_user(user, match: Match) -> bool:
     """Accept a match if the user owns one of the dogs involved."""
     if match.dog_to.owner != user and match.dog_from.owner != user:
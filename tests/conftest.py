@@ -18,6 +18,7 @@ if not settings.configured:
 
 import pytest
 from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
 from django.test import Client
 
 from dogs.models import Dog, Favorite, Match, Message, UserProfile
@@ -461,6 +462,19 @@ def create_favorite():
 # ============================================================================
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Clear the cache around every test.
+
+    The database is rolled back after each test but the cache is not, so
+    cached dog list counts would otherwise leak into the next test.
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture(autouse=True)
 def enable_db_access_for_all_tests(db):
     """
@@ -5,11 +5,12 @@ Tests for AJAX endpoints like favorite toggle.
 """
 
 import json
+import re
 
 import pytest
 from django.urls import reverse
 
-from dogs.models import Favorite
+from dogs.models import Dog, Favorite, Match
 
 
 @pytest.mark.api
@@ -99,3 +100,115 @@ class TestToggleFavoriteEndpoint:
         )
         data3 = json.loads(response3.content)
         assert data3["is_favorite"] is True
+
+
+@pytest.mark.api
+class TestBulkCreateMatchesEndpoint:
+    """Test bulk match creation AJAX endpoint."""
+
+    def post(self, client, payload):
+        return client.post(
+            reverse("dogs:bulk_create_matches"),
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_requires_login(self, client, dog, other_dog):
+        response = self.post(client, {"dog_from": dog.pk, "dog_to": [other_dog.pk]})
+        assert response.status_code == 403
+
+    def test_requires_post(self, authenticated_client):
+        response = authenticated_client.get(reverse("dogs:bulk_create_matches"))
+        assert response.status_code == 403
+
+    def test_returns_per_target_results(self, authenticated_client, dog, other_dog):
+        response = self.post(
+            authenticated_client, {"dog_from": dog.pk, "dog_to": [other_dog.pk, 99999]}
+        )
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            "results": {str(other_dog.pk): "created", "99999": "not_found"}
+        }
+        assert Match.objects.filter(dog_from=dog, dog_to=other_dog).exists()
+
+    def test_foreign_source_dog_forbidden(self, authenticated_client, dog, other_dog):
+        response = self.post(
+            authenticated_client, {"dog_from": other_dog.pk, "dog_to": [dog.pk]}
+        )
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize(
+        "payload", [{}, {"dog_from": 1, "dog_to": 2}, {"dog_from": 1, "dog_to": ["x"]}]
+    )
+    def test_malformed_payload(self, authenticated_client, dog, payload):
+        response = self.post(authenticated_client, payload)
+        assert response.status_code == 400
+
+
+@pytest.mark.api
+class TestDogListBatchEndpoint:
+    """Test the infinite-scroll endpoint of the dog list."""
+
+    @pytest.fixture
+    def many_dogs(self, user):
+        return [
+            Dog.objects.create(
+                owner=user,
+                name=f"Dog{i}",
+                breed="Beagle",
+                age=3,
+                gender="M",
+                size="S" if i % 3 else "L",
+                looking_for="playmate",
+            )
+            for i in range(30)
+        ]
+
+    def fetch(self, client, **params):
+        response = client.get(reverse("dogs:dog_list_batch"), params)
+        assert response.status_code == 200
+        return json.loads(response.content)
+
+    @staticmethod
+    def card_ids(html):
+        return [int(pk) for pk in re.findall(r'href="/dogs/(\d+)/"', html)]
+
+    def test_cursor_walks_whole_list(self, client, many_dogs):
+        expected = [dog.pk for dog in sorted(many_dogs, key=lambda dog: dog.pk)][::-1]
+        seen = []
+        data = self.fetch(client)
+        seen += self.card_ids(data["html"])
+        while data["next_cursor"]:
+            data = self.fetch(client, cursor=data["next_cursor"])
+            seen += self.card_ids(data["html"])
+
+        assert seen == expected
+
+    def test_continues_after_dog_list_page(self, client, many_dogs):
+        response = client.get(reverse("dogs:dog_list"), {"size": "S"})
+        first_page = [dog.pk for dog in response.context["page_obj"]]
+
+        data = self.fetch(client, size="S", cursor=response.context["next_cursor"])
+
+        expected = Dog.objects.filter(size="S").order_by("-created_at", "-id")
+        assert first_page + self.card_ids(data["html"]) == [dog.pk for dog in expected]
+        assert data["next_cursor"] is None
+
+    def test_deep_batch_costs_one_query(
+        self, client, many_dogs, django_assert_num_queries
+    ):
+        cursor = self.fetch(client)["next_cursor"]
+        cursor = self.fetch(client, cursor=cursor)["next_cursor"]
+        with django_assert_num_queries(1):
+            self.fetch(client, cursor=cursor)
+
+    def test_no_cursor_for_text_search_page(self, client, many_dogs):
+        response = client.get(reverse("dogs:dog_list"), {"q": "beagle"})
+        assert response.context["page_obj"].has_next()
+        assert response.context["next_cursor"] is None
+
+    @pytest.mark.parametrize("params", [{"cursor": "garbage"}, {"age_min": "abc"}])
+    def test_bad_request(self, client, params):
+        response = client.get(reverse("dogs:dog_list_batch"), params)
+        assert response.status_code == 400
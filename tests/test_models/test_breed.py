@@ -0,0 +1,163 @@
+"""
+Tests for the Breed catalog
+
+Every spelling of a breed maps to one casefolded catalog row, dogs point at
+it through canonical_breed and dog_list searches the catalog instead of
+scanning Dog.breed with LIKE '%...%'.
+"""
+
+import importlib
+
+import pytest
+from django.apps import apps
+from django.db.models import F
+from django.urls import reverse
+
+from dogs.breeds import normalize_breed_name
+from dogs.models import Breed, Dog
+from dogs.utils import get_dog_list_queryset
+
+
+@pytest.fixture
+def make_dog(user):
+    def make(name, breed):
+        return Dog.objects.create(
+            owner=user,
+            name=name,
+            breed=breed,
+            age=3,
+            gender="M",
+            size="M",
+            looking_for="playmate",
+        )
+
+    return make
+
+
+@pytest.mark.unit
+def test_normalize_breed_name():
+    assert normalize_breed_name("  Немецкая   ОВЧАРКА ") == "немецкая овчарка"
+    assert normalize_breed_name("Жёсткошёрстный") == "жесткошерстный"
+    assert normalize_breed_name("") == ""
+
+
+@pytest.mark.models
+@pytest.mark.unit
+class TestBreedCatalog:
+    def test_spellings_share_one_breed(self, make_dog):
+        first = make_dog("A", "Лабрадор")
+        second = make_dog("B", " ЛАБРАДОР")
+
+        assert first.canonical_breed_id == second.canonical_breed_id
+        assert Breed.objects.get().name == "Лабрадор"
+
+    def test_breed_change_moves_dog(self, make_dog):
+        dog = make_dog("A", "Пудель")
+        dog.breed = "Бигль"
+        dog.save(update_fields=["breed"])
+
+        dog.refresh_from_db()
+        assert dog.canonical_breed.normalized_name == "бигль"
+
+    def test_unrelated_save_skips_catalog(self, make_dog, django_assert_num_queries):
+        dog = Dog.objects.get(pk=make_dog("A", "Пудель").pk)
+        dog.description = "Любит плавать"
+        with django_assert_num_queries(1):
+            dog.save()
+
+    def test_bulk_writes_resolve_breed(self, user, make_dog):
+        """bulk_create, bulk_update and update() keep canonical_breed in sync."""
+        make_dog("A", "Шпиц")
+        created = Dog.objects.bulk_create(
+            [
+                Dog(owner=user, name=name, breed=breed, age=2, gender="F", size="S")
+                for name, breed in [("B", "шпиц "), ("C", "Немецкий шпиц")]
+            ]
+        )
+        assert get_dog_list_queryset({"breed": "шпиц"}).count() == 3
+        assert created[0].canonical_breed.normalized_name == "шпиц"
+
+        poodle = make_dog("D", "Пудель")
+        poodle.breed = "Японский шпиц"
+        Dog.objects.bulk_update([poodle], ["breed"])
+        assert get_dog_list_queryset({"breed": "шпиц"}).count() == 4
+
+        Dog.objects.filter(pk=created[1].pk).update(breed="Мопс")
+        assert get_dog_list_queryset({"breed": "шпиц"}).count() == 3
+        assert get_dog_list_queryset({"breed": "мопс"}).get() == created[1]
+
+        with pytest.raises(ValueError):
+            Dog.objects.filter(pk=poodle.pk).update(breed=F("name"))
+
+    def test_bulk_create_resolves_each_spelling_once(
+        self, user, django_assert_num_queries
+    ):
+        dogs = [
+            Dog(owner=user, name=str(i), breed=breed, age=2, gender="F", size="S")
+            for i, breed in enumerate(["Корги", "корги", "КОРГИ "])
+        ]
+        # get_or_create для одной породы (SELECT, SAVEPOINT, INSERT, RELEASE)
+        # и один INSERT собак
+        with django_assert_num_queries(5):
+            Dog.objects.bulk_create(dogs)
+        assert Breed.objects.get().dogs.count() == 3
+
+    def test_search_prefers_prefix(self, make_dog):
+        make_dog("A", "Лабрадор")
+        make_dog("B", "Лабрадор-ретривер")
+        make_dog("C", "Золотистый ретривер")
+
+        found = Breed.objects.filter(pk__in=Breed.objects.search_ids("лабр"))
+        assert set(found.values_list("name", flat=True)) == {
+            "Лабрадор",
+            "Лабрадор-ретривер",
+        }
+
+    def test_search_returns_prefix_and_substring_matches(self, make_dog):
+        make_dog("A", "Йоркширский терьер")
+        make_dog("B", "Терьер-мини")
+        make_dog("C", "Пудель")
+
+        names = Breed.objects.filter(pk__in=Breed.objects.search_ids("терьер"))
+        assert set(names.values_list("name", flat=True)) == {
+            "Терьер-мини",
+            "Йоркширский терьер",
+        }
+        assert [breed.name for breed in Breed.objects.search("терьер")] == [
+            "Терьер-мини",
+            "Йоркширский терьер",
+        ]
+
+    def test_search_matches_substring(self, make_dog):
+        make_dog("A", "Лабрадор-ретривер")
+        make_dog("B", "Золотистый ретривер")
+        make_dog("C", "Пудель")
+
+        assert len(Breed.objects.search_ids("РЕТРИВЕР")) == 2
+        assert Breed.objects.search_ids("такса") == []
+        assert Breed.objects.search_ids("   ") == []
+
+    def test_backfill_migration(self, make_dog):
+        dogs = [make_dog("A", "Корги"), make_dog("B", "корги "), make_dog("C", "Мопс")]
+        Dog.objects.update(canonical_breed=None)
+        Breed.objects.all().delete()
+
+        migration = importlib.import_module("dogs.migrations.0012_breed_catalog")
+        migration.backfill_breed_catalog(apps, None)
+
+        assert Breed.objects.count() == 2
+        corgis = Dog.objects.filter(pk__in=[dog.pk for dog in dogs[:2]])
+        ids = set(corgis.values_list("canonical_breed_id", flat=True))
+        assert len(ids) == 1 and None not in ids
+
+
+@pytest.mark.views
+class TestDogListBreedSearch:
+    def test_case_insensitive_cyrillic_search(self, client, make_dog):
+        shepherd = make_dog("A", "Немецкая овчарка")
+        make_dog("B", "Пудель")
+
+        response = client.get(reverse("dogs:dog_list"), {"breed": "НЕМЕЦКАЯ"})
+
+        assert [dog.pk for dog in response.context["page_obj"]] == [shepherd.pk]
+        assert response.context["total_results"] == 1
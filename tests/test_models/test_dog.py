@@ -10,11 +10,20 @@ Tests all aspects of the Dog model including:
 - Edge cases
 """
 
+import itertools
+
 import pytest
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
+from django.db.models import F
 
 from dogs.models import Dog, Favorite, Match
+from dogs.scoring import BREED_SCORE
+from dogs.utils import (
+    calculate_dog_compatibility_score,
+    get_compatible_dogs,
+    get_compatible_dogs_queryset,
+)
 
 
 @pytest.mark.models
@@ -65,6 +74,44 @@ class TestDogModel:
         assert updated_dog.age == 4
         assert updated_dog.temperament == "calm and relaxed"
 
+    def test_temperament_flags_extracted_on_save(self, dog):
+        """Test temperament categories are stored as a bitmask on save."""
+        dog.temperament = "Дружелюбный и спокойный"
+        dog.save()
+        assert Dog.objects.get(id=dog.id).temperament_flags == 0b101
+
+        dog.temperament = "послушный"
+        dog.save(update_fields=["temperament"])
+        assert Dog.objects.get(id=dog.id).temperament_flags == 0b10000
+
+    def test_temperament_flags_follow_bulk_writes(self, user, dog):
+        """bulk_create, bulk_update and update() keep the bitmask in sync."""
+        created = Dog.objects.bulk_create(
+            [
+                Dog(
+                    owner=user,
+                    name="Bulk",
+                    breed="Mixed",
+                    age=2,
+                    gender="M",
+                    size="S",
+                    temperament="энергичный",
+                    looking_for="playmate",
+                )
+            ]
+        )[0]
+        assert Dog.objects.get(id=created.id).temperament_flags == 0b10
+
+        Dog.objects.filter(id=dog.id).update(temperament="спокойный")
+        assert Dog.objects.get(id=dog.id).temperament_flags == 0b100
+
+        dog.temperament = "послушный"
+        Dog.objects.bulk_update([dog], ["temperament"])
+        assert Dog.objects.get(id=dog.id).temperament_flags == 0b10000
+
+        with pytest.raises(ValueError):
+            Dog.objects.filter(id=dog.id).update(temperament=F("name"))
+
     def test_dog_deletion(self, dog):
         """Test deleting a dog."""
         dog_id = dog.id
@@ -450,6 +497,94 @@ class TestDogQuerysets:
         assert dogs[0].created_at >= dogs[len(dogs) - 1].created_at
 
 
+@pytest.mark.models
+@pytest.mark.unit
+class TestDogCompatibilityAnnotation:
+    """Test suite for Dog.objects.annotate_compatibility."""
+
+    @pytest.fixture
+    def dogs(self, user, user2):
+        dogs = []
+        combos = itertools.product(
+            [0, 2, 4, 7, 12, 20],
+            ["S", "M", "L"],
+            ["M", "F"],
+            ["playmate", "companion", "mate", "friendship"],
+            ["Labrador", "LABRADOR", "Лабрадор", "Poodle"],
+            ["", "дружелюбный энергичный", "спокойный", "защитный, послушный"],
+        )
+        for index, combo in enumerate(combos):
+            if index % 13:
+                continue
+            age, size, gender, goal, breed, temperament = combo
+            dogs.append(
+                Dog.objects.create(
+                    owner=user if index % 2 else user2,
+                    name=f"Dog{index}",
+                    age=age,
+                    size=size,
+                    gender=gender,
+                    looking_for=goal,
+                    breed=breed,
+                    temperament=temperament,
+                    description="",
+                )
+            )
+        return dogs
+
+    def test_matches_scalar_score(self, dogs):
+        """SQL scores equal calculate_dog_compatibility_score for every pair."""
+        for user_dog in dogs[::9]:
+            annotated = Dog.objects.annotate_compatibility(user_dog)
+            for dog in annotated:
+                assert dog.compatibility_score == calculate_dog_compatibility_score(
+                    user_dog, dog
+                )
+
+    @pytest.mark.parametrize("resolved", [True, False])
+    def test_cyrillic_breed_case_gets_breed_bonus(self, user, user2, resolved):
+        """Breeds are compared by catalog key, not by SQL LOWER."""
+        user_dog, same, other = [
+            Dog.objects.create(
+                owner=owner,
+                name=breed,
+                age=3,
+                size="M",
+                gender="M",
+                looking_for="playmate",
+                breed=breed,
+            )
+            for owner, breed in [
+                (user, "Лабрадор"),
+                (user2, " ЛАБРАДОР "),
+                (user2, "Пудель"),
+            ]
+        ]
+        if not resolved:
+            # Без ключа в каталоге порода собаки ищется подзапросом
+            user_dog.canonical_breed_id = None
+
+        scores = dict(
+            Dog.objects.annotate_compatibility(user_dog).values_list(
+                "pk", "compatibility_score"
+            )
+        )
+
+        assert scores[same.pk] - scores[other.pk] == BREED_SCORE
+        for dog in (same, other):
+            assert scores[dog.pk] == calculate_dog_compatibility_score(user_dog, dog)
+
+    def test_sql_ranking_matches_python_ranking(self, dogs):
+        """The database ranks and paginates exactly like get_compatible_dogs."""
+        user_dog = dogs[3]
+        assert list(get_compatible_dogs_queryset(user_dog)) == get_compatible_dogs(
+            user_dog
+        )
+        assert list(get_compatible_dogs_queryset(user_dog)[2:5]) == (
+            get_compatible_dogs(user_dog, limit=3, offset=2)
+        )
+
+
 @pytest.mark.models
 @pytest.mark.unit
 class TestDogEdgeCases:
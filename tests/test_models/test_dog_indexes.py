@@ -0,0 +1,107 @@
+"""
+Tests for the partial Dog indexes behind the dog list filters
+
+EXPLAIN tests run only against Postgres (TEST_DATABASE_URL=postgres://...).
+"""
+
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from dogs.management.commands.benchmark_dog_search import filter_combinations
+from dogs.models import Dog
+from dogs.search import SearchDocumentIndex
+from dogs.utils import get_dog_list_queryset
+
+
+@pytest.fixture
+def postgres(db):
+    if connection.vendor != "postgresql":
+        pytest.skip("EXPLAIN plans are checked on Postgres only")
+    with connection.cursor() as cursor:
+        # На маленькой тестовой таблице планировщик иначе выберет Seq Scan
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+
+@pytest.mark.unit
+def test_filter_combinations_cover_every_subset():
+    combinations = dict(filter_combinations())
+
+    assert len(combinations) == 32
+    assert combinations["no filters"] == {}
+    assert combinations["gender + size + age"] == {
+        "gender": "F",
+        "size": "L",
+        "age_min": 2,
+        "age_max": 5,
+    }
+    assert combinations["breed + q"] == {"breed": "шпиц", "q": "спокойный"}
+
+
+@pytest.mark.integration
+@pytest.mark.models
+class TestDogFilterIndexPlans:
+    @pytest.mark.parametrize(
+        "filters, index",
+        [
+            ({}, "idx_dog_active_created"),
+            (
+                {"size": "L", "gender": "F", "age_min": 2},
+                "idx_dog_active_size_gender_age",
+            ),
+            ({"gender": "F", "age_max": 5}, "idx_dog_active_gender_age"),
+        ],
+    )
+    def test_dog_list_filters_use_partial_index(self, postgres, filters, index):
+        plan = get_dog_list_queryset(filters)[:12].explain()
+        assert index in plan
+
+    def test_inactive_dogs_are_not_indexed(self, postgres):
+        plan = Dog.objects.filter(is_active=False, size="L").explain()
+        assert "idx_dog_active" not in plan
+
+
+@pytest.mark.unit
+def test_benchmark_command_requires_force_without_debug(settings):
+    settings.DEBUG = False
+    with pytest.raises(CommandError, match="--force"):
+        call_command("benchmark_dog_search", "--dogs", "1")
+    assert not Dog.objects.exists()
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+def test_benchmark_command_rolls_back(db):
+    out = io.StringIO()
+    call_command(
+        "benchmark_dog_search",
+        "--dogs",
+        "60",
+        "--batch-size",
+        "25",
+        "--repeat",
+        "2",
+        "--force",
+        stdout=out,
+    )
+
+    output = out.getvalue()
+    assert "Dataset: 60 dogs" in output
+    assert "gender + size + age:" in output
+    assert output.count("  after ") == 32
+    # Данные и удаленные на время замера индексы откатились
+    assert not Dog.objects.exists()
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Dog._meta.db_table
+        )
+    # Индекс полнотекстового поиска создается только в PostgreSQL
+    expected = {
+        index.name
+        for index in Dog._meta.indexes
+        if connection.vendor == "postgresql"
+        or not isinstance(index, SearchDocumentIndex)
+    }
+    assert expected <= set(constraints)
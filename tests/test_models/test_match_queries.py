@@ -0,0 +1,178 @@
+"""
+Tests for MatchQuerySet.for_owner
+
+The UNION query must return the same matches as the OR filter it replaces.
+EXPLAIN tests run only against Postgres (TEST_DATABASE_URL=postgres://...).
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q
+from django.urls import reverse
+
+from dogs.models import Dog, Match
+
+
+@pytest.fixture
+def owners(db):
+    return [
+        User.objects.create_user(username=f"owner{i}", password="pass123")
+        for i in range(4)
+    ]
+
+
+@pytest.fixture
+def matches(owners):
+    dogs = [
+        Dog.objects.create(
+            owner=owners[i % 4],
+            name=f"Dog{i}",
+            age=3,
+            breed="Beagle",
+            gender="M" if i % 2 else "F",
+            size="M",
+            looking_for="playmate",
+        )
+        for i in range(12)
+    ]
+    created = []
+    for index, dog_from in enumerate(dogs):
+        for dog_to in dogs[index + 1 : index + 4]:
+            status = ["pending", "accepted", "declined"][len(created) % 3]
+            created.append(
+                Match.objects.create(dog_from=dog_from, dog_to=dog_to, status=status)
+            )
+    # Мэтч между двумя собаками одного владельца не должен задваиваться
+    created.append(Match.objects.create(dog_from=dogs[0], dog_to=dogs[4]))
+    return created
+
+
+def _or_query(user):
+    return Match.objects.filter(Q(dog_from__owner=user) | Q(dog_to__owner=user))
+
+
+@pytest.mark.unit
+@pytest.mark.models
+class TestMatchForOwner:
+    """for_owner returns the same rows as the OR filter, ordered in SQL."""
+
+    def test_same_rows_as_or_filter(self, owners, matches):
+        for user in owners:
+            union = Match.objects.for_owner(user).order_by("-created_at", "-id")
+            expected = _or_query(user).order_by("-created_at", "-id")
+            assert list(union) == list(expected)
+            assert union.count() == expected.count()
+
+    def test_filters_and_select_related_apply_to_both_parts(
+        self, owners, matches, django_assert_num_queries
+    ):
+        user = owners[0]
+        union = (
+            Match.objects.filter(status="accepted")
+            .select_related("dog_from__owner", "dog_to__owner")
+            .for_owner(user)
+            .order_by("-created_at", "-id")
+        )
+        with django_assert_num_queries(1):
+            rows = [(m.pk, m.dog_from.owner.pk, m.dog_to.owner.pk) for m in union]
+        expected = _or_query(user).filter(status="accepted")
+        assert [pk for pk, *_ in rows] == list(
+            expected.order_by("-created_at", "-id").values_list("pk", flat=True)
+        )
+        assert all(user.pk in owner_ids for _, *owner_ids in rows)
+
+    def test_slicing_pages_in_sql(self, owners, matches):
+        ordered = list(_or_query(owners[1]).order_by("-created_at", "-id"))
+        page = Match.objects.for_owner(owners[1]).order_by("-created_at", "-id")[2:5]
+        assert list(page) == ordered[2:5]
+
+    def test_owner_ids_are_denormalized(self, owners, matches):
+        for match in Match.objects.select_related("dog_from", "dog_to"):
+            assert match.from_owner_id == match.dog_from.owner_id
+            assert match.to_owner_id == match.dog_to.owner_id
+
+    def test_bulk_create_fills_owner_ids(self, owners, matches):
+        dog_from = Dog.objects.filter(owner=owners[1]).first()
+        dog_to = Dog.objects.filter(owner=owners[2]).last()
+        Match.objects.filter(dog_from=dog_from, dog_to=dog_to).delete()
+
+        match = Match.objects.bulk_create([Match(dog_from=dog_from, dog_to=dog_to)])[0]
+        assert (match.from_owner_id, match.to_owner_id) == (owners[1].pk, owners[2].pk)
+
+    def test_status_save_does_not_load_dogs(
+        self, owners, matches, django_assert_num_queries
+    ):
+        match = Match.objects.get(pk=matches[0].pk)
+        match.status = "declined"
+        with django_assert_num_queries(1):
+            match.save()
+        with django_assert_num_queries(1):
+            match.save(update_fields=["status"])
+
+    def test_changed_dog_resolves_owners(self, owners, matches):
+        match = Match.objects.get(pk=matches[0].pk)
+        dog_to = Dog.objects.filter(owner=owners[3]).first()
+        Match.objects.filter(dog_from=match.dog_from_id, dog_to=dog_to).delete()
+
+        match.dog_to = dog_to
+        match.save(update_fields=["dog_to"])
+
+        match.refresh_from_db()
+        assert match.to_owner_id == owners[3].pk
+        assert match.max_dog_id == max(match.dog_from_id, dog_to.pk)
+
+    def test_owner_change_moves_matches(self, owners, matches):
+        dog = matches[0].dog_from
+        previous_owner = dog.owner
+        dog.owner = owners[3]
+        dog.save()
+
+        moved = Match.objects.filter(Q(dog_from=dog) | Q(dog_to=dog))
+        assert moved.exists()
+        assert not moved.filter(dog_from=dog).exclude(from_owner=owners[3]).exists()
+        assert not moved.filter(dog_to=dog).exclude(to_owner=owners[3]).exists()
+        assert set(Match.objects.for_owner(previous_owner)) == set(
+            _or_query(previous_owner)
+        )
+
+    def test_user_without_dogs(self, db):
+        user = User.objects.create_user(username="nodogs", password="pass123")
+        assert list(Match.objects.for_owner(user)) == []
+
+    def test_matches_list_view(self, client, owners, matches):
+        client.force_login(owners[0])
+        response = client.get(reverse("dogs:matches_list"))
+
+        assert response.status_code == 200
+        expected = _or_query(owners[0]).order_by("-created_at", "-id")[:10]
+        assert list(response.context["matches"]) == list(expected)
+
+
+@pytest.fixture
+def postgres(db):
+    if connection.vendor != "postgresql":
+        pytest.skip("EXPLAIN plans are checked on Postgres only")
+    with connection.cursor() as cursor:
+        # На маленькой тестовой таблице планировщик иначе выберет Seq Scan
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+
+@pytest.mark.integration
+@pytest.mark.models
+class TestMatchForOwnerPlans:
+    """Each UNION branch is answered from its own index."""
+
+    def test_union_uses_owner_indexes(self, postgres, owners, matches):
+        plan = Match.objects.for_owner(owners[0]).order_by("-created_at").explain()
+
+        assert "Seq Scan on dogs_match" not in plan
+        assert "idx_match_from_owner" in plan
+        assert "idx_match_to_owner" in plan
+
+    def test_status_filter_keeps_index_usage(self, postgres, owners, matches):
+        union = Match.objects.filter(status="pending").for_owner(owners[0])
+        plan = union.order_by("-created_at").explain()
+
+        assert "Seq Scan on dogs_match" not in plan
+        assert "dogs_dog" not in plan  # без соединений с Dog
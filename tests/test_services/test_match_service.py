@@ -6,12 +6,20 @@ Tests for match service functions with comprehensive coverage.
 
 import pytest
 from django.contrib.auth.models import User
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import PermissionDenied, ValidationError
 
-from dogs.models import Dog, Match
+from dogs.counters import reconcile_counters
+from dogs.models import Dog, Match, MatchEvent, UserMatchCounters
+from services import match_service
 from services.match_service import (
+    MATCH_CREATED,
+    MATCH_EXISTS,
+    MATCH_NOT_FOUND,
+    MATCH_OWN_DOG,
+    MAX_BULK_MATCH_TARGETS,
     accept_match_for_user,
     create_match_for_user,
+    create_matches_for_user,
     decline_match_for_user,
 )
 
@@ -143,6 +151,98 @@ class TestCreateMatchForUser:
             create_match_for_user(user1, dog1.id, 99999)
 
 
+@pytest.mark.unit
+@pytest.mark.services
+class TestCreateMatchesForUser:
+    """Test suite for the bulk create_matches_for_user function."""
+
+    def test_reports_outcome_per_target(
+        self, user, dog, dog2, other_dog, inactive_dog, multiple_dogs
+    ):
+        targets = [dog for dog in multiple_dogs if dog.owner_id != user.id]
+        Match.objects.create(dog_from=targets[0], dog_to=dog)
+
+        results = create_matches_for_user(
+            user,
+            dog.id,
+            [other_dog.id, targets[0].id, targets[1].id, dog2.id]
+            + [inactive_dog.id, 99999, other_dog.id],
+        )
+
+        assert results == {
+            other_dog.id: MATCH_CREATED,
+            targets[0].id: MATCH_EXISTS,
+            targets[1].id: MATCH_CREATED,
+            dog2.id: MATCH_OWN_DOG,
+            inactive_dog.id: MATCH_NOT_FOUND,
+            99999: MATCH_NOT_FOUND,
+        }
+        assert set(
+            Match.objects.filter(dog_from=dog).values_list("dog_to_id", flat=True)
+        ) == {other_dog.id, targets[1].id}
+
+    def test_query_count_does_not_grow_with_targets(
+        self, user, dog, multiple_dogs, django_assert_max_num_queries
+    ):
+        targets = [other.id for other in multiple_dogs if other.owner_id != user.id]
+        reconcile_counters()  # строки счетчиков уже существуют
+
+        # Вставка идет в точке сохранения: SAVEPOINT и RELEASE дают +2 запроса
+        with django_assert_max_num_queries(10):
+            results = create_matches_for_user(user, dog.id, targets)
+        assert set(results.values()) == {MATCH_CREATED}
+
+    def test_updates_counters(self, user, user2, dog, other_dog):
+        create_matches_for_user(user, dog.id, [other_dog.id])
+
+        assert UserMatchCounters.objects.get(pk=user.pk).pending_sent == 1
+        assert UserMatchCounters.objects.get(pk=user2.pk).pending_received == 1
+
+    def test_concurrently_created_pair_is_not_recorded(
+        self,
+        monkeypatch,
+        user,
+        user2,
+        dog,
+        other_dog,
+        django_capture_on_commit_callbacks,
+    ):
+        racer = Dog.objects.create(
+            owner=user2,
+            name="Гонщик",
+            breed="Дворняга",
+            age=2,
+            gender="M",
+            size="S",
+            looking_for="playmate",
+        )
+        insert_matches = match_service._insert_matches
+
+        def insert_after_race(matches):
+            # Параллельный запрос успел вставить ту же пару после проверки
+            Match.objects.bulk_create([Match(dog_from=dog, dog_to=racer)])
+            return insert_matches(matches)
+
+        monkeypatch.setattr(match_service, "_insert_matches", insert_after_race)
+        reconcile_counters()
+        with django_capture_on_commit_callbacks(execute=True):
+            results = create_matches_for_user(user, dog.id, [other_dog.id, racer.id])
+
+        assert results == {other_dog.id: MATCH_CREATED, racer.id: MATCH_EXISTS}
+        assert UserMatchCounters.objects.get(pk=user.pk).pending_sent == 1
+        assert list(MatchEvent.objects.values_list("dog_to_id", flat=True)) == [
+            other_dog.id
+        ]
+
+    def test_foreign_source_dog_raises(self, user, dog, other_dog):
+        with pytest.raises(PermissionDenied):
+            create_matches_for_user(user, other_dog.id, [dog.id])
+
+    def test_too_many_targets_raises(self, user, dog):
+        with pytest.raises(ValidationError):
+            create_matches_for_user(user, dog.id, range(1, MAX_BULK_MATCH_TARGETS + 2))
+
+
 @pytest.mark.unit
 @pytest.mark.services
 class TestAcceptMatchForUser:
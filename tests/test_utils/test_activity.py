@@ -0,0 +1,131 @@
+"""
+Tests for dogs/activity.py
+
+Feed rows are written when the event happens, one per affected user, and
+the retention command trims each feed to its newest entries.
+"""
+
+import io
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from dogs.activity import get_recent_activity, trim_activity_feeds
+from dogs.models import ActivityFeedEntry, Dog, Message
+from dogs.utils import accept_match, create_match, decline_match
+from services.favorites_service import toggle_favorite_for_user
+from services.match_service import create_matches_for_user
+
+
+@pytest.fixture
+def owners(db):
+    return [
+        User.objects.create_user(username=f"owner{i}", password="pass123")
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def dogs(owners):
+    return [
+        Dog.objects.create(
+            owner=owners[i],
+            name=f"Dog{i}",
+            age=3,
+            breed="Beagle",
+            gender="M" if i % 2 else "F",
+            size="M",
+            looking_for="playmate",
+        )
+        for i in range(3)
+    ]
+
+
+def _kinds(user):
+    return [entry.kind for entry in get_recent_activity(user, limit=50)]
+
+
+@pytest.mark.unit
+class TestActivityFanOut:
+    def test_match_created_for_both_owners(self, owners, dogs):
+        create_match(dogs[0], dogs[1])
+
+        assert _kinds(owners[0]) == ["match_sent"]
+        assert _kinds(owners[1]) == ["match_received"]
+        assert _kinds(owners[2]) == []
+        assert get_recent_activity(owners[0])[0].dog_id == dogs[1].pk
+
+    def test_accept_and_decline(self, owners, dogs):
+        accepted = create_match(dogs[0], dogs[1])
+        declined = create_match(dogs[2], dogs[0])
+        accept_match(accepted)
+        decline_match(declined)
+
+        assert _kinds(owners[0]) == [
+            "match_declined",
+            "match_accepted",
+            "match_received",
+            "match_sent",
+        ]
+        assert _kinds(owners[1])[0] == "match_accepted"
+        assert _kinds(owners[2])[0] == "match_declined"
+
+    def test_failed_transition_writes_nothing(self, owners, dogs):
+        match = create_match(dogs[0], dogs[1])
+        decline_match(match)
+        before = ActivityFeedEntry.objects.count()
+
+        assert not accept_match(match)
+        assert ActivityFeedEntry.objects.count() == before
+
+    def test_bulk_create_fans_out(self, owners, dogs):
+        create_matches_for_user(owners[0], dogs[0].pk, [dogs[1].pk, dogs[2].pk])
+
+        assert _kinds(owners[0]) == ["match_sent", "match_sent"]
+        assert _kinds(owners[1]) == ["match_received"]
+        assert _kinds(owners[2]) == ["match_received"]
+
+    def test_favorite_and_message(self, owners, dogs):
+        toggle_favorite_for_user(owners[0], dogs[1].pk)
+        toggle_favorite_for_user(owners[0], dogs[1].pk)
+        Message.objects.create(
+            sender=owners[1], receiver=owners[0], subject="Привет", content="..."
+        )
+
+        assert _kinds(owners[0]) == ["message_received", "favorite_added"]
+        assert _kinds(owners[1]) == ["message_sent"]
+
+    def test_read_is_single_query(self, owners, dogs, django_assert_num_queries):
+        create_match(dogs[0], dogs[1])
+        with django_assert_num_queries(1):
+            entries = get_recent_activity(owners[0])
+            assert entries[0].text == "Dog0 → Dog1: интерес отправлен"
+
+
+@pytest.mark.unit
+class TestTrimActivityFeeds:
+    @pytest.fixture
+    def feeds(self, owners):
+        ActivityFeedEntry.objects.bulk_create(
+            ActivityFeedEntry(user=owners[i % 2], kind="message_sent", text=str(i))
+            for i in range(25)
+        )
+
+    def test_keeps_newest_entries_per_user(self, owners, feeds):
+        newest = [e.pk for e in get_recent_activity(owners[0], limit=5)]
+
+        assert trim_activity_feeds(keep=5, batch_size=3) == 8 + 7
+        assert [e.pk for e in get_recent_activity(owners[0], limit=50)] == newest
+        assert ActivityFeedEntry.objects.filter(user=owners[1]).count() == 5
+
+    def test_keep_zero_clears_feeds(self, owners, feeds):
+        assert trim_activity_feeds(keep=0) == 25
+        assert not ActivityFeedEntry.objects.exists()
+
+    def test_command(self, owners, feeds):
+        out = io.StringIO()
+        call_command("trim_activity_feed", "--keep", "10", stdout=out)
+
+        assert ActivityFeedEntry.objects.count() == 20
+        assert "Deleted 5" in out.getvalue()
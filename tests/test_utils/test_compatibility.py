@@ -0,0 +1,200 @@
+"""
+Tests for dogs/compatibility.py and the DogCompatibility table.
+"""
+
+import io
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from dogs import compatibility, signals
+from dogs.compatibility import (
+    load_candidate_columns,
+    rebuild_compatibility_table,
+    refresh_dog_compatibility,
+)
+from dogs.models import Dog, DogCompatibility, Match
+from dogs.utils import get_compatible_dogs, get_precomputed_compatible_dogs
+
+
+def _pairs():
+    return set(DogCompatibility.objects.values_list("dog_id", "candidate_id", "score"))
+
+
+@pytest.mark.unit
+class TestCompatibilityTable:
+    """The table is maintained incrementally and matches a full rebuild."""
+
+    @pytest.fixture
+    def owners(self, db):
+        return [
+            User.objects.create_user(username=f"owner{i}", password="pass123")
+            for i in range(3)
+        ]
+
+    @pytest.fixture
+    def dogs(self, owners, django_capture_on_commit_callbacks):
+        dogs = []
+        # Таблица пересчитывается после коммита сохранения собаки
+        with django_capture_on_commit_callbacks(execute=True):
+            for i in range(12):
+                dogs.append(
+                    Dog.objects.create(
+                        owner=owners[i % 3],
+                        name=f"Dog{i}",
+                        age=i * 2 % 19,
+                        breed="Labrador" if i % 4 == 0 else "Poodle",
+                        gender="F" if i % 2 else "M",
+                        size=["S", "M", "L"][i % 3],
+                        temperament=["дружелюбный", "спокойный", ""][i % 3],
+                        looking_for=["playmate", "companion", "mate"][i % 3],
+                    )
+                )
+        return dogs
+
+    def test_incremental_matches_rebuild(self, dogs):
+        """Signals produce the same rows as a full rebuild."""
+        incremental = _pairs()
+        assert incremental
+
+        rebuild_compatibility_table(chunk_size=7)
+        assert _pairs() == incremental
+
+    def test_rows_are_symmetric(self, dogs):
+        pairs = {(dog_id, candidate_id) for dog_id, candidate_id, _ in _pairs()}
+        assert all((candidate, dog) in pairs for dog, candidate in pairs)
+
+    def test_scored_field_change_refreshes_dog(
+        self, dogs, django_capture_on_commit_callbacks
+    ):
+        dog = dogs[0]
+        dog.age = 18
+        with django_capture_on_commit_callbacks(execute=True):
+            dog.save()
+        refreshed = _pairs()
+
+        rebuild_compatibility_table()
+        assert _pairs() == refreshed
+
+    def test_refresh_waits_for_commit(self, dogs, django_capture_on_commit_callbacks):
+        before = _pairs()
+        dog = dogs[0]
+        dog.age = 18
+        with django_capture_on_commit_callbacks() as callbacks:
+            dog.save()
+
+        assert _pairs() == before
+        for callback in callbacks:
+            callback()
+        assert _pairs() != before
+
+    def test_refresh_can_be_left_to_rebuild(
+        self, settings, dogs, django_capture_on_commit_callbacks
+    ):
+        settings.DOG_COMPATIBILITY_REFRESH_ON_SAVE = False
+        before = _pairs()
+        dog = dogs[0]
+        dog.age = 18
+        with django_capture_on_commit_callbacks(execute=True):
+            dog.save()
+
+        assert _pairs() == before
+        rebuild_compatibility_table()
+        assert _pairs() != before
+
+    def test_deactivation_removes_rows(self, dogs, django_capture_on_commit_callbacks):
+        dog = dogs[0]
+        dog.is_active = False
+        with django_capture_on_commit_callbacks(execute=True):
+            dog.save()
+
+        assert not DogCompatibility.objects.filter(dog=dog).exists()
+        assert not DogCompatibility.objects.filter(candidate=dog).exists()
+
+    def test_refresh_upserts_pairs_written_concurrently(self, dogs, monkeypatch):
+        """A pair committed by another refresh after our delete is overwritten."""
+        expected = _pairs()
+        dog = dogs[0]
+        dog_id, candidate_id, score = next(
+            pair for pair in expected if pair[0] == dog.pk
+        )
+
+        def load_after_concurrent_insert(queryset):
+            DogCompatibility.objects.create(
+                dog_id=dog_id, candidate_id=candidate_id, score=score - 1
+            )
+            return load_candidate_columns(queryset)
+
+        monkeypatch.setattr(
+            compatibility, "load_candidate_columns", load_after_concurrent_insert
+        )
+        refresh_dog_compatibility(dog)
+        assert _pairs() == expected
+
+    def test_failed_refresh_does_not_break_commit(
+        self, dogs, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        def fail(dog_id):
+            raise RuntimeError("refresh failed")
+
+        monkeypatch.setattr(signals, "refresh_dog_compatibility_by_id", fail)
+        dog = dogs[0]
+        dog.age = 18
+        with django_capture_on_commit_callbacks(execute=True):
+            dog.save()
+        assert Dog.objects.get(pk=dog.pk).age == 18
+
+    def test_unrelated_change_does_not_touch_table(
+        self, dogs, django_assert_num_queries
+    ):
+        dog = Dog.objects.get(pk=dogs[0].pk)
+        dog.description = "Новое описание"
+        with django_assert_num_queries(1):
+            dog.save()
+
+    def test_precomputed_read_matches_live_scoring(self, dogs):
+        user_dog = dogs[1]
+        Match.objects.create(dog_from=user_dog, dog_to=dogs[2])
+
+        assert get_precomputed_compatible_dogs(user_dog) == get_compatible_dogs(
+            user_dog
+        )
+        assert get_precomputed_compatible_dogs(
+            user_dog, limit=3, offset=1
+        ) == get_compatible_dogs(user_dog, limit=3, offset=1)
+
+    @pytest.mark.slow
+    def test_parallel_rebuild_matches_serial(self, dogs):
+        """Process-pool shards produce the same rows as the serial rebuild."""
+        expected = _pairs()
+        processed = []
+
+        # 6 шардов при окне в 4: окно пополняется по мере готовности
+        total = rebuild_compatibility_table(
+            workers=2, shard_size=2, chunk_size=4, progress=processed.append
+        )
+        assert total == len(expected)
+        assert _pairs() == expected
+        assert len(processed) == 6 and processed[-1] == 12
+
+    def test_rebuild_reports_progress(self, dogs):
+        processed = []
+        rebuild_compatibility_table(shard_size=5, progress=processed.append)
+        assert processed == [5, 10, 12]
+
+    def test_rebuild_command(self, dogs):
+        expected = _pairs()
+        DogCompatibility.objects.all().delete()
+
+        out = io.StringIO()
+        call_command(
+            "rebuild_compatibility",
+            "--chunk-size",
+            "5",
+            "--shard-size",
+            "4",
+            stdout=out,
+        )
+        assert _pairs() == expected
+        assert "dogs/s" in out.getvalue()
@@ -0,0 +1,165 @@
+"""
+Tests for dogs/counters.py and the UserMatchCounters table.
+"""
+
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from dogs.counters import get_user_counters, reconcile_counters
+from dogs.models import Dog, Match, UserMatchCounters
+from dogs.utils import accept_match, create_match, decline_match, get_match_statistics
+from services.favorites_service import toggle_favorite_for_user
+
+
+def _counters(user):
+    counters = UserMatchCounters.objects.get(pk=user.pk)
+    return {field: getattr(counters, field) for field in counters.COUNTER_FIELDS}
+
+
+def _statistics(user):
+    stats = get_match_statistics(user)
+    del stats["total"]
+    stats["favorites"] = user.favorite_dogs.count()
+    return stats
+
+
+@pytest.fixture
+def third_dog(db, user3):
+    return Dog.objects.create(
+        owner=user3,
+        name="Rex",
+        breed="Beagle",
+        age=4,
+        gender="M",
+        size="S",
+        temperament="friendly",
+        looking_for="playmate",
+    )
+
+
+@pytest.mark.unit
+class TestUserMatchCounters:
+    """Counters follow match and favorite changes and agree with the data."""
+
+    def test_create_accept_decline(self, user, user2, user3, dog, other_dog, third_dog):
+        first = create_match(dog, other_dog)
+        second = create_match(third_dog, dog)
+        assert _counters(user)["pending_sent"] == 1
+        assert _counters(user)["pending_received"] == 1
+
+        accept_match(first)
+        decline_match(second)
+
+        for owner in (user, user2, user3):
+            assert _counters(owner) == _statistics(owner)
+        assert _counters(user)["accepted"] == 1
+        assert _counters(user)["declined"] == 1
+
+    def test_mutual_acceptance(self, user, user2, dog, other_dog):
+        match = create_match(dog, other_dog)
+        Match.objects.create(dog_from=other_dog, dog_to=dog)
+        reconcile_counters()
+
+        accept_match(match)
+
+        assert _counters(user) == _statistics(user)
+        assert _counters(user2) == _statistics(user2)
+        assert _counters(user2)["accepted"] == 2
+
+    def test_mutual_acceptance_without_counter_rows(self, user, user2, dog, other_dog):
+        # Мэтчи появились до таблицы счетчиков: строк для владельцев еще нет
+        match = Match.objects.create(dog_from=dog, dog_to=other_dog)
+        Match.objects.create(dog_from=other_dog, dog_to=dog)
+        UserMatchCounters.objects.all().delete()
+
+        accept_match(match)
+
+        for owner in (user, user2):
+            assert _counters(owner) == _statistics(owner)
+            assert _counters(owner)["pending_sent"] == 0
+            assert _counters(owner)["accepted"] == 2
+
+    def test_existing_match_is_not_counted_twice(self, user, dog, other_dog):
+        create_match(dog, other_dog)
+        create_match(other_dog, dog)
+        assert _counters(user)["pending_sent"] == 1
+
+    def test_toggle_favorite(self, user, other_dog):
+        toggle_favorite_for_user(user, other_dog.id)
+        assert _counters(user)["favorites"] == 1
+
+        toggle_favorite_for_user(user, other_dog.id)
+        assert _counters(user)["favorites"] == 0
+
+    def test_reconcile_repairs_drift(self, user, user2, dog, other_dog):
+        create_match(dog, other_dog)
+        UserMatchCounters.objects.filter(pk=user.pk).update(pending_sent=7)
+        UserMatchCounters.objects.filter(pk=user2.pk).delete()
+
+        assert reconcile_counters() == 2
+        assert _counters(user) == _statistics(user)
+        assert _counters(user2) == _statistics(user2)
+        assert reconcile_counters() == 0
+
+    def test_reconcile_command(self, user, dog, other_dog):
+        create_match(dog, other_dog)
+        UserMatchCounters.objects.all().delete()
+
+        out = io.StringIO()
+        call_command("reconcile_counters", stdout=out)
+
+        assert _counters(user) == _statistics(user)
+        assert "Repaired" in out.getvalue()
+
+    def test_deleted_dog_takes_its_counts_along(
+        self,
+        user,
+        user2,
+        user3,
+        dog,
+        other_dog,
+        third_dog,
+        django_capture_on_commit_callbacks,
+    ):
+        accept_match(create_match(dog, other_dog))
+        create_match(third_dog, other_dog)
+        toggle_favorite_for_user(user3, other_dog.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            other_dog.delete()
+
+        for owner in (user, user2, user3):
+            assert _counters(owner) == _statistics(owner)
+        assert _counters(user)["accepted"] == 0
+        assert _counters(user3)["pending_sent"] == 0
+        assert _counters(user3)["favorites"] == 0
+
+    def test_deleted_owner_leaves_no_counter_row(
+        self, user, user2, dog, other_dog, django_capture_on_commit_callbacks
+    ):
+        create_match(dog, other_dog)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user2.delete()
+
+        assert not UserMatchCounters.objects.filter(pk=user2.pk).exists()
+        assert _counters(user) == _statistics(user)
+        assert _counters(user)["pending_sent"] == 0
+
+    def test_get_user_counters_creates_row(self, user, dog, other_dog):
+        create_match(dog, other_dog)
+        UserMatchCounters.objects.all().delete()
+
+        assert get_user_counters(user).pending_sent == 1
+
+    def test_dashboard_reads_counters(self, authenticated_client, user, dog, other_dog):
+        create_match(dog, other_dog)
+        toggle_favorite_for_user(user, other_dog.id)
+
+        response = authenticated_client.get(reverse("dogs:dashboard"))
+
+        assert response.context["total_matches"] == 1
+        assert response.context["total_favorites"] == 1
@@ -12,9 +12,13 @@ import pytest
 from django.contrib.auth.models import User
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile
+from django.db import connection
+from django.db.models.signals import post_init
+from django.test.utils import CaptureQueriesContext
 from PIL import Image
 
 from dogs.models import Dog, Match
+from dogs.scoring import SCORING_FIELDS
 from dogs.utils import (
     accept_match,
     calculate_dog_compatibility_score,
@@ -22,11 +26,15 @@ from dogs.utils import (
     create_default_dog_image,
     create_match,
     decline_match,
+    get_bucket_filter,
+    get_candidate_queryset,
     get_compatible_dogs,
     get_match_statistics,
     get_mutual_matches,
     get_pending_matches,
     optimize_image,
+    rank_compatible_dog_ids,
+    top_compatible_dog_ids,
 )
 
 
@@ -337,6 +345,28 @@ class TestGetCompatibleDogs:
         compatible = get_compatible_dogs(my_dog, exclude_matches=True)
         assert other_dog not in compatible
 
+    def test_excludes_received_matches_in_one_query(
+        self, user2, my_dog, django_assert_num_queries
+    ):
+        """Matches in either direction are excluded inside a single query."""
+        sender = Dog.objects.create(
+            owner=user2,
+            name="Sender",
+            age=3,
+            breed="Breed",
+            gender="F",
+            size="M",
+            temperament="friendly",
+            looking_for="playmate",
+        )
+        Match.objects.create(dog_from=sender, dog_to=my_dog, status="pending")
+
+        with django_assert_num_queries(1):
+            candidate_ids = list(
+                get_candidate_queryset(my_dog).values_list("id", flat=True)
+            )
+        assert sender.id not in candidate_ids
+
     def test_includes_existing_matches_when_not_excluded(self, user2, my_dog):
         """Should include dogs with existing matches when exclude_matches=False."""
         other_dog = Dog.objects.create(
@@ -389,6 +419,141 @@ class TestGetCompatibleDogs:
             assert compatible.index(high_compat) < compatible.index(low_compat)
 
 
+@pytest.fixture
+def ranking_dog(db):
+    owner = User.objects.create_user(username="owner", password="pass123")
+    return Dog.objects.create(
+        owner=owner,
+        name="MyDog",
+        age=5,
+        breed="Labrador",
+        gender="M",
+        size="M",
+        temperament="дружелюбный",
+        looking_for="playmate",
+    )
+
+
+@pytest.fixture
+def ranking_candidates(db):
+    others = [
+        User.objects.create_user(username=f"other{i}", password="pass123")
+        for i in range(4)
+    ]
+    dogs = []
+    for i in range(24):
+        dogs.append(
+            Dog.objects.create(
+                owner=others[i % 4],
+                name=f"Dog{i}",
+                age=i % 15,
+                breed="Labrador" if i % 5 == 0 else "Poodle",
+                gender="F" if i % 2 else "M",
+                size=["S", "M", "L"][i % 3],
+                temperament=["дружелюбный", "спокойный", ""][i % 3],
+                looking_for=["playmate", "companion", "mate"][i % 3],
+            )
+        )
+    return dogs
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestGetCompatibleDogsTopK:
+    """Test suite for limit/offset in get_compatible_dogs."""
+
+    @pytest.mark.parametrize("limit,offset", [(1, 0), (5, 0), (5, 5), (50, 0)])
+    def test_limit_offset_match_full_ranking(
+        self, ranking_dog, ranking_candidates, limit, offset
+    ):
+        """A top-K page equals the same slice of the full ranking."""
+        full = get_compatible_dogs(ranking_dog)
+        page = get_compatible_dogs(ranking_dog, limit=limit, offset=offset)
+        assert page == full[offset : offset + limit]
+
+    def test_small_chunks_still_exact(self, ranking_dog, ranking_candidates):
+        """Early stop between small chunks does not drop better candidates."""
+        full = [dog.id for dog in get_compatible_dogs(ranking_dog)]
+        ranked = top_compatible_dog_ids(
+            ranking_dog, get_candidate_queryset(ranking_dog), limit=3, chunk_size=2
+        )
+        assert [dog_id for dog_id, score in ranked] == full[:3]
+
+    def test_zero_limit_returns_empty(self, ranking_dog, ranking_candidates):
+        assert get_compatible_dogs(ranking_dog, limit=0) == []
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestCandidateBuckets:
+    """Test suite for bucket pre-filtering by (size, looking_for, age band)."""
+
+    def test_default_threshold_prunes_nothing(self, ranking_dog, ranking_candidates):
+        """Every pair scores at least 30, so no bucket can be dropped."""
+        assert get_bucket_filter(ranking_dog, 30) is None
+
+    @pytest.mark.parametrize("min_score", [60, 70, 80, 95])
+    def test_buckets_keep_every_qualifying_dog(
+        self, ranking_dog, ranking_candidates, min_score
+    ):
+        """Bucketing drops rows without changing the result."""
+        expected = [
+            dog
+            for dog in get_compatible_dogs(ranking_dog)
+            if calculate_dog_compatibility_score(ranking_dog, dog) >= min_score
+        ]
+        assert get_compatible_dogs(ranking_dog, min_score=min_score) == expected
+        assert get_compatible_dogs(ranking_dog, limit=3, min_score=min_score) == (
+            expected[:3]
+        )
+
+    def test_selective_dog_fetches_fewer_rows(self, ranking_dog, ranking_candidates):
+        everything = get_candidate_queryset(ranking_dog).count()
+        selective = get_candidate_queryset(ranking_dog, min_score=80).count()
+        assert selective < everything
+
+
+@pytest.mark.unit
+@pytest.mark.utils
+class TestScoringProjection:
+    """Scoring reads plain tuples; Dog objects are built only for the page."""
+
+    @pytest.fixture
+    def instantiated(self):
+        created = []
+
+        def receiver(sender, instance, **kwargs):
+            created.append(instance)
+
+        post_init.connect(receiver, sender=Dog)
+        yield created
+        post_init.disconnect(receiver, sender=Dog)
+
+    @pytest.mark.parametrize("limit", [None, 4])
+    def test_only_final_page_is_hydrated(
+        self, ranking_dog, ranking_candidates, instantiated, limit
+    ):
+        dogs = get_compatible_dogs(ranking_dog, limit=limit)
+        assert dogs
+        assert len(instantiated) == len(dogs)
+
+    def test_scoring_query_skips_unused_columns(self, ranking_dog, ranking_candidates):
+        with CaptureQueriesContext(connection) as queries:
+            get_compatible_dogs(ranking_dog, limit=4)
+
+        # description выбирается только при загрузке итоговой страницы
+        hydrating = [query for query in queries if '"description"' in query["sql"]]
+        assert len(hydrating) == 1
+
+    def test_chunked_ranking_matches_single_chunk(
+        self, ranking_dog, ranking_candidates
+    ):
+        rows = list(get_candidate_queryset(ranking_dog).values_list(*SCORING_FIELDS))
+        assert rank_compatible_dog_ids(
+            ranking_dog, rows, chunk_size=5
+        ) == rank_compatible_dog_ids(ranking_dog, rows, chunk_size=len(rows))
+
+
 @pytest.mark.unit
 @pytest.mark.utils
 class TestMatchManagement:
@@ -492,6 +657,56 @@ class TestMatchManagement:
         result = decline_match(match)
         assert result is False
 
+    def test_pair_key_is_direction_independent(self, dog1, dog2):
+        """Both directions share the same (min_dog_id, max_dog_id) key."""
+        forward = Match.objects.create(dog_from=dog1, dog_to=dog2)
+        backward = Match.objects.bulk_create([Match(dog_from=dog2, dog_to=dog1)])[0]
+
+        expected = (min(dog1.id, dog2.id), max(dog1.id, dog2.id))
+        assert (forward.min_dog_id, forward.max_dog_id) == expected
+        assert (backward.min_dog_id, backward.max_dog_id) == expected
+        assert set(Match.objects.for_pair(dog2, dog1)) == {forward, backward}
+
+    def test_create_match_existing_single_query(
+        self, dog1, dog2, django_assert_num_queries
+    ):
+        match = create_match(dog2, dog1)
+        with django_assert_num_queries(1):
+            assert create_match(dog1, dog2) == match
+
+    def test_accept_mutual_updates_pair_in_one_statement(self, dog1, dog2):
+        match1 = create_match(dog1, dog2)
+        Match.objects.create(dog_from=dog2, dog_to=dog1)
+
+        with CaptureQueriesContext(connection) as queries:
+            accept_match(match1)
+
+        match_updates = [
+            query for query in queries if query["sql"].startswith('UPDATE "dogs_match"')
+        ]
+        assert len(match_updates) == 1
+        assert set(Match.objects.values_list("status", flat=True)) == {"accepted"}
+
+    def test_stale_match_cannot_transition_twice(self, dog1, dog2):
+        """The status check happens in the UPDATE, not on the loaded object."""
+        match = create_match(dog1, dog2)
+        stale = Match.objects.get(pk=match.pk)
+
+        assert decline_match(match) is True
+        assert accept_match(stale) is False
+        assert decline_match(stale) is False
+
+        stale.refresh_from_db()
+        assert stale.status == "declined"
+
+    def test_accept_leaves_declined_reverse(self, dog1, dog2):
+        match = create_match(dog1, dog2)
+        reverse = Match.objects.create(dog_from=dog2, dog_to=dog1, status="declined")
+
+        assert accept_match(match) is True
+        reverse.refresh_from_db()
+        assert reverse.status == "declined"
+
 
 @pytest.mark.unit
 @pytest.mark.utils
@@ -721,6 +936,48 @@ class TestMatchStatistics:
         # 1 accepted + 1 pending_received = 2 total
         assert stats["total"] >= 2
 
+    def test_statistics_single_query(
+        self, user1, user2, user3, dog1, django_assert_num_queries
+    ):
+        """All counters come from one aggregate query."""
+        dog2 = Dog.objects.create(
+            owner=user2,
+            name="Dog2",
+            age=3,
+            breed="Breed",
+            gender="F",
+            size="M",
+            temperament="friendly",
+            looking_for="playmate",
+        )
+        dog3 = Dog.objects.create(
+            owner=user3,
+            name="Dog3",
+            age=3,
+            breed="Breed",
+            gender="F",
+            size="M",
+            temperament="friendly",
+            looking_for="playmate",
+        )
+        accept_match(create_match(dog1, dog2))
+        create_match(dog3, dog1)
+        decline_match(create_match(dog2, dog3))
+
+        with django_assert_num_queries(1):
+            stats = get_match_statistics(user1)
+        assert stats == {
+            "pending_sent": 0,
+            "pending_received": 1,
+            "accepted": 1,
+            "declined": 0,
+            "total": 2,
+        }
+
+    def test_statistics_no_dogs_single_query(self, user2, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert get_match_statistics(user2)["total"] == 0
+
 
 @pytest.mark.unit
 @pytest.mark.utils
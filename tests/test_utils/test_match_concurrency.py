@@ -0,0 +1,118 @@
+"""
+Concurrency tests for accept_match/decline_match.
+
+Several threads race to accept and decline the same stale Match objects;
+the conditional UPDATE must let exactly one of them win. The threads need
+their own connections to a shared database, so the tests are skipped on
+the default in-memory SQLite. Run them with a file-backed database or
+against Postgres (TEST_DATABASE_URL=postgres://...):
+
+    TEST_SQLITE_FILE=/tmp/dogs_test.sqlite3 pytest -m concurrency
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection, connections
+
+from dogs.counters import reconcile_counters
+from dogs.models import Dog, Match
+from dogs.utils import accept_match, create_match, decline_match
+
+PAIRS = 5
+THREADS_PER_ACTION = 4
+
+pytestmark = [pytest.mark.concurrency, pytest.mark.slow]
+
+
+@pytest.fixture
+def shared_database(transactional_db):
+    if connection.vendor == "sqlite" and connection.is_in_memory_db():
+        pytest.skip("needs TEST_SQLITE_FILE or a Postgres test database")
+
+
+def _make_pairs():
+    owners = [
+        User.objects.create_user(username=f"racer{i}", password="pass123")
+        for i in range(2)
+    ]
+    pairs = []
+    for i in range(PAIRS):
+        dog_a, dog_b = (
+            Dog.objects.create(
+                owner=owner,
+                name=f"Racer{i}-{index}",
+                age=3,
+                breed="Beagle",
+                gender="M" if index else "F",
+                size="M",
+                looking_for="playmate",
+            )
+            for index, owner in enumerate(owners)
+        )
+        match = create_match(dog_a, dog_b)
+        Match.objects.create(dog_from=dog_b, dog_to=dog_a)
+        pairs.append(match)
+    reconcile_counters()
+    return pairs
+
+
+def _pair_statuses(match):
+    pair = Match.objects.for_pair(match.dog_from_id, match.dog_to_id)
+    return dict(pair.values_list("pk", "status"))
+
+
+def _race(calls):
+    barrier = threading.Barrier(len(calls))
+
+    def run(call):
+        action, match = call
+        try:
+            barrier.wait()
+            # Каждый поток получает устаревший объект со статусом pending
+            return action(Match.objects.get(pk=match.pk))
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        return list(pool.map(run, calls))
+
+
+@pytest.mark.usefixtures("shared_database")
+class TestMatchTransitionRaces:
+    """Concurrent transitions of the same match never both succeed."""
+
+    def test_exactly_one_transition_wins(self):
+        for match in _make_pairs():
+            calls = [(accept_match, match)] * THREADS_PER_ACTION + [
+                (decline_match, match)
+            ] * THREADS_PER_ACTION
+            results = _race(calls)
+
+            assert results.count(True) == 1
+            winner = calls[results.index(True)][0]
+            statuses = _pair_statuses(match)
+            if winner is accept_match:
+                assert set(statuses.values()) == {"accepted"}
+            else:
+                assert statuses.pop(match.pk) == "declined"
+                assert list(statuses.values()) == ["pending"]
+
+        # Каждый переход учтен в счетчиках ровно один раз
+        assert reconcile_counters() == 0
+
+    def test_concurrent_accepts_of_both_directions(self):
+        for match in _make_pairs():
+            reverse = Match.objects.get(
+                dog_from_id=match.dog_to_id, dog_to_id=match.dog_from_id
+            )
+            calls = [(accept_match, match), (accept_match, reverse)] * 2
+            results = _race(calls)
+
+            # Первое принятие принимает обе строки, остальные видят не pending
+            assert results.count(True) == 1
+            assert set(_pair_statuses(match).values()) == {"accepted"}
+
+        assert reconcile_counters() == 0
@@ -0,0 +1,171 @@
+"""
+Tests for dogs/match_events.py and the MatchEvent log.
+
+Events are written only when the surrounding transaction commits, with one
+bulk INSERT per recorded batch; the funnel streams the log back in chunks.
+"""
+
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from dogs.match_events import compute_match_funnel
+from dogs.models import Dog, MatchEvent
+from dogs.utils import accept_match, create_match, decline_match
+from services.match_service import create_matches_for_user
+
+
+def _events():
+    return list(
+        MatchEvent.objects.order_by("id").values_list(
+            "dog_from_id", "dog_to_id", "event"
+        )
+    )
+
+
+@pytest.fixture
+def third_dog(db, user3):
+    return Dog.objects.create(
+        owner=user3,
+        name="Rex",
+        breed="Beagle",
+        age=4,
+        gender="M",
+        size="S",
+        looking_for="playmate",
+    )
+
+
+@pytest.mark.unit
+class TestMatchEventLog:
+    def test_events_written_on_commit(
+        self, dog, other_dog, third_dog, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            accepted = create_match(dog, other_dog)
+            declined = create_match(dog, third_dog)
+            accept_match(accepted)
+            decline_match(declined)
+            assert not MatchEvent.objects.exists()
+
+        assert _events() == [
+            (dog.pk, other_dog.pk, "created"),
+            (dog.pk, third_dog.pk, "created"),
+            (dog.pk, other_dog.pk, "accepted"),
+            (dog.pk, third_dog.pk, "declined"),
+        ]
+
+    def test_bulk_service_flushes_with_one_insert(
+        self,
+        user,
+        dog,
+        other_dog,
+        third_dog,
+        django_capture_on_commit_callbacks,
+        django_assert_num_queries,
+    ):
+        with django_capture_on_commit_callbacks() as callbacks:
+            create_matches_for_user(user, dog.pk, [other_dog.pk, third_dog.pk])
+
+        with django_assert_num_queries(1):
+            callbacks[0]()
+        assert _events() == [
+            (dog.pk, other_dog.pk, "created"),
+            (dog.pk, third_dog.pk, "created"),
+        ]
+
+    def test_rolled_back_events_are_dropped(
+        self, dog, other_dog, third_dog, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    create_match(dog, other_dog)
+                    raise RuntimeError
+            create_match(dog, third_dog)
+
+        assert _events() == [(dog.pk, third_dog.pk, "created")]
+
+    def test_events_of_rolled_back_savepoint_are_dropped(
+        self, dog, other_dog, third_dog, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                create_match(dog, other_dog)
+                with pytest.raises(RuntimeError):
+                    with transaction.atomic():
+                        create_match(dog, third_dog)
+                        raise RuntimeError
+
+        assert _events() == [(dog.pk, other_dog.pk, "created")]
+
+    def test_failed_transition_records_nothing(
+        self, dog, other_dog, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            match = create_match(dog, other_dog)
+            decline_match(match)
+            assert not accept_match(match)
+
+        assert [event for _, _, event in _events()] == ["created", "declined"]
+
+
+@pytest.mark.unit
+class TestMatchFunnel:
+    @pytest.fixture
+    def log(self, db):
+        start = timezone.now() - timedelta(days=1)
+        events = []
+        for dog_to_id, outcome, seconds in [
+            (2, "accepted", 600),
+            (3, "accepted", 60),
+            (4, "declined", 30),
+            (5, None, None),
+            (6, "accepted", 120),
+        ]:
+            events.append(
+                MatchEvent(
+                    dog_from_id=1,
+                    dog_to_id=dog_to_id,
+                    event="created",
+                    created_at=start,
+                )
+            )
+            if outcome:
+                events.append(
+                    MatchEvent(
+                        dog_from_id=1,
+                        dog_to_id=dog_to_id,
+                        event=outcome,
+                        created_at=start + timedelta(seconds=seconds),
+                    )
+                )
+        # Ответ без события создания (мэтч старше журнала) не учитывается
+        events.append(MatchEvent(dog_from_id=7, dog_to_id=8, event="accepted"))
+        MatchEvent.objects.bulk_create(events)
+
+    def test_counts_and_latency_percentiles(self, log):
+        funnel = compute_match_funnel(chunk_size=2)
+
+        assert funnel["sent"] == 5
+        assert funnel["accepted"] == 3
+        assert funnel["declined"] == 1
+        assert funnel["pending"] == 1
+        assert funnel["accept_latency"] == {50: 120, 90: 600, 99: 600}
+
+    def test_empty_log(self, db):
+        funnel = compute_match_funnel()
+        assert funnel["sent"] == 0
+        assert funnel["accept_latency"] == {50: None, 90: None, 99: None}
+
+    def test_command(self, log):
+        out = io.StringIO()
+        call_command("match_funnel", "--chunk-size", "3", stdout=out)
+
+        output = out.getvalue()
+        assert "Accepted: 3 (60.0%)" in output
+        assert "Accept latency p50: 120s" in output
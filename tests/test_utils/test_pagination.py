@@ -0,0 +1,189 @@
+"""
+Tests for dogs/pagination.py
+
+Walking the cursor pages forwards and backwards must visit exactly the rows
+of the newest-first ordering, and ?page=N must keep working for old links.
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from dogs.models import Dog, Favorite, Match
+from dogs.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    paginate_by_cursor,
+)
+
+
+@pytest.fixture
+def owner(db):
+    return User.objects.create_user(username="owner", password="pass123")
+
+
+@pytest.fixture
+def dogs(db):
+    other = User.objects.create_user(username="other", password="pass123")
+    return [
+        Dog.objects.create(
+            owner=other,
+            name=f"Dog{i}",
+            age=3,
+            breed="Beagle",
+            gender="M",
+            size="M",
+            looking_for="playmate",
+        )
+        for i in range(25)
+    ]
+
+
+@pytest.fixture
+def favorites(owner, dogs):
+    favorites = [Favorite.objects.create(user=owner, dog=dog) for dog in dogs]
+    # Одинаковое время у части записей: порядок решает id
+    Favorite.objects.filter(pk__in=[f.pk for f in favorites[5:10]]).update(
+        created_at=favorites[5].created_at
+    )
+    return Favorite.objects.filter(user=owner).order_by("-created_at", "-id")
+
+
+def _walk_forward(queryset, per_page):
+    pages, cursor = [], None
+    while True:
+        page = paginate_by_cursor(queryset, cursor, per_page)
+        pages.append(page)
+        if not page.has_next():
+            return pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.unit
+class TestCursorEncoding:
+    def test_round_trip(self, favorites):
+        favorite = favorites.first()
+        cursor = encode_cursor(favorite.created_at, favorite.pk, "previous")
+        assert decode_cursor(cursor) == (favorite.created_at, favorite.pk, "previous")
+
+    @pytest.mark.parametrize("cursor", ["", "garbage", "W10", "WzEsMiwzXQ", "!!"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+
+
+@pytest.mark.unit
+class TestPaginateByCursor:
+    def test_forward_walk_visits_every_row_once(self, favorites):
+        pages = _walk_forward(Favorite.objects.filter(user=favorites[0].user), 7)
+
+        assert [len(page) for page in pages] == [7, 7, 7, 4]
+        assert [f for page in pages for f in page] == list(favorites)
+        assert not pages[0].has_previous()
+        assert all(page.has_previous() for page in pages[1:])
+
+    def test_backward_walk_returns_previous_pages(self, favorites):
+        queryset = Favorite.objects.filter(user=favorites[0].user)
+        pages = _walk_forward(queryset, 7)
+
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = paginate_by_cursor(queryset, page.previous_cursor, 7)
+            assert page.object_list == expected.object_list
+            assert page.has_next()
+        assert not page.has_previous()
+
+    def test_page_is_single_query_without_count(
+        self, favorites, django_assert_num_queries
+    ):
+        queryset = Favorite.objects.filter(user=favorites[0].user)
+        first = paginate_by_cursor(queryset, None, 10)
+
+        with django_assert_num_queries(1) as captured:
+            paginate_by_cursor(queryset, first.next_cursor, 10)
+        sql = captured.captured_queries[0]["sql"].upper()
+        assert "COUNT(" not in sql
+        assert "OFFSET" not in sql
+
+    def test_combine_applies_filter_before_union(self, owner, dogs):
+        mine = Dog.objects.create(
+            owner=owner,
+            name="Mine",
+            age=3,
+            breed="Beagle",
+            gender="F",
+            size="M",
+            looking_for="playmate",
+        )
+        for index, dog in enumerate(dogs[:12]):
+            if index % 2:
+                Match.objects.create(dog_from=mine, dog_to=dog)
+            else:
+                Match.objects.create(dog_from=dog, dog_to=mine)
+
+        pages, cursor = [], None
+        while cursor is not None or not pages:
+            page = paginate_by_cursor(
+                Match.objects.all(),
+                cursor,
+                5,
+                combine=lambda matches: matches.for_owner(owner),
+            )
+            pages.append(page)
+            cursor = page.next_cursor
+
+        expected = Match.objects.filter(dog_from__owner=owner) | Match.objects.filter(
+            dog_to__owner=owner
+        )
+        assert [m for page in pages for m in page] == list(
+            expected.order_by("-created_at", "-id")
+        )
+
+
+@pytest.mark.unit
+class TestListViewsPagination:
+    def test_favorites_cursor_mode(self, client, owner, favorites):
+        client.force_login(owner)
+        url = reverse("dogs:favorites_list")
+
+        first = client.get(url).context["page_obj"]
+        second = client.get(url, {"cursor": first.next_cursor}).context["page_obj"]
+
+        assert list(first) + list(second) == list(favorites[:24])
+        assert second.has_next()
+
+    def test_favorites_page_number_mode_still_works(self, client, owner, favorites):
+        client.force_login(owner)
+        response = client.get(reverse("dogs:favorites_list"), {"page": 2})
+
+        page_obj = response.context["page_obj"]
+        assert page_obj.number == 2
+        assert list(page_obj.object_list) == list(favorites[12:24])
+
+    def test_invalid_cursor_falls_back_to_first_page(self, client, owner, favorites):
+        client.force_login(owner)
+        response = client.get(reverse("dogs:favorites_list"), {"cursor": "garbage"})
+
+        assert response.status_code == 200
+        assert list(response.context["page_obj"]) == list(favorites[:12])
+
+    def test_matches_cursor_links_rendered(self, client, owner, dogs):
+        mine = Dog.objects.create(
+            owner=owner,
+            name="Mine",
+            age=3,
+            breed="Beagle",
+            gender="F",
+            size="M",
+            looking_for="playmate",
+        )
+        for dog in dogs[:11]:
+            Match.objects.create(dog_from=mine, dog_to=dog)
+        client.force_login(owner)
+
+        response = client.get(reverse("dogs:matches_list"))
+        page_obj = response.context["page_obj"]
+
+        assert len(page_obj) == 10
+        assert f"?cursor={page_obj.next_cursor}" in response.content.decode()
@@ -0,0 +1,174 @@
+"""
+Tests for dogs/recommendation_cache.py
+"""
+
+import io
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+
+from dogs.checks import check_shared_cache
+from dogs.models import Dog, Match
+from dogs.recommendation_cache import (
+    get_cached_compatible_dogs,
+    get_recommendation_cache_stats,
+)
+from dogs.utils import get_compatible_dogs
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.unit
+class TestRecommendationCache:
+    """Cached recommendations equal live ones and never go stale."""
+
+    @pytest.fixture
+    def user_dog(self, db):
+        owner = User.objects.create_user(username="owner", password="pass123")
+        return Dog.objects.create(
+            owner=owner,
+            name="Mine",
+            age=4,
+            breed="Labrador",
+            gender="M",
+            size="M",
+            temperament="дружелюбный",
+            looking_for="playmate",
+        )
+
+    @pytest.fixture
+    def candidates(self, db):
+        other = User.objects.create_user(username="other", password="pass123")
+        return [
+            Dog.objects.create(
+                owner=other,
+                name=f"Dog{i}",
+                age=2 + i,
+                breed="Poodle",
+                gender="F" if i % 2 else "M",
+                size=["S", "M", "L"][i % 3],
+                looking_for="playmate",
+            )
+            for i in range(6)
+        ]
+
+    def test_second_lookup_is_a_hit(self, user_dog, candidates):
+        first = get_cached_compatible_dogs(user_dog)
+        second = get_cached_compatible_dogs(user_dog)
+
+        assert first == second == get_compatible_dogs(user_dog)
+        stats = get_recommendation_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_ratio"] == 0.5
+
+    def test_hit_runs_only_hydration_query(
+        self, user_dog, candidates, django_assert_num_queries
+    ):
+        get_cached_compatible_dogs(user_dog)
+        with django_assert_num_queries(1):
+            get_cached_compatible_dogs(user_dog, limit=2, offset=1)
+
+    def test_page_matches_live(self, user_dog, candidates):
+        assert get_cached_compatible_dogs(
+            user_dog, limit=3, offset=1
+        ) == get_compatible_dogs(user_dog, limit=3, offset=1)
+
+    def test_dog_save_invalidates(
+        self, user_dog, candidates, django_capture_on_commit_callbacks
+    ):
+        get_cached_compatible_dogs(user_dog)
+        candidates[0].is_active = False
+        with django_capture_on_commit_callbacks(execute=True):
+            candidates[0].save()
+
+        assert candidates[0] not in get_cached_compatible_dogs(user_dog)
+        assert get_recommendation_cache_stats()["misses"] == 2
+
+    def test_dog_delete_invalidates(
+        self, user_dog, candidates, django_capture_on_commit_callbacks
+    ):
+        get_cached_compatible_dogs(user_dog)
+        with django_capture_on_commit_callbacks(execute=True):
+            candidates[1].delete()
+
+        assert get_cached_compatible_dogs(user_dog) == get_compatible_dogs(user_dog)
+        assert get_recommendation_cache_stats()["misses"] == 2
+
+    def test_match_creation_invalidates_both_dogs(
+        self, user_dog, candidates, django_capture_on_commit_callbacks
+    ):
+        target = candidates[0]
+        get_cached_compatible_dogs(user_dog)
+        get_cached_compatible_dogs(target)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Match.objects.create(dog_from=user_dog, dog_to=target)
+
+        assert target not in get_cached_compatible_dogs(user_dog)
+        assert user_dog not in get_cached_compatible_dogs(target)
+
+    def test_version_is_bumped_on_commit(
+        self, user_dog, candidates, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                candidates[0].is_active = False
+                candidates[0].save()
+                # Список, посчитанный до коммита, сбрасывается самим коммитом
+                get_cached_compatible_dogs(user_dog)
+
+        get_cached_compatible_dogs(user_dog)
+        assert get_recommendation_cache_stats()["misses"] == 2
+
+    def test_rolled_back_change_keeps_entry(self, user_dog, candidates):
+        get_cached_compatible_dogs(user_dog)
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Match.objects.create(dog_from=user_dog, dog_to=candidates[0])
+                raise RuntimeError
+
+        get_cached_compatible_dogs(user_dog)
+        assert get_recommendation_cache_stats()["hits"] == 1
+
+    def test_unrelated_match_keeps_entry(self, user_dog, candidates):
+        get_cached_compatible_dogs(user_dog)
+        Match.objects.create(dog_from=candidates[0], dog_to=candidates[1])
+
+        get_cached_compatible_dogs(user_dog)
+        assert get_recommendation_cache_stats()["hits"] == 1
+
+    def test_stats_command(self, user_dog, candidates):
+        get_cached_compatible_dogs(user_dog)
+        out = io.StringIO()
+        call_command("recommendation_cache_stats", "--reset", stdout=out)
+
+        assert "misses: 1" in out.getvalue()
+        assert get_recommendation_cache_stats()["misses"] == 0
+
+
+@pytest.mark.unit
+class TestSharedCacheCheck:
+    def test_warns_about_process_local_cache(self, settings):
+        settings.DEBUG = False
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        assert [warning.id for warning in check_shared_cache(None)] == ["dogs.W001"]
+
+    def test_shared_cache_passes(self, settings):
+        settings.DEBUG = False
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "dogs_cache",
+            }
+        }
+        assert check_shared_cache(None) == []
@@ -0,0 +1,120 @@
+"""
+Tests for dogs/result_counts.py and CountedPaginator
+
+dog_list counts its results once per request and reuses cached counts for
+the same normalized filters until a dog is saved or deleted.
+"""
+
+import pytest
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from dogs.models import Dog
+from dogs.pagination import CountedPaginator
+from dogs.result_counts import (
+    COUNT_VERSION_KEY,
+    estimate_count,
+    filter_signature,
+    get_dog_list_count,
+)
+
+
+def _count_queries(client, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("dogs:dog_list"), params or {})
+    counts = [q for q in queries.captured_queries if 'AS "__count"' in q["sql"]]
+    return response, len(counts)
+
+
+@pytest.mark.unit
+def test_filter_signature_normalizes_free_text():
+    assert filter_signature({"breed": "Лабрадор", "q": "Спокойный  пес"}) == (
+        filter_signature({"breed": " лабрадор ", "q": "спокойный пес", "size": ""})
+    )
+    assert filter_signature({}) == filter_signature({"gender": "", "age_min": None})
+    assert filter_signature({"age_min": 0}) != filter_signature({})
+    assert filter_signature({"size": "S"}) != filter_signature({"size": "L"})
+
+
+@pytest.mark.unit
+def test_counted_paginator_does_not_count(django_assert_num_queries):
+    paginator = CountedPaginator(Dog.objects.all(), 12, 30, is_estimate=True)
+
+    with django_assert_num_queries(0):
+        assert paginator.num_pages == 3
+        assert list(paginator.page_range) == [1, 2, 3]
+    assert paginator.is_estimate
+
+
+@pytest.mark.views
+class TestDogListCount:
+    def test_counts_once_and_reuses_cache(self, client, multiple_dogs):
+        response, counts = _count_queries(client, {"size": "M"})
+        assert counts == 1
+        assert (
+            response.context["total_results"]
+            == Dog.objects.filter(is_active=True, size="M").count()
+        )
+
+        response, counts = _count_queries(client, {"size": "M", "breed": ""})
+        assert counts == 0
+        assert not response.context["page_obj"].paginator.is_estimate
+
+    def test_saved_dog_invalidates_counts(
+        self, client, dog, inactive_dog, django_capture_on_commit_callbacks
+    ):
+        response, _ = _count_queries(client)
+        assert response.context["total_results"] == 1
+
+        inactive_dog.is_active = True
+        with django_capture_on_commit_callbacks(execute=True):
+            inactive_dog.save()
+
+        response, counts = _count_queries(client)
+        assert counts == 1
+        assert response.context["total_results"] == 2
+
+    def test_version_is_shared_through_database_cache(
+        self, settings, client, dog, inactive_dog, django_capture_on_commit_callbacks
+    ):
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "dogs_cache",
+            }
+        }
+        call_command("createcachetable", verbosity=0)
+        # Отдельный экземпляр бэкенда — как кэш в соседнем воркере
+        other_worker = DatabaseCache("dogs_cache", {})
+
+        response, _ = _count_queries(client)
+        assert response.context["total_results"] == 1
+        version = other_worker.get(COUNT_VERSION_KEY)
+        assert version is not None
+
+        inactive_dog.is_active = True
+        with django_capture_on_commit_callbacks(execute=True):
+            inactive_dog.save()
+
+        assert other_worker.get(COUNT_VERSION_KEY) == version + 1
+
+    def test_exact_count_off_postgres(self, dog):
+        if connection.vendor == "postgresql":
+            pytest.skip("PostgreSQL reports planner estimates")
+        assert estimate_count(Dog.objects.all()) is None
+        assert get_dog_list_count(Dog.objects.all(), {}) == (1, False)
+
+
+@pytest.mark.integration
+def test_large_results_use_planner_estimate(settings, multiple_dogs):
+    if connection.vendor != "postgresql":
+        pytest.skip("Planner estimates are read on Postgres only")
+    settings.DOG_LIST_ESTIMATED_COUNT_THRESHOLD = 0
+
+    count, is_estimate = get_dog_list_count(Dog.objects.filter(is_active=True), {})
+
+    assert is_estimate
+    assert count == estimate_count(Dog.objects.filter(is_active=True))
@@ -0,0 +1,139 @@
+"""
+Tests for dogs/scoring.py
+
+The batch scorer must return exactly what calculate_dog_compatibility_score
+returns for every pair, and both must agree with the temperament rules
+that used to scan the text directly.
+"""
+
+import itertools
+
+import pytest
+from django.contrib.auth.models import User
+
+from dogs.models import Dog
+from dogs.scoring import (
+    TEMPERAMENT_SCORES,
+    CandidateColumns,
+    dog_scoring_row,
+    extract_temperament_flags,
+    score_candidates,
+)
+from dogs.utils import calculate_dog_compatibility_score, get_compatible_dogs
+
+TEMPERAMENTS = [
+    "",
+    "friendly",
+    "дружелюбный",
+    "Дружелюбный энергичный",
+    "спокойный и послушный",
+    "защитный, дружелюбный, энергичный, спокойный, послушный",
+    "энергичный",
+]
+
+
+def _make_dogs():
+    dogs = []
+    combos = itertools.product(
+        [0, 1, 3, 6, 9, 15, 20],
+        ["S", "M", "L"],
+        ["M", "F"],
+        ["playmate", "companion", "mate", "friendship"],
+        ["Labrador", "labrador", "Poodle"],
+        TEMPERAMENTS,
+    )
+    for index, (age, size, gender, goal, breed, temperament) in enumerate(combos):
+        if index % 7:
+            continue
+        dogs.append(
+            Dog(
+                id=index + 1,
+                age=age,
+                size=size,
+                gender=gender,
+                looking_for=goal,
+                breed=breed,
+                temperament=temperament,
+                temperament_flags=extract_temperament_flags(temperament),
+            )
+        )
+    return dogs
+
+
+@pytest.mark.unit
+class TestBatchScoring:
+    """Parity between the batch scorer and the scalar function."""
+
+    def test_temperament_flags(self):
+        assert extract_temperament_flags("") == 0
+        assert extract_temperament_flags("Дружелюбный") == 0b1
+        assert extract_temperament_flags("энергичный, послушный") == 0b10010
+
+    def test_matches_scalar_for_all_pairs(self):
+        dogs = _make_dogs()
+        columns = CandidateColumns.from_rows(dog_scoring_row(dog) for dog in dogs)
+
+        for user_dog in dogs[::11]:
+            scores = score_candidates(dog_scoring_row(user_dog), columns)
+            expected = [
+                calculate_dog_compatibility_score(user_dog, dog) for dog in dogs
+            ]
+            assert scores == expected
+
+    def test_temperament_table_matches_text_rules(self):
+        """The lookup table reproduces the original keyword scan."""
+        keywords = ["дружелюбный", "энергичный", "спокойный", "защитный", "послушный"]
+
+        def text_score(text1, text2):
+            score = 0
+            for word1 in keywords:
+                if word1 in text1.lower():
+                    for word2 in keywords:
+                        if word2 in text2.lower():
+                            if word1 == word2:
+                                score += 7.5
+                            elif word1 in keywords[:2] and word2 in keywords[:2]:
+                                score += 5
+            return min(score, 15)
+
+        for text1, text2 in itertools.product(TEMPERAMENTS, repeat=2):
+            flags1 = extract_temperament_flags(text1)
+            flags2 = extract_temperament_flags(text2)
+            assert TEMPERAMENT_SCORES[flags1][flags2] == text_score(text1, text2)
+
+    def test_self_scores_zero(self):
+        dog = _make_dogs()[0]
+        columns = CandidateColumns.from_rows([dog_scoring_row(dog)])
+        assert score_candidates(dog_scoring_row(dog), columns) == [0]
+
+
+@pytest.mark.unit
+class TestGetCompatibleDogsBatch:
+    """get_compatible_dogs returns the same ranking with and without batching."""
+
+    def test_batch_and_scalar_rankings_match(self, db):
+        owner = User.objects.create_user(username="owner", password="pass123")
+        others = [
+            User.objects.create_user(username=f"other{i}", password="pass123")
+            for i in range(3)
+        ]
+        my_dog = Dog.objects.create(
+            owner=owner,
+            name="Mine",
+            age=4,
+            breed="Labrador",
+            gender="M",
+            size="M",
+            temperament="дружелюбный",
+            looking_for="playmate",
+        )
+        for index, dog in enumerate(_make_dogs()[:30]):
+            dog.id = None
+            dog.owner = others[index % 3]
+            dog.name = f"Dog{index}"
+            dog.save()
+
+        batch = get_compatible_dogs(my_dog)
+        scalar = get_compatible_dogs(my_dog, use_batch=False)
+
+        assert [dog.id for dog in batch] == [dog.id for dog in scalar]
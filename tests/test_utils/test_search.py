@@ -0,0 +1,171 @@
+"""
+Tests for dogs/search.py
+
+On SQLite the FTS5 shadow table is maintained by triggers; the EXPLAIN test
+runs only against Postgres (TEST_DATABASE_URL=postgres://...).
+"""
+
+from urllib.parse import urlencode
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from dogs.models import Dog
+from dogs.search import (
+    FTS_TABLE,
+    SQLITE_TRIGGERS,
+    fts5_query,
+    install_sqlite_search_index,
+    search_dogs,
+)
+
+
+@pytest.fixture
+def make_dog(user):
+    def make(name, breed="Дворняга", temperament="", description="", **extra):
+        return Dog.objects.create(
+            owner=user,
+            name=name,
+            breed=breed,
+            age=3,
+            gender="M",
+            size="M",
+            temperament=temperament,
+            looking_for="playmate",
+            description=description,
+            **extra,
+        )
+
+    return make
+
+
+def _found(text):
+    return [dog.name for dog in search_dogs(Dog.objects.all(), text)]
+
+
+@pytest.mark.unit
+def test_fts5_query_quotes_every_word():
+    assert fts5_query('спокойный "лабрадор" OR NEAR(') == (
+        '"спокойный"* "лабрадор"* "OR"* "NEAR"*'
+    )
+    assert fts5_query(" ,.- ") == ""
+
+
+@pytest.mark.unit
+class TestSearchDogs:
+    def test_matches_all_words_across_fields(self, make_dog):
+        make_dog("Бобик", breed="Лабрадор", temperament="Спокойный, послушный")
+        make_dog("Шарик", breed="Пудель", temperament="спокойный")
+        make_dog("Рекс", breed="Лабрадор", temperament="энергичный")
+
+        assert _found("спокойный лабрадор") == ["Бобик"]
+        assert set(_found("СПОКОЙНЫЙ")) == {"Бобик", "Шарик"}
+
+    def test_ranks_name_and_breed_above_description(self, make_dog):
+        make_dog("Тихоня", description="Соседский лабрадор научил его плавать")
+        make_dog("Граф", breed="Лабрадор")
+
+        assert _found("лабрадор") == ["Граф", "Тихоня"]
+
+    def test_index_follows_saves_and_deletes(self, make_dog):
+        dog = make_dog("Бобик", description="Любит плавать")
+        assert _found("плавать") == ["Бобик"]
+
+        dog.description = "Боится воды"
+        dog.save()
+        assert _found("плавать") == []
+        assert _found("воды") == ["Бобик"]
+
+        # Триггеры видят и запросы в обход save()
+        Dog.objects.filter(pk=dog.pk).update(name="Барбос")
+        assert _found("барбос") == ["Барбос"]
+
+        dog.delete()
+        assert _found("воды") == []
+
+    def test_combines_with_other_filters(self, make_dog):
+        make_dog("Бобик", temperament="спокойный")
+        make_dog("Шарик", temperament="спокойный", is_active=False)
+
+        active = Dog.objects.filter(is_active=True)
+        assert [dog.name for dog in search_dogs(active, "спокойный")] == ["Бобик"]
+
+    def test_empty_query_matches_nothing(self, make_dog):
+        make_dog("Бобик")
+        assert _found("!!!") == []
+
+
+@pytest.mark.unit
+def test_ranking_survives_subquery(make_dog):
+    """The rank is correlated with the row being ranked, whatever its alias."""
+    best = make_dog("Граф", breed="Лабрадор")
+    make_dog("Тихоня", description="Соседский лабрадор")
+
+    top = search_dogs(Dog.objects.all(), "лабрадор").values("pk")[:1]
+    assert list(Dog.objects.filter(pk__in=top)) == [best]
+
+
+@pytest.mark.unit
+class TestSqliteSearchIndex:
+    @pytest.fixture(autouse=True)
+    def sqlite_only(self, db):
+        if connection.vendor != "sqlite":
+            pytest.skip("FTS5 shadow table exists on SQLite only")
+
+    def test_lost_triggers_are_restored_and_index_rebuilt(self, make_dog):
+        with connection.cursor() as cursor:
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {name}")
+        make_dog("Бобик", temperament="спокойный")
+        assert _found("спокойный") == []
+
+        assert install_sqlite_search_index(connection) is True
+        assert _found("спокойный") == ["Бобик"]
+        assert install_sqlite_search_index(connection) is False
+
+    def test_index_is_consistent(self, make_dog):
+        dog = make_dog("Бобик", description="Любит плавать")
+        dog.description = "Боится воды"
+        dog.save()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('integrity-check')"
+            )
+
+
+@pytest.mark.views
+class TestDogListFullTextSearch:
+    def test_q_parameter_ranks_results(self, client, make_dog):
+        make_dog("Тихоня", description="Соседский лабрадор")
+        make_dog("Граф", breed="Лабрадор")
+        make_dog("Рекс", breed="Пудель")
+
+        response = client.get(reverse("dogs:dog_list"), {"q": "лабрадор"})
+
+        names = [dog.name for dog in response.context["page_obj"]]
+        assert names == ["Граф", "Тихоня"]
+        assert response.context["total_results"] == 2
+
+    def test_pagination_links_keep_the_query(self, client, make_dog):
+        for i in range(13):
+            make_dog(f"Пес{i}", temperament="спокойный")
+
+        response = client.get(reverse("dogs:dog_list"), {"q": "спокойный"})
+
+        assert response.context["page_obj"].paginator.num_pages == 2
+        query = urlencode({"q": "спокойный"})
+        assert f"?{query}&page=2" in response.content.decode()
+
+
+@pytest.mark.integration
+class TestPostgresSearchPlan:
+    def test_search_uses_expression_index(self, db, make_dog):
+        if connection.vendor != "postgresql":
+            pytest.skip("EXPLAIN plans are checked on Postgres only")
+        make_dog("Бобик", temperament="спокойный")
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        plan = search_dogs(Dog.objects.all(), "спокойный").explain()
+        assert "idx_dog_search_document" in plan
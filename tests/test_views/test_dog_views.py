@@ -8,6 +8,9 @@ import pytest
 from django.urls import reverse
 
 from dogs.models import Dog
+from dogs.recommendation_cache import get_recommendation_cache_stats
+from dogs.utils import get_compatible_dogs
+from dogs.views import DOG_RECOMMENDATIONS_LIMIT
 
 
 @pytest.mark.views
@@ -98,6 +101,26 @@ class TestDogDetailView:
         )
         assert "is_favorite" in response.context
 
+    def test_owner_sees_cached_recommendations(
+        self, authenticated_client, dog, other_dog
+    ):
+        """The owner's page lists compatible dogs from the recommendation cache."""
+        url = reverse("dogs:dog_detail", kwargs={"pk": dog.pk})
+        response = authenticated_client.get(url)
+        assert response.context["recommendations"] == get_compatible_dogs(
+            dog, limit=DOG_RECOMMENDATIONS_LIMIT
+        )
+        assert other_dog in response.context["recommendations"]
+
+        authenticated_client.get(url)
+        assert get_recommendation_cache_stats()["hits"] == 1
+
+    def test_no_recommendations_for_others(self, client, dog, other_dog, user2):
+        """Test recommendations are only computed for the owner."""
+        client.force_login(user2)
+        response = client.get(reverse("dogs:dog_detail", kwargs={"pk": dog.pk}))
+        assert response.context["recommendations"] == []
+
     def test_inactive_dog_not_accessible(self, client, inactive_dog):
         """Test inactive dogs return 404."""
         response = client.get(